@@ -0,0 +1,197 @@
+"""
+Contrôle d'admission des endpoints de prédiction (/predict/*)
+
+Chaque endpoint a un limiteur : au plus `concurrency` requêtes en cours,
+au plus `queue` requêtes en attente. Une requête est refusée tout de suite
+(503 + Retry-After), avant d'occuper un thread ou une connexion à la base,
+si :
+- la file d'attente est pleine ;
+- l'attente estimée (position dans la file × temps de service moyen
+  / concurrency) dépasse `max_wait` ou le temps restant avant l'échéance
+  de la requête (voir deadlines.py) ;
+- elle a attendu ce délai sans obtenir de place.
+
+Sans ce mécanisme, une surcharge ralentit toutes les requêtes à la fois
+(p99 qui explose) au lieu d'en rejeter une partie.
+
+La dépendance est async : l'attente se fait dans la boucle d'événements,
+sans bloquer de thread du pool. Elle est déclarée dans `dependencies=` du
+décorateur, donc résolue avant get_db (qui ouvre la connexion).
+
+Configuration par endpoint : ADMISSION_<NOM>_CONCURRENCY, _QUEUE et
+_MAX_WAIT (ex. ADMISSION_PREDICT_BATCH_CONCURRENCY=2). Métriques exposées
+par GET /metrics/admission.
+"""
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+from fastapi import Depends, HTTPException, status
+
+import deadlines
+from deadlines import Deadline
+
+# Poids de la dernière mesure dans la moyenne mobile du temps de service
+SERVICE_TIME_SMOOTHING = 0.2
+
+# (concurrency, queue, max_wait en secondes) par endpoint
+DEFAULT_LIMITS = {
+    "predict_from_id": (8, 32, 2.0),
+    "predict_new_employee": (8, 32, 2.0),
+    "predict_batch": (2, 4, 5.0),
+    "predict_from_ids": (2, 4, 5.0),
+    "predict_log": (16, 64, 1.0),
+}
+
+
+class AdmissionLimiter:
+    """Limiteur de concurrence avec file d'attente bornée pour un endpoint."""
+
+    def __init__(self, name: str, concurrency: int, queue: int, max_wait: float):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue = queue
+        self.max_wait = max_wait
+        self.active = 0
+        self.service_time = None  # moyenne mobile, en secondes
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "estimated_wait": 0, "timeout": 0}
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    # -------------------------------------------------------------------------
+    # ESTIMATION
+    # -------------------------------------------------------------------------
+
+    def estimated_wait(self, position: int) -> float:
+        """Attente estimée pour la `position`-ième requête de la file."""
+        if self.service_time is None:
+            return 0.0
+        return position * self.service_time / max(self.concurrency, 1)
+
+    def _overloaded(self, reason: str, wait: float) -> HTTPException:
+        self.rejected[reason] += 1
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service surchargé ({self.name}), réessayez plus tard",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))}
+        )
+
+    # -------------------------------------------------------------------------
+    # ACQUISITION / LIBÉRATION
+    # -------------------------------------------------------------------------
+
+    async def acquire(self, budget: float = math.inf) -> None:
+        """
+        Obtient une place ou lève une HTTPException 503.
+        
+        `budget` : temps restant avant l'échéance de la requête ; l'attente
+        ne le dépasse jamais.
+        """
+        max_wait = min(self.max_wait, budget)
+        with self._lock:
+            if self.active < self.concurrency and not self._waiters:
+                self.active += 1
+                self.admitted += 1
+                return
+            position = len(self._waiters) + 1
+            estimated = self.estimated_wait(position)
+            if len(self._waiters) >= self.queue:
+                raise self._overloaded("queue_full", estimated or self.max_wait)
+            if estimated > max_wait:
+                raise self._overloaded("estimated_wait", estimated)
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait({waiter}, timeout=max(max_wait, 0))
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        with self._lock:
+            if waiter in self._waiters:
+                # Toujours dans la file : délai dépassé
+                self._waiters.remove(waiter)
+                raise self._overloaded("timeout", self.estimated_wait(len(self._waiters) + 1))
+            self.admitted += 1
+
+    def _abandon(self, waiter) -> None:
+        """Client parti pendant l'attente : rendre la place si elle a été donnée."""
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                return
+        self.release(None)
+
+    def release(self, duration) -> None:
+        """Libère une place (transmise au premier en attente) et mesure le temps de service."""
+        with self._lock:
+            if duration is not None:
+                if self.service_time is None:
+                    self.service_time = duration
+                else:
+                    self.service_time += SERVICE_TIME_SMOOTHING * (duration - self.service_time)
+            if self._waiters:
+                # La place passe directement au suivant : active inchangé
+                waiter = self._waiters.popleft()
+                waiter.get_loop().call_soon_threadsafe(_grant, waiter)
+                return
+            self.active -= 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "queue": self.queue,
+                "max_wait": self.max_wait,
+                "active": self.active,
+                "waiting": len(self._waiters),
+                "admitted": self.admitted,
+                "rejected": dict(self.rejected),
+                "mean_service_ms": round(self.service_time * 1000, 2) if self.service_time is not None else None,
+            }
+
+
+def _grant(waiter) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _from_env(name: str) -> AdmissionLimiter:
+    concurrency, queue, max_wait = DEFAULT_LIMITS[name]
+    prefix = f"ADMISSION_{name.upper()}_"
+    return AdmissionLimiter(
+        name,
+        concurrency=int(os.getenv(prefix + "CONCURRENCY", concurrency)),
+        queue=int(os.getenv(prefix + "QUEUE", queue)),
+        max_wait=float(os.getenv(prefix + "MAX_WAIT", max_wait)),
+    )
+
+
+limiters: Dict[str, AdmissionLimiter] = {name: _from_env(name) for name in DEFAULT_LIMITS}
+
+
+def limit(name: str):
+    """Dépendance FastAPI : réserve une place du limiteur `name` pendant la requête."""
+    limiter = limiters[name]
+
+    async def admission(deadline: Deadline = Depends(deadlines.for_route(name))):
+        await limiter.acquire(deadline.remaining())
+        begin = time.monotonic()
+        try:
+            yield
+        finally:
+            limiter.release(time.monotonic() - begin)
+
+    return admission
+
+
+def metrics() -> Dict[str, dict]:
+    """Métriques de tous les limiteurs."""
+    return {name: limiter.metrics() for name, limiter in limiters.items()}
@@ -0,0 +1,170 @@
+"""
+Prédictions par lot : un appel au modèle, un INSERT multi-lignes
+
+Utilisé par /predict/batch et /predict/from_ids. Au lieu d'un aller-retour HTTP + session +
+commit + refresh par prédiction, le lot est :
+1. scoré en un seul predict_proba (model_loader.predict_batch) ;
+2. dédupliqué dans feature_blobs (feature_store.store_many) ;
+3. loggé dans predictions_logs en un INSERT ... RETURNING id multi-lignes ;
+4. validé par un seul commit.
+"""
+
+import os
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+import feature_store
+import payload_codec
+from deadlines import NO_DEADLINE, Deadline
+from model_loader import model_loader
+from models import Employee, PredictionLog
+from stats_cache import stats_cache
+
+# Nombre maximal de jeux de features par requête /predict/batch
+MAX_BATCH_SIZE = int(os.getenv("PREDICT_BATCH_MAX_SIZE", "1000"))
+# Nombre d'id par requête WHERE id IN (...)
+LOOKUP_CHUNK = 1000
+
+
+def _insert_logs(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """INSERT multi-lignes des logs ; retourne les id dans l'ordre de `rows`."""
+    table = PredictionLog.__table__
+    if db.get_bind().dialect.name != "sqlite":
+        # PostgreSQL : insertmanyvalues trie le RETURNING dans l'ordre des paramètres
+        return db.scalars(
+            insert(table).returning(table.c.id, sort_by_parameter_order=True),
+            rows
+        ).all()
+
+    # SQLite ne garantit pas cet ordre en lot : un INSERT ... VALUES (...), (...)
+    # par tranche, les rowid y étant attribués dans l'ordre des lignes
+    log_ids = []
+    for begin in range(0, len(rows), feature_store.INSERT_CHUNK):
+        chunk = rows[begin:begin + feature_store.INSERT_CHUNK]
+        log_ids.extend(sorted(db.scalars(insert(table).values(chunk).returning(table.c.id))))
+    return log_ids
+
+
+def score_and_log(
+    db: Session,
+    entries: List[Tuple[Optional[int], Dict[str, Any]]],
+    model_version: str,
+    deadline: Deadline = NO_DEADLINE
+) -> List[Dict[str, Any]]:
+    """
+    Score et loggue un lot de (employee_id, features).
+
+    `deadline` est vérifiée avant la prédiction et avant l'écriture des logs.
+
+    Returns:
+        Une entrée par élément de `entries`, dans le même ordre : log_id,
+        employee_id, prediction, probability, confidence_score, timestamp
+    """
+    if not entries:
+        return []
+
+    records = [features for _, features in entries]
+    deadline.check("prédiction")
+    predictions = model_loader.predict_batch(records)
+    deadline.check("enregistrement des logs")
+    hashes = feature_store.store_many(db, records)
+
+    created_at = datetime.utcnow()
+    rows = [
+        {
+            "employee_id": employee_id,
+            "features_hash": features_hash,
+            "prediction_result": prediction["prediction"],
+            "confidence_score": prediction["confidence_score"],
+            "model_version": model_version,
+            "created_at": created_at,
+        }
+        for (employee_id, _), features_hash, prediction in zip(entries, hashes, predictions)
+    ]
+    log_ids = _insert_logs(db, rows)
+    db.commit()
+    deadline.complete()
+
+    for prediction, count in Counter(row["prediction_result"] for row in rows).items():
+        stats_cache.record_prediction(prediction, count)
+
+    return [
+        {
+            "log_id": log_id,
+            "employee_id": employee_id,
+            "prediction": prediction["prediction"],
+            "probability": prediction["probability"],
+            "confidence_score": prediction["confidence_score"],
+            "timestamp": created_at,
+        }
+        for log_id, (employee_id, _), prediction in zip(log_ids, entries, predictions)
+    ]
+
+
+def fetch_features(db: Session, employee_ids: List[int]) -> Dict[int, Any]:
+    """
+    Payloads des employés demandés, lus par WHERE id IN (...) en tranches de
+    LOOKUP_CHUNK id. Les id inconnus sont simplement absents du résultat.
+    """
+    payloads = {}
+    for begin in range(0, len(employee_ids), LOOKUP_CHUNK):
+        chunk = employee_ids[begin:begin + LOOKUP_CHUNK]
+        for employee_id, features in db.execute(
+            select(Employee.id, Employee.features).where(Employee.id.in_(chunk))
+        ):
+            payloads[employee_id] = features
+    return payloads
+
+
+def score_employees(
+    db: Session,
+    employee_ids: List[int],
+    model_version: str,
+    deadline: Deadline = NO_DEADLINE
+) -> List[Dict[str, Any]]:
+    """
+    Score un lot d'employés existants.
+
+    Returns:
+        Une entrée par id distinct, dans l'ordre de la requête : le résultat
+        de score_and_log (found=True), ou un message d'erreur et log_id=None.
+        found=False pour un id inconnu, found=True si l'employé existe mais
+        que ses features sont illisibles ou invalides.
+    """
+    employee_ids = list(dict.fromkeys(employee_ids))
+    deadline.check("lecture des employés")
+    payloads = fetch_features(db, employee_ids)
+
+    deadline.check("décodage des features")
+    entries = []
+    errors = {}
+    for employee_id in employee_ids:
+        if employee_id not in payloads:
+            errors[employee_id] = f"Employé {employee_id} non trouvé"
+            continue
+        try:
+            features = payload_codec.decode(payloads[employee_id])
+        except Exception:
+            errors[employee_id] = f"Features de l'employé {employee_id} illisibles"
+            continue
+        if not isinstance(features, dict):
+            errors[employee_id] = f"Features de l'employé {employee_id} invalides (objet JSON attendu)"
+            continue
+        entries.append((employee_id, features))
+
+    scored = {result["employee_id"]: result for result in score_and_log(db, entries, model_version, deadline)}
+    not_scored = dict.fromkeys(("log_id", "prediction", "probability", "confidence_score", "timestamp"))
+    return [
+        {**scored[employee_id], "found": True, "error": None} if employee_id in scored
+        else {
+            "employee_id": employee_id,
+            "found": employee_id in payloads,
+            **not_scored,
+            "error": errors[employee_id]
+        }
+        for employee_id in employee_ids
+    ]
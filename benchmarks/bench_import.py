@@ -0,0 +1,105 @@
+"""
+Benchmark : import ligne par ligne (ancien import_data.py) vs chargement en masse
+
+Les imports tournent sur une base SQLite neuve (profil de production), avec le
+même dataset synthétique (benchmarks/generate_dataset.py). Le scénario
+"réimport" relance l'import incrémental sur la base déjà chargée, avec 1 %
+des employés modifiés. Avec --workers, l'import parallèle (parallel_load) est
+mesuré depuis un fichier Parquet.
+
+Usage :
+    python benchmarks/bench_import.py                       # 1M lignes
+    python benchmarks/bench_import.py --rows 200000
+    python benchmarks/bench_import.py --input data/synthetic_1m.joblib
+    python benchmarks/bench_import.py --skip-legacy --workers 1 2 4
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import import_data  # noqa: E402
+from database import Base, make_engine  # noqa: E402
+from generate_dataset import generate  # noqa: E402
+from models import Employee  # noqa: E402
+
+
+def legacy_import(df: pd.DataFrame, engine) -> None:
+    """Reproduction de l'ancien import : iterrows + un objet ORM par ligne + commit / 100."""
+    db = sessionmaker(bind=engine)()
+    count = 0
+    try:
+        for index, row in df.iterrows():
+            target_value = str(row["démission"]) if pd.notna(row["démission"]) else None
+            features_dict = row.drop("démission").to_dict()
+            features_dict = {k: (None if pd.isna(v) else v) for k, v in features_dict.items()}
+            db.add(Employee(
+                identifier=f"RECORD_{index}",
+                features=json.dumps(features_dict, default=float),
+                target=target_value
+            ))
+            count += 1
+            if count % 100 == 0:
+                db.commit()
+        db.commit()
+    finally:
+        db.close()
+
+
+def run(name: str, df: pd.DataFrame, loader, preload=None) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(engine)
+        if preload is not None:
+            import_data.bulk_load(preload, engine)
+
+        begin = time.perf_counter()
+        loader(df, engine)
+        seconds = time.perf_counter() - begin
+
+        with engine.connect() as conn:
+            rows = conn.execute(select(func.count()).select_from(Employee.__table__)).scalar()
+        engine.dispose()
+
+    print(f"{name:<14} {rows:>10} {seconds:>10.1f} s {rows / seconds:>12.0f} lignes/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--input", help="Dataset joblib existant (sinon généré)")
+    parser.add_argument("--skip-legacy", action="store_true", help="Ne mesurer que le chargement en masse")
+    parser.add_argument("--workers", type=int, nargs="*", default=[], help="Import parallèle avec N workers")
+    args = parser.parse_args()
+
+    df = import_data.load_dataset(args.input) if args.input else generate(args.rows)
+    print(f"📊 {len(df)} lignes, SQLite (profil production)\n")
+    print(f"{'Import':<14} {'lignes':>10} {'durée':>12} {'débit':>20}")
+
+    if not args.skip_legacy:
+        run("ligne à ligne", df, legacy_import)
+    run("en masse", df, lambda data, engine: import_data.bulk_load(data, engine))
+
+    modified = df.copy()
+    sample = modified.sample(frac=0.01, random_state=0).index
+    modified.loc[sample, "revenu_mensuel"] += 1
+    run("réimport 1 %", modified, lambda data, engine: import_data.bulk_load(data, engine), preload=df)
+
+    if args.workers:
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "extract.parquet"
+            df.to_parquet(source)
+            for workers in args.workers:
+                run(f"parallèle ×{workers}", df, lambda _, engine, n=workers: import_data.parallel_load(
+                    str(source), engine, workers=n
+                ))
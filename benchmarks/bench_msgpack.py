@@ -0,0 +1,79 @@
+"""
+Benchmark : coût de lecture d'un corps de prédiction, JSON vs msgpack
+
+Pour des lots de 1, 100 et 10 000 jeux de features (corps de /predict/batch),
+mesure le temps pour passer des octets reçus au modèle Pydantic validé :
+- "json + validate" : json.loads puis validation (chemin FastAPI par défaut) ;
+- "validate_json"   : model_validate_json (chemin JSON de msgpack_io.body) ;
+- "msgpack"         : msgpack.unpackb puis validation (Content-Type msgpack).
+
+Affiche aussi la taille du corps dans chaque format.
+
+Usage :
+    python benchmarks/bench_msgpack.py
+    python benchmarks/bench_msgpack.py --sizes 1 100 10000 --features tests/data/valid_employee.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import msgpack
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fast_json  # noqa: E402
+import msgpack_io  # noqa: E402
+from schemas import PredictionBatchRequest  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed(function, data, repeat: int) -> float:
+    """Durée moyenne d'un appel, en µs."""
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        function(data)
+    return (time.perf_counter() - begin) / repeat * 1e6
+
+
+def json_then_validate(data: bytes):
+    return PredictionBatchRequest.model_validate(json.loads(data))
+
+
+def validate_json(data: bytes):
+    return PredictionBatchRequest.model_validate_json(data)
+
+
+def msgpack_then_validate(data: bytes):
+    return PredictionBatchRequest.model_validate(msgpack_io.unpackb(data))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 100, 10000])
+    parser.add_argument("--features", type=Path, default=ROOT / "tests/data/valid_employee.json")
+    args = parser.parse_args()
+
+    features = json.loads(args.features.read_text(encoding="utf-8"))
+    print(f"📊 Corps /predict/batch, {len(features)} features par jeu, msgpack {msgpack.version}\n")
+    print(f"{'lot':>6} {'JSON':>10} {'msgpack':>10}   {'json + validate':>16} {'validate_json':>14} {'msgpack':>12}")
+
+    for size in args.sizes:
+        body = {"records": [dict(features) for _ in range(size)], "model_version": "v1.0"}
+        as_json = fast_json.dumps(body)
+        as_msgpack = msgpack_io.packb(body)
+        assert msgpack_then_validate(as_msgpack) == validate_json(as_json) == json_then_validate(as_json)
+
+        repeat = max(5, 20000 // size)
+        costs = [
+            timed(json_then_validate, as_json, repeat),
+            timed(validate_json, as_json, repeat),
+            timed(msgpack_then_validate, as_msgpack, repeat),
+        ]
+        print(
+            f"{size:>6} {len(as_json) / 1024:>7.1f} Ko {len(as_msgpack) / 1024:>7.1f} Ko   "
+            + " ".join(f"{cost / 1000:>11.3f} ms" for cost in costs)
+        )
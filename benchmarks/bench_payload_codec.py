@@ -0,0 +1,115 @@
+"""
+Benchmark : taille de stockage et coût encode / decode des codecs de features
+
+Pour chaque codec (json, msgpack, packed, avec et sans zlib) :
+- taille moyenne d'un payload et taille du fichier SQLite pour N employés ;
+- temps moyen d'encodage et de décodage d'un payload (µs).
+
+Les payloads sont générés à partir de tests/data/valid_employee.json en
+faisant varier les valeurs numériques.
+
+Usage :
+    python benchmarks/bench_payload_codec.py
+    python benchmarks/bench_payload_codec.py --rows 50000 --repeat 20000
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import payload_codec  # noqa: E402
+from database import Base  # noqa: E402
+from models import Employee  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCENARIOS = [
+    ("json", None),
+    ("msgpack", None),
+    ("msgpack", "zlib"),
+    ("packed", None),
+    ("packed", "zlib"),
+]
+
+
+def make_payloads(rows: int, seed: int = 42) -> list:
+    template = json.loads((ROOT / "tests/data/valid_employee.json").read_text(encoding="utf-8"))
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(rows):
+        features = dict(template)
+        for key, value in template.items():
+            if isinstance(value, bool):
+                continue
+            if isinstance(value, int):
+                features[key] = rng.randint(0, max(value * 2, 5))
+            elif isinstance(value, float):
+                features[key] = round(rng.uniform(0, value * 2), 1)
+        payloads.append(features)
+    return payloads
+
+
+def sqlite_size(encoded: list) -> int:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bench.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(engine)
+        with engine.begin() as conn:
+            conn.execute(insert(Employee.__table__), [
+                {"identifier": f"RECORD_{i}", "features": payload, "target": "Non"}
+                for i, payload in enumerate(encoded)
+            ])
+        engine.dispose()
+        return path.stat().st_size
+
+
+def run_scenario(name: str, compression, payloads: list, repeat: int) -> dict:
+    payload_codec.configure(name, compression)
+    encoded = [payload_codec.encode(features, "sqlite") for features in payloads]
+
+    sample = payloads[:repeat]
+    begin = time.perf_counter()
+    for features in sample:
+        payload_codec.encode(features, "sqlite")
+    encode_us = (time.perf_counter() - begin) / len(sample) * 1e6
+
+    stored = encoded[:repeat]
+    begin = time.perf_counter()
+    for payload in stored:
+        payload_codec.decode(payload)
+    decode_us = (time.perf_counter() - begin) / len(stored) * 1e6
+
+    return {
+        "payload_bytes": sum(len(p) for p in encoded) / len(encoded),
+        "db_mb": sqlite_size(encoded) / 1e6,
+        "encode_us": encode_us,
+        "decode_us": decode_us,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=10000)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.rows)
+    payload_codec.register_schema(sorted(payloads[0]))
+
+    print(f"📊 {args.rows} employés, {len(payloads[0])} features, {args.repeat} encodages / décodages\n")
+    print(f"{'Codec':<16} {'octets/ligne':>12} {'base SQLite':>12} {'encode':>10} {'decode':>10}")
+    for name, compression in SCENARIOS:
+        r = run_scenario(name, compression, payloads, args.repeat)
+        label = f"{name}+{compression}" if compression else name
+        print(
+            f"{label:<16} {r['payload_bytes']:>12.0f} {r['db_mb']:>9.1f} MB "
+            f"{r['encode_us']:>7.1f} µs {r['decode_us']:>7.1f} µs"
+        )
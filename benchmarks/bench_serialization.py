@@ -0,0 +1,100 @@
+"""
+Benchmark : coût de sérialisation d'une réponse de prédiction
+
+Compare, pour une réponse PredictionDetailedResponse (27 features) :
+- "avant" : modèle Pydantic construit à la main, re-validé par response_model
+  (serialize_response de FastAPI), puis encodé par JSONResponse (json) ;
+- "après" : dict retourné tel quel dans FastJSONResponse (fast_json).
+
+Mesure aussi le décodage / ré-encodage des features stockées (json vs
+fast_json), fait une à plusieurs fois par requête.
+
+Usage :
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --repeat 50000
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import fast_json  # noqa: E402
+import feature_store  # noqa: E402
+from fast_json import FastJSONResponse  # noqa: E402
+from schemas import PredictionDetailedResponse  # noqa: E402
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def response_content(features: dict) -> dict:
+    return {
+        "log_id": 123456,
+        "employee_id": 42,
+        "features": features,
+        "prediction": "Oui",
+        "confidence_score": 0.8731,
+        "model_version": "XGBoost_Light_100%",
+        "timestamp": datetime(2025, 3, 5, 9, 15, 12, 345678),
+    }
+
+
+async def before(content: dict, repeat: int) -> float:
+    field = create_model_field("Response_predict", PredictionDetailedResponse, mode="serialization")
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        model = PredictionDetailedResponse(**content)
+        serialized = await serialize_response(field=field, response_content=model)
+        JSONResponse(serialized).body
+    return (time.perf_counter() - begin) / repeat * 1e6
+
+
+def after(content: dict, repeat: int) -> float:
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        FastJSONResponse(dict(content)).body
+    return (time.perf_counter() - begin) / repeat * 1e6
+
+
+def timed(function, value, repeat: int) -> float:
+    begin = time.perf_counter()
+    for _ in range(repeat):
+        function(value)
+    return (time.perf_counter() - begin) / repeat * 1e6
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    features = json.loads((ROOT / "tests/data/valid_employee.json").read_text(encoding="utf-8"))
+    content = response_content(features)
+    stored = feature_store.canonical_json(features)
+
+    assert json.loads(FastJSONResponse(content).body) == json.loads(
+        JSONResponse(PredictionDetailedResponse(**content).model_dump(mode="json")).body
+    )
+
+    backend = "orjson" if fast_json.orjson is not None else "json (orjson absent)"
+    print(f"📊 Réponse de prédiction, {len(features)} features, {args.repeat} itérations, fast_json = {backend}\n")
+    print(f"{'Étape':<44} {'avant':>10} {'après':>10}")
+
+    rows = [
+        ("réponse (validation + encodage)", asyncio.run(before(content, args.repeat)), after(content, args.repeat)),
+        ("décodage des features stockées", timed(json.loads, stored, args.repeat),
+         timed(fast_json.loads, stored, args.repeat)),
+        ("features → JSON (API)", timed(lambda f: json.dumps(f, sort_keys=True), features, args.repeat),
+         timed(lambda f: fast_json.dumps(f, sort_keys=True), features, args.repeat)),
+    ]
+    for label, old, new in rows:
+        print(f"{label:<44} {old:>7.1f} µs {new:>7.1f} µs  (×{old / new:.1f})")
@@ -0,0 +1,140 @@
+"""
+Benchmark : concurrence lecture / écriture SQLite avec et sans le profil "production"
+
+Un écrivain insère des logs de prédiction (un commit par ligne, comme l'API)
+pendant que plusieurs lecteurs lisent la première page de /predictions/logs.
+Chaque scénario tourne sur une base neuve pré-remplie.
+
+Usage :
+    python benchmarks/bench_sqlite_pragmas.py
+    python benchmarks/bench_sqlite_pragmas.py --readers 8 --duration 10 --rows 50000
+"""
+
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from database import Base, apply_sqlite_pragmas  # noqa: E402
+from models import PredictionLog  # noqa: E402
+
+FEATURES = '{"age": 41, "genre": "F", "departement": "Commercial", "revenu_mensuel": 5993}'
+
+
+def make_engine(path: Path, production: bool):
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    if production:
+        apply_sqlite_pragmas(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def prefill(engine, rows: int) -> None:
+    start = datetime(2025, 1, 1)
+    with engine.begin() as conn:
+        conn.execute(insert(PredictionLog.__table__), [
+            {
+                "input_features": FEATURES,
+                "prediction_result": "Oui" if i % 5 == 0 else "Non",
+                "confidence_score": 0.7,
+                "model_version": "v1.0",
+                "created_at": start + timedelta(seconds=i),
+            }
+            for i in range(rows)
+        ])
+
+
+def run_scenario(production: bool, readers: int, duration: float, rows: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(Path(tmp) / "bench.db", production)
+        prefill(engine, rows)
+
+        stop = threading.Event()
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        latencies = []
+
+        page = (
+            select(PredictionLog.__table__)
+            .order_by(PredictionLog.created_at.desc(), PredictionLog.id.desc())
+            .limit(10)
+        )
+
+        def reader():
+            done = 0
+            with engine.connect() as conn:
+                while not stop.is_set():
+                    try:
+                        conn.execute(page).fetchall()
+                        conn.rollback()
+                        done += 1
+                    except OperationalError:
+                        with lock:
+                            counts["errors"] += 1
+            with lock:
+                counts["reads"] += done
+
+        def writer():
+            done = 0
+            while not stop.is_set():
+                begin = time.perf_counter()
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(PredictionLog.__table__).values(
+                            input_features=FEATURES,
+                            prediction_result="Non",
+                            confidence_score=0.7,
+                            model_version="v1.0",
+                            created_at=datetime(2026, 1, 1) + timedelta(microseconds=done),
+                        ))
+                    done += 1
+                    latencies.append(time.perf_counter() - begin)
+                except OperationalError:
+                    with lock:
+                        counts["errors"] += 1
+            with lock:
+                counts["writes"] += done
+
+        threads = [threading.Thread(target=reader) for _ in range(readers)]
+        threads.append(threading.Thread(target=writer))
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan")
+    return {
+        "reads_per_s": counts["reads"] / duration,
+        "writes_per_s": counts["writes"] / duration,
+        "write_p99_ms": p99,
+        "errors": counts["errors"],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"📊 {args.readers} lecteurs + 1 écrivain, {args.duration:.0f}s, {args.rows} lignes pré-remplies\n")
+    print(f"{'Profil':<12} {'lectures/s':>12} {'écritures/s':>12} {'p99 écriture':>14} {'erreurs':>8}")
+    for name, production in [("default", False), ("production", True)]:
+        r = run_scenario(production, args.readers, args.duration, args.rows)
+        print(
+            f"{name:<12} {r['reads_per_s']:>12.0f} {r['writes_per_s']:>12.0f} "
+            f"{r['write_p99_ms']:>11.1f} ms {r['errors']:>8}"
+        )
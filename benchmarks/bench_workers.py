@@ -0,0 +1,110 @@
+"""
+Benchmark : débit de /predict/new_employee selon le nombre de workers (serve.py)
+
+Pour chaque nombre de workers, lance `python serve.py --workers N` sur une
+base SQLite neuve, attend /health, puis envoie des prédictions depuis
+`--clients` connexions concurrentes pendant `--duration` secondes.
+Affiche le débit et les latences p50 / p99.
+
+Usage :
+    python benchmarks/bench_workers.py                      # 1, 2 et N (cœurs) workers
+    python benchmarks/bench_workers.py --workers 1 2 4 8 --clients 32 --duration 20
+"""
+
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from serve import available_cores  # noqa: E402
+
+API_KEY = "bench-api-key"
+
+
+def start_server(workers: int, port: int, database: Path) -> subprocess.Popen:
+    env = {**os.environ, "API_KEY": API_KEY, "DATABASE_URL": f"sqlite:///{database}"}
+    subprocess.run([sys.executable, "create_tables.py"], cwd=ROOT, env=env, check=True, capture_output=True)
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port)],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").json()["model_loaded"]:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"serve.py --workers {workers} n'a pas démarré")
+
+
+def client_loop(url: str, payload: dict, stop: threading.Event, latencies: list) -> None:
+    headers = {"X-API-Key": API_KEY, "X-Request-Timeout": "30"}
+    with httpx.Client(headers=headers, timeout=30) as client:
+        while not stop.is_set():
+            begin = time.perf_counter()
+            response = client.post(url, json=payload, params={"view": "lean"})
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - begin)
+
+
+def run(workers: int, clients: int, duration: float, port: int, features: dict) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        server = start_server(workers, port, Path(tmp) / "bench.db")
+        try:
+            url = f"http://127.0.0.1:{port}/predict/new_employee"
+            payload = {"features": features, "model_version": "bench"}
+            stop = threading.Event()
+            latencies = [[] for _ in range(clients)]
+            threads = [
+                threading.Thread(target=client_loop, args=(url, payload, stop, latencies[i]))
+                for i in range(clients)
+            ]
+            for thread in threads:
+                thread.start()
+            time.sleep(duration)
+            stop.set()
+            for thread in threads:
+                thread.join()
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+
+    measured = sorted(latency for per_client in latencies for latency in per_client)
+    return {
+        "throughput": len(measured) / duration,
+        "p50_ms": measured[len(measured) // 2] * 1000 if measured else float("nan"),
+        "p99_ms": measured[int(len(measured) * 0.99)] * 1000 if measured else float("nan"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=None)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--port", type=int, default=18765)
+    args = parser.parse_args()
+
+    cores = available_cores()
+    workers_list = args.workers or sorted({1, 2, cores})
+    features = json.loads((ROOT / "tests/data/valid_employee.json").read_text(encoding="utf-8"))
+
+    print(f"📊 /predict/new_employee, {args.clients} clients, {args.duration:g}s par scénario, {cores} cœur(s)\n")
+    print(f"{'workers':>8} {'req/s':>10} {'p50':>10} {'p99':>10}")
+    for workers in workers_list:
+        result = run(workers, args.clients, args.duration, args.port, features)
+        print(f"{workers:>8} {result['throughput']:>10.1f} {result['p50_ms']:>7.1f} ms {result['p99_ms']:>7.1f} ms")
@@ -0,0 +1,136 @@
+"""
+Générateur de dataset synthétique au format de 01_classe.joblib
+
+Produit un DataFrame avec les mêmes colonnes que le dataset RH (27 features
++ la cible `démission`), à n'importe quelle échelle, pour mesurer les imports
+(import_data.py) sans dépendre des données réelles. Génération vectorisée :
+1M de lignes en quelques secondes.
+
+Usage :
+    python benchmarks/generate_dataset.py --rows 1000000 --output data/synthetic_1m.joblib
+    python benchmarks/generate_dataset.py --rows 1000000 --output data/synthetic_1m.parquet
+    python benchmarks/generate_dataset.py --rows 100000 --output data/synthetic.csv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = "démission"
+
+CATEGORIES = {
+    "genre": ["F", "M"],
+    "statut_marital": ["Célibataire", "Marié(e)", "Divorcé(e)"],
+    "niveau_education": ["1", "2", "3", "4", "5"],
+    "domaine_etude": ["Infra & Cloud", "Transformation Digitale", "Marketing", "Entrepreunariat", "RH", "Autre"],
+    "poste": [
+        "Cadre Commercial", "Assistant de Direction", "Consultant", "Tech Lead",
+        "Manager", "Senior Manager", "Représentant Commercial", "Directeur Technique", "Cadre RH",
+    ],
+    "departement": ["Commercial", "Consulting", "RH"],
+    "heure_supplementaires": ["Oui", "Non"],
+    "frequence_deplacement": ["Aucun", "Occasionnel", "Frequent"],
+}
+
+# (min, max) inclus pour les features entières
+INTEGER_RANGES = {
+    "age": (18, 60),
+    "participation_pee": (0, 3),
+    "distance_domicile_travail": (1, 29),
+    "experiences_precedentes": (0, 9),
+    "annees_experience_totale": (0, 40),
+    "nb_formations_suivies": (0, 6),
+    "note_evaluation_precedente": (1, 4),
+    "note_evaluation_actuelle": (1, 4),
+    "niveau_hierarchique_poste": (1, 5),
+    "annees_dans_l_entreprise": (0, 40),
+    "annees_dans_le_poste_actuel": (0, 18),
+    "annes_sous_responsable_actuel": (0, 17),
+    "satisfaction_environnement": (1, 4),
+    "satisfaction_nature_travail": (1, 4),
+    "satisfaction_equipe": (1, 4),
+    "satisfaction_equilibre_pro_perso": (1, 4),
+    "revenu_mensuel": (1009, 19999),
+    "annees_depuis_la_derniere_promotion": (0, 15),
+}
+
+FLOAT_RANGES = {
+    "augmentation_salaire_precedent": (11.0, 25.0),
+}
+
+# Ordre des colonnes de tests/data/valid_employee.json
+COLUMNS = [
+    "age", "genre", "statut_marital", "participation_pee", "distance_domicile_travail",
+    "experiences_precedentes", "annees_experience_totale", "niveau_education", "domaine_etude",
+    "nb_formations_suivies", "note_evaluation_precedente", "note_evaluation_actuelle", "poste",
+    "niveau_hierarchique_poste", "departement", "annees_dans_l_entreprise",
+    "annees_dans_le_poste_actuel", "annes_sous_responsable_actuel", "satisfaction_environnement",
+    "satisfaction_nature_travail", "satisfaction_equipe", "satisfaction_equilibre_pro_perso",
+    "heure_supplementaires", "frequence_deplacement", "revenu_mensuel",
+    "augmentation_salaire_precedent", "annees_depuis_la_derniere_promotion",
+]
+
+
+def generate(rows: int, seed: int = 42, missing_rate: float = 0.001) -> pd.DataFrame:
+    """
+    Génère `rows` employés synthétiques.
+
+    Args:
+        rows: Nombre de lignes
+        seed: Graine (même graine → même dataset)
+        missing_rate: Part de valeurs manquantes injectées dans les features
+            numériques (l'import doit les convertir en null)
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for column in COLUMNS:
+        if column in CATEGORIES:
+            values = np.array(CATEGORIES[column], dtype=object)
+            data[column] = values[rng.integers(0, len(values), rows)]
+        elif column in INTEGER_RANGES:
+            low, high = INTEGER_RANGES[column]
+            data[column] = rng.integers(low, high + 1, rows)
+        else:
+            low, high = FLOAT_RANGES[column]
+            data[column] = np.round(rng.uniform(low, high, rows), 1)
+
+    df = pd.DataFrame(data)
+    df[TARGET_COLUMN] = np.where(rng.random(rows) < 0.16, "Oui", "Non")
+
+    if missing_rate:
+        mask = rng.random(rows) < missing_rate
+        df["distance_domicile_travail"] = df["distance_domicile_travail"].astype("float64").mask(mask)
+
+    return df
+
+
+def save(df: pd.DataFrame, output: Path) -> None:
+    """Écrit le dataset selon l'extension : .joblib, .csv ou .parquet."""
+    output.parent.mkdir(parents=True, exist_ok=True)
+    suffix = output.suffix.lower()
+    if suffix == ".joblib":
+        joblib.dump(df, output)
+    elif suffix == ".csv":
+        df.to_csv(output, index=False)
+    elif suffix == ".parquet":
+        df.to_parquet(output, index=False)
+    else:
+        raise ValueError(f"❌ Format non supporté : {suffix} (attendu : .joblib, .csv, .parquet)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--output", type=Path, default=Path("data/synthetic_1m.joblib"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    begin = time.perf_counter()
+    df = generate(args.rows, args.seed)
+    save(df, args.output)
+    print(f"✅ {len(df)} lignes, {len(df.columns)} colonnes → {args.output} "
+          f"({time.perf_counter() - begin:.1f}s)")
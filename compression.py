@@ -0,0 +1,160 @@
+"""
+Compression négociée des réponses (brotli / gzip)
+
+Middleware ASGI : choisit l'encodage d'après Accept-Encoding (brotli s'il
+est accepté, sinon gzip) et compresse :
+- les réponses simples (listes /employees, /predictions/logs, ...) dont le
+  corps dépasse COMPRESSION_MIN_SIZE. Une réponse de prédiction (~1 Ko)
+  tient dans un seul segment TCP : la compresser coûterait du CPU sans
+  rien économiser, elle reste donc en clair ;
+- les réponses en flux (export CSV / NDJSON) morceau par morceau : chaque
+  lot est compressé puis vidé (flush) pour que le client le reçoive sans
+  attendre la fin de l'export.
+
+Seuls les types texte et msgpack (clés répétées à chaque ligne) sont
+compressés : le Parquet (déjà compressé en zstd) et les 304 passent tels
+quels. Une réponse compressée reçoit un ETag faible (W/...), la
+représentation n'étant plus identique octet par octet.
+"""
+
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # installation sans brotli : repli sur gzip
+    brotli = None
+
+# Taille minimale (octets) d'une réponse simple pour être compressée
+MINIMUM_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1400"))
+GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+# Qualité 4 : bon compromis pour du contenu dynamique (11 = très lent)
+BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "application/javascript", "application/x-msgpack"}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """Encodage retenu pour un header Accept-Encoding ("br", "gzip" ou None)."""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        name, *parameters = item.strip().split(";")
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def _compressible(status: int, headers: Headers) -> bool:
+    if status in (204, 304) or "content-encoding" in headers:
+        return False
+    media_type = headers.get("content-type", "").split(";")[0].strip().lower()
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+class _Gzip:
+    def __init__(self):
+        # wbits 31 : en-tête et pied gzip
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        flush_mode = zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH
+        return self._compressor.compress(data) + self._compressor.flush(flush_mode)
+
+
+class _Brotli:
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        output = self._compressor.process(data)
+        return output + (self._compressor.finish() if final else self._compressor.flush())
+
+
+_COMPRESSORS = {"gzip": _Gzip, "br": _Brotli}
+
+
+class CompressionMiddleware:
+    """Compresse les réponses texte selon Accept-Encoding."""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        await self.app(scope, receive, _Responder(send, encoding, self.minimum_size))
+
+
+class _Responder:
+    """Intercepte la réponse : l'en-tête est retenu jusqu'au premier morceau du corps."""
+
+    def __init__(self, send: Send, encoding: Optional[str], minimum_size: int) -> None:
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.started = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.started:
+            if self.compressor is not None and message["type"] == "http.response.body":
+                final = not message.get("more_body", False)
+                message = {**message, "body": self.compressor.compress(message.get("body", b""), final)}
+            await self.send(message)
+            return
+
+        # Premier morceau du corps : décider de la compression
+        self.started = True
+        start, self.start = self.start, None
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if not _compressible(start["status"], headers):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        # Réponse simple trop petite (ex. une prédiction) : pas de compression
+        if self.encoding is None or (not more_body and len(body) < self.minimum_size):
+            await self.send(start)
+            await self.send(message)
+            return
+
+        self.compressor = _COMPRESSORS[self.encoding]()
+        body = self.compressor.compress(body, final=not more_body)
+        headers["Content-Encoding"] = self.encoding
+        if "etag" in headers and not headers["etag"].startswith("W/"):
+            headers["ETag"] = f"W/{headers['etag']}"
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+
+        await self.send(start)
+        await self.send({**message, "body": body})
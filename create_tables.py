@@ -1,6 +1,9 @@
-from database import engine, Base
+from database import engine, Base, require_current_schema
 from models import Employee, PredictionLog
+from partitioning import setup_partitioning
 
 print("Création des tables...")
 Base.metadata.create_all(bind=engine)
+require_current_schema(engine)  # base existante : colonnes ajoutées par alembic upgrade head
+setup_partitioning(engine)  # PostgreSQL : predictions_logs partitionnée par mois
 print("✅ Tables créées avec succès !")
\ No newline at end of file
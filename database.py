@@ -1,9 +1,12 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.exc import OperationalError
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
 from fastapi import HTTPException, status  
 import os
+import threading
+import time
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 import logging
 
@@ -13,14 +16,174 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./hr_analytics.db")  
 
-engine = create_engine(DATABASE_URL)
+# Réplique en lecture optionnelle : les endpoints en lecture seule y sont routés
+READ_DATABASE_URL = os.getenv("READ_DATABASE_URL")
+# Retard de réplication toléré avant de renvoyer les lectures vers le primaire
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+# Fréquence de mesure du retard (évite une requête de contrôle par appel)
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", "2"))
+
+# Profil SQLite : "production" (WAL + pragmas ci-dessous) ou "default" (réglages SQLite d'origine)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production")
+
+# WAL : les lecteurs ne bloquent plus l'écrivain (et inversement).
+# synchronous=NORMAL est sûr en WAL (pas de corruption, seuls les derniers
+# commits peuvent être perdus en cas de coupure de courant).
+SQLITE_PRAGMAS = {
+    "foreign_keys": "ON",     # SQLite n'applique les FOREIGN KEY que sur demande
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 268435456,   # 256 Mo lus via mmap
+    "cache_size": -65536,     # 64 Mo de cache de pages (valeur négative = Kio)
+    "busy_timeout": 5000,     # ms d'attente sur un verrou avant "database is locked"
+    "temp_store": "MEMORY",
+}
+
+
+def apply_sqlite_pragmas(engine, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    """Applique les pragmas à chaque nouvelle connexion SQLite du pool."""
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def make_engine(url: str):
+    """Crée un moteur, avec le profil SQLite de production le cas échéant."""
+    new_engine = create_engine(url)
+    if new_engine.dialect.name == "sqlite":
+        # Les clés étrangères sont vérifiées quel que soit le profil
+        apply_sqlite_pragmas(new_engine, SQLITE_PRAGMAS if SQLITE_PROFILE == "production" else {"foreign_keys": "ON"})
+    return new_engine
+
+
+engine = make_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-# Dépendance pour FastAPI
-def get_db():
-    """Fournit une session de base de données avec gestion d'erreurs."""
-    db = SessionLocal()
+
+def missing_columns(bind) -> list:
+    """
+    Colonnes des modèles absentes des tables existantes ("table.colonne").
+
+    create_all crée les tables manquantes mais n'ajoute pas de colonne à une
+    table existante : une base antérieure à une migration doit passer par
+    `alembic upgrade head`.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [f"{table.name}.{column.name}" for column in table.columns if column.name not in existing]
+    return missing
+
+
+def require_current_schema(bind) -> None:
+    """Arrête le script avec un message clair si la base doit être migrée."""
+    missing = missing_columns(bind)
+    if missing:
+        raise SystemExit(
+            f"❌ Base antérieure au schéma actuel (colonnes absentes : {', '.join(missing)}).\n"
+            f"   Lancez `alembic upgrade head` puis relancez ce script."
+        )
+
+
+def naive_utc(moment: datetime) -> datetime:
+    """
+    Date comparable aux colonnes DateTime, stockées en UTC naïf
+    (datetime.utcnow) : une date avec fuseau (ex. `...Z`, `...+02:00`) est
+    convertie en UTC puis débarrassée de son fuseau.
+    """
+    if moment.tzinfo is None:
+        return moment
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+# =============================================================================
+# RÉPLIQUE EN LECTURE
+# =============================================================================
+
+class ReplicaLagMonitor:
+    """
+    Mesure (au plus une fois par `interval` secondes) le retard de la
+    réplique et indique si elle peut servir les lectures.
+    """
+    
+    def __init__(self, replica_engine, max_lag: float, interval: float):
+        self.engine = replica_engine
+        self.max_lag = max_lag
+        self.interval = interval
+        self._healthy = False
+        self._checked_at = None
+        self._lock = threading.Lock()
+    
+    def measure_lag(self) -> float:
+        """Retard de réplication en secondes (0 hors PostgreSQL)."""
+        with self.engine.connect() as conn:
+            if self.engine.dialect.name != "postgresql":
+                conn.execute(text("SELECT 1"))
+                return 0.0
+            # Réplique à jour (tout le WAL reçu est rejoué) → pas de retard, même
+            # si le primaire n'a rien écrit depuis longtemps.
+            lag = conn.execute(text(
+                "SELECT CASE "
+                "WHEN NOT pg_is_in_recovery() THEN 0 "
+                "WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+                "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+            )).scalar()
+            return float(lag or 0.0)
+    
+    def is_healthy(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.interval:
+                return self._healthy
+            self._checked_at = now
+        
+        try:
+            lag = self.measure_lag()
+            healthy = lag <= self.max_lag
+            if not healthy:
+                logger.warning(f"⚠️ Réplique en retard de {lag:.1f}s : lectures routées vers le primaire")
+        except SQLAlchemyError as e:
+            # Pas seulement injoignable : requête de mesure refusée (droits,
+            # fonction pg_* absente...) → réplique jamais utilisée sans mesure
+            logger.error(f"❌ Réplique inaccessible, lectures routées vers le primaire : {e}")
+            healthy = False
+        
+        with self._lock:
+            self._healthy = healthy
+        return healthy
+
+
+if READ_DATABASE_URL:
+    read_engine = make_engine(READ_DATABASE_URL)
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=read_engine, info={"replica": True}
+    )
+    replica_monitor = ReplicaLagMonitor(read_engine, REPLICA_MAX_LAG_SECONDS, REPLICA_LAG_CHECK_INTERVAL)
+else:
+    read_engine = None
+    ReadSessionLocal = None
+    replica_monitor = None
+
+
+def is_replica_session(db) -> bool:
+    """True si la session lit sur la réplique (donc potentiellement en retard)."""
+    return bool(db.info.get("replica", False))
+
+
+# =============================================================================
+# DÉPENDANCES FASTAPI
+# =============================================================================
+
+def _open_session(session_factory):
+    """Ouvre une session, vérifie la connexion et la ferme après la requête."""
+    db = session_factory()
     try:
         # Tester la connexion
         db.execute(text("SELECT 1"))
@@ -32,4 +195,23 @@ def get_db():
             detail="Base de données non accessible"
         )
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+# Dépendance pour FastAPI
+def get_db():
+    """Fournit une session de base de données avec gestion d'erreurs."""
+    yield from _open_session(SessionLocal)
+
+
+def get_read_db():
+    """
+    Session pour les endpoints en lecture seule : réplique si configurée et
+    à jour (retard <= REPLICA_MAX_LAG_SECONDS), primaire sinon. Les lectures
+    peuvent donc manquer une écriture récente ; seul /predict/log/{id} relit
+    le primaire quand la ligne manque (is_replica_session).
+    """
+    if ReadSessionLocal is not None and replica_monitor.is_healthy():
+        yield from _open_session(ReadSessionLocal)
+    else:
+        yield from _open_session(SessionLocal)
\ No newline at end of file
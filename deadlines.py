@@ -0,0 +1,172 @@
+"""
+Échéances des requêtes de prédiction
+
+Chaque requête /predict/* reçoit un budget de temps : celui du header
+X-Request-Timeout (en secondes) s'il est fourni, sinon celui de la route
+(DEADLINE_<NOM>, ex. DEADLINE_PREDICT_BATCH=10). Le budget court dès
+l'arrivée de la requête, attente du contrôle d'admission comprise.
+
+Les endpoints vérifient le temps restant avant chaque étape coûteuse
+(lecture en base, décodage des features, prédiction, commit du log) : une
+requête déjà expirée s'arrête en 504 sans atteindre le modèle. Le client
+qui a abandonné et réessaie ne laisse donc pas de travail en double.
+
+La session de base reçoit un timeout de requête SQL aligné sur l'échéance :
+- PostgreSQL : SET LOCAL statement_timeout, à chaque transaction ;
+- SQLite : progress handler qui interrompt la requête une fois l'échéance
+  passée, posé sur la connexion à chaque transaction et retiré quand la
+  connexion retourne au pool (elle ne garde pas l'échéance d'une autre
+  requête).
+"""
+
+import math
+import os
+import sqlite3
+import time
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import Pool
+
+from database import get_db
+
+HEADER = "X-Request-Timeout"
+# Budget maximal accepté depuis le header (secondes)
+MAX_BUDGET = float(os.getenv("DEADLINE_MAX", "30"))
+# Nombre d'instructions SQLite entre deux vérifications de l'échéance
+SQLITE_CHECK_INTERVAL = 10000
+
+# Budget par défaut (secondes) par route
+DEFAULT_BUDGETS = {
+    "predict_from_id": 2.0,
+    "predict_new_employee": 2.0,
+    "predict_batch": 10.0,
+    "predict_from_ids": 10.0,
+    "predict_log": 1.0,
+}
+
+
+class Deadline:
+    """Échéance absolue (horloge monotone) d'une requête."""
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def exceeded(self, stage: str) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"Délai de la requête ({self.budget:g}s) dépassé avant l'étape : {stage}"
+        )
+
+    def check(self, stage: str) -> None:
+        """Lève une HTTPException 504 si l'échéance est passée."""
+        if self.expired():
+            raise self.exceeded(stage)
+
+    def complete(self) -> None:
+        """
+        Lève l'échéance une fois le log commité : la réponse doit alors être
+        envoyée, les lectures qui suivent (refresh) ne sont plus interrompues.
+        """
+        self.expires_at = math.inf
+
+
+# Pour les appels hors requête HTTP (scripts, tests)
+NO_DEADLINE = Deadline(math.inf)
+
+
+def _budget(name: str) -> float:
+    return float(os.getenv(f"DEADLINE_{name.upper()}", DEFAULT_BUDGETS[name]))
+
+
+def _parse_header(value: str) -> float:
+    try:
+        budget = float(value)
+    except ValueError:
+        budget = math.nan
+    if not 0 < budget <= MAX_BUDGET:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{HEADER} invalide : nombre de secondes entre 0 et {MAX_BUDGET:g} attendu"
+        )
+    return budget
+
+
+_route_dependencies = {}
+
+
+def for_route(name: str):
+    """
+    Dépendance FastAPI : échéance de la requête pour la route `name`.
+
+    Toujours le même objet pour une route, pour que FastAPI ne calcule
+    l'échéance qu'une fois par requête (admission, session, endpoint).
+    """
+    if name not in _route_dependencies:
+        default_budget = _budget(name)
+
+        def request_deadline(request: Request) -> Deadline:
+            value = request.headers.get(HEADER)
+            return Deadline(_parse_header(value) if value is not None else default_budget)
+
+        _route_dependencies[name] = request_deadline
+    return _route_dependencies[name]
+
+
+# =============================================================================
+# TIMEOUT DES REQUÊTES SQL
+# =============================================================================
+
+def _set_postgres_timeout(connection, deadline: Deadline) -> None:
+    remaining = deadline.remaining()
+    # 0 = pas de timeout (échéance levée après le commit)
+    milliseconds = 0 if math.isinf(remaining) else max(1, int(remaining * 1000))
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {milliseconds}")
+
+
+def _set_sqlite_handler(connection, deadline: Deadline) -> None:
+    raw_connection = connection.connection.driver_connection
+    raw_connection.set_progress_handler(deadline.expired, SQLITE_CHECK_INTERVAL)
+
+
+@event.listens_for(Pool, "checkin")
+def _clear_sqlite_handler(dbapi_connection, connection_record):
+    """Connexion rendue au pool : plus d'échéance (tous les pools, SQLite seul concerné)."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.set_progress_handler(None, SQLITE_CHECK_INTERVAL)
+
+
+def session(name: str):
+    """
+    Dépendance FastAPI : session get_db dont les requêtes SQL s'interrompent
+    à l'échéance de la requête HTTP.
+    """
+    request_deadline = for_route(name)
+
+    def deadline_session(db: Session = Depends(get_db), deadline: Deadline = Depends(request_deadline)):
+        setters = {"postgresql": _set_postgres_timeout, "sqlite": _set_sqlite_handler}
+        set_timeout = setters.get(db.get_bind().dialect.name)
+        if set_timeout is None:
+            yield db
+            return
+
+        # Chaque transaction peut recevoir une autre connexion du pool
+        def on_begin(session, transaction, connection):
+            set_timeout(connection, deadline)
+
+        set_timeout(db.connection(), deadline)
+        event.listen(db, "after_begin", on_begin)
+        try:
+            yield db
+        finally:
+            event.remove(db, "after_begin", on_begin)
+
+    return deadline_session
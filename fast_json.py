@@ -0,0 +1,65 @@
+"""
+Sérialisation JSON rapide pour les réponses et les features
+
+Utilise orjson (encodage en Rust, datetime et numpy gérés nativement). Si
+le paquet manque, repli sur le module json standard avec les mêmes
+conventions que Starlette (UTF-8, sans espaces).
+
+FastJSONResponse est la classe de réponse par défaut de l'application. Les
+endpoints de prédiction la retournent directement : FastAPI n'applique alors
+ni la re-validation par response_model ni jsonable_encoder (le response_model
+reste déclaré pour la documentation OpenAPI).
+
+Le JSON canonique des features (hash de dédoublonnage, payload stocké) reste
+produit par le module json : orjson n'écrit pas certains flottants à
+l'identique (1e-05 → 0.00001), ce qui changerait les hash existants.
+"""
+
+import json
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # dépendance optionnelle
+    orjson = None
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # numpy
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable en JSON : {type(value).__name__}")
+
+
+def dumps(value: Any, sort_keys: bool = False) -> bytes:
+    """Encode en JSON UTF-8 compact."""
+    if orjson is not None:
+        return orjson.dumps(
+            value, default=_default,
+            option=(_OPTIONS | orjson.OPT_SORT_KEYS) if sort_keys else _OPTIONS
+        )
+    return json.dumps(
+        value, sort_keys=sort_keys, ensure_ascii=False, allow_nan=False,
+        separators=(",", ":"), default=_default
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Décode du JSON (str, bytes ou memoryview)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data) if isinstance(data, memoryview) else data)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encodée par `dumps` (orjson si disponible)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,106 @@
+"""
+Filtres par feature poussés dans la requête SQL
+
+/employees et /predictions/logs acceptent des filtres sur les features les
+plus utilisées (departement, poste, heure_supplementaires). Le prédicat est
+évalué par la base, pas par le client :
+- PostgreSQL : `features @> '{"departement": "Commercial"}'` sur la colonne
+  JSONB, servi par les index GIN (jsonb_path_ops) de models.py ;
+- SQLite : json_extract() sur les lignes JSON, et une fonction SQL
+  `feature_value()` (payload_codec) pour les lignes au format binaire. Le
+  prédicat devient `id IN (lignes JSON UNION ALL lignes binaires)` : chaque
+  branche est servie par un index partiel (models.sqlite_feature_indexes),
+  le coût suit le nombre de lignes retenues et non la taille de la table.
+  Une feature hors de models.FILTERED_FEATURES n'a pas d'index : parcours
+  complet de la table.
+"""
+
+from typing import Dict, Optional
+
+from fastapi import Query
+from sqlalchemy import and_, func, literal_column, or_, select, type_coerce, union_all
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session
+
+import payload_codec
+from models import Employee, FeatureBlob, PredictionLog
+
+def query_filters(
+    departement: Optional[str] = Query(None, description="Ex. Commercial"),
+    poste: Optional[str] = Query(None, description="Ex. Cadre Commercial"),
+    heure_supplementaires: Optional[str] = Query(None, description="Oui / Non"),
+) -> Dict[str, str]:
+    """Dépendance FastAPI : filtres de features renseignés dans la requête."""
+    values = {
+        "departement": departement,
+        "poste": poste,
+        "heure_supplementaires": heure_supplementaires,
+    }
+    return {key: value for key, value in values.items() if value is not None}
+
+
+# =============================================================================
+# SQLITE : LECTURE D'UNE FEATURE QUEL QUE SOIT LE FORMAT
+# =============================================================================
+
+def _feature_value(payload, key):
+    if payload is None:
+        return None
+    return payload_codec.decode(payload).get(key)
+
+
+def _register_sqlite_functions(db: Session) -> None:
+    """Déclare feature_value() sur la connexion SQLite de la session."""
+    connection = db.connection().connection.driver_connection
+    connection.create_function("feature_value", 2, _feature_value, deterministic=True)
+
+
+def _literal(value: str):
+    # Littéral SQL (pas de paramètre) : SQLite ne choisit un index d'expression
+    # ou partiel que si la requête reprend exactement son expression.
+    return literal_column("'" + value.replace("'", "''") + "'")
+
+
+def _sqlite_match(column, filters: Dict[str, str]):
+    # JSON texte → json_extract (natif), binaire → décodage via payload_codec
+    key = next(iter(column.expression.table.primary_key.columns))
+    json_rows = select(key).where(
+        func.typeof(column) == _literal("text"),
+        *(func.json_extract(column, _literal(f"$.{name}")) == value for name, value in filters.items())
+    )
+    binary_rows = select(key).where(
+        func.typeof(column) == _literal("blob"),
+        *(func.feature_value(column, name) == value for name, value in filters.items())
+    )
+    return key.in_(union_all(json_rows, binary_rows))
+
+
+# =============================================================================
+# PRÉDICATS
+# =============================================================================
+
+def features_match(db: Session, column, filters: Dict[str, str]):
+    """Prédicat SQL : toutes les features de `filters` ont la valeur demandée."""
+    if db.get_bind().dialect.name == "postgresql":
+        return type_coerce(column, JSONB).contains(filters)
+
+    _register_sqlite_functions(db)
+    return _sqlite_match(column, filters)
+
+
+def employees_filter(db: Session, filters: Dict[str, str]):
+    """Prédicat sur employees.features."""
+    return features_match(db, Employee.features, filters)
+
+
+def logs_filter(db: Session, filters: Dict[str, str]):
+    """
+    Prédicat sur les features d'un log : en ligne (logs historiques) ou
+    référencées dans feature_blobs (sous-requête sur les hash concernés).
+    """
+    inline = PredictionLog.__table__.c.input_features
+    matching_blobs = select(FeatureBlob.hash).where(features_match(db, FeatureBlob.payload, filters))
+    return or_(
+        and_(inline.isnot(None), features_match(db, inline, filters)),
+        PredictionLog.features_hash.in_(matching_blobs)
+    )
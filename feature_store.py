@@ -0,0 +1,202 @@
+"""
+Stockage dédupliqué des features d'entrée des prédictions
+
+Chaque jeu de features est sérialisé en JSON canonique (clés triées, sans
+espaces) puis identifié par son SHA-256. Le payload n'est écrit qu'une fois
+dans feature_blobs, encodé par payload_codec (JSON ou binaire) ; les logs
+de prédiction ne gardent que le hash. Re-scorer le même profil (ou le même
+employé via /predict/from_id) ne duplique donc plus le JSON dans
+predictions_logs.
+
+Chaque nouvelle référence re-date le blob (referenced_at, au plus une
+écriture par TOUCH_INTERVAL). delete_orphan_blobs ne supprime qu'un blob
+orphelin non référencé depuis ORPHAN_GRACE : une prédiction en cours qui
+réutilise un blob orphelin ne le voit pas disparaître avant son commit.
+
+Les schémas du codec "packed" sont conservés dans feature_schemas
+(init_schemas) : les payloads écrits avec le schéma d'un ancien modèle
+restent lisibles après un ré-entraînement, dans tout processus.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import delete, exists, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+import payload_codec
+from models import FeatureBlob, FeatureSchema, PredictionLog
+
+logger = logging.getLogger(__name__)
+
+# Lignes par INSERT multi-lignes (limite de paramètres SQLite : 32766)
+INSERT_CHUNK = 1000
+
+# Âge minimal (depuis la dernière référence) d'un blob orphelin supprimable
+ORPHAN_GRACE = timedelta(hours=float(os.getenv("FEATURE_BLOB_GRACE_HOURS", "24")))
+# Intervalle minimal entre deux mises à jour de referenced_at d'un même blob
+TOUCH_INTERVAL = timedelta(hours=1)
+
+
+def canonical_json(features: Dict[str, Any]) -> str:
+    """JSON canonique : même contenu → même texte, donc même hash (quel que soit le codec)."""
+    return json.dumps(features, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def content_hash(payload: str) -> str:
+    """SHA-256 hexadécimal du JSON canonique."""
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _last_referenced():
+    # Blobs antérieurs à la colonne referenced_at : date de création
+    return func.coalesce(FeatureBlob.referenced_at, FeatureBlob.created_at)
+
+
+def _touch(db: Session, digests: List[str], now: datetime) -> None:
+    """
+    Re-date les blobs existants référencés depuis plus de TOUCH_INTERVAL.
+
+    Exécuté AVANT l'insertion : sur PostgreSQL, la ligne re-datée reste
+    verrouillée jusqu'au commit du log, et un DELETE concurrent attend puis
+    la retrouve récente. Un blob déjà supprimé est simplement réinséré.
+    """
+    db.execute(
+        update(FeatureBlob)
+        .where(FeatureBlob.hash.in_(digests), _last_referenced() < now - TOUCH_INTERVAL)
+        .values(referenced_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def store_features(db: Session, features: Dict[str, Any]) -> str:
+    """
+    Enregistre les features si elles sont nouvelles et retourne leur hash.
+
+    L'insertion se fait dans la transaction courante, avec ON CONFLICT DO
+    NOTHING : deux requêtes concurrentes sur le même profil ne se gênent pas.
+    Le commit reste à la charge de l'appelant (avec le log de prédiction).
+    """
+    dialect = db.get_bind().dialect.name
+    canonical = canonical_json(features)
+    digest = content_hash(canonical)
+    now = datetime.utcnow()
+    values = {"hash": digest, "payload": payload_codec.encode(features, dialect, canonical), "referenced_at": now}
+    _touch(db, [digest], now)
+
+    if dialect == "postgresql":
+        stmt = postgresql.insert(FeatureBlob).values(**values).on_conflict_do_nothing(index_elements=["hash"])
+    elif dialect == "sqlite":
+        stmt = sqlite.insert(FeatureBlob).values(**values).on_conflict_do_nothing(index_elements=["hash"])
+    else:
+        if db.get(FeatureBlob, digest) is None:
+            db.add(FeatureBlob(**values))
+            db.flush()
+        return digest
+
+    db.execute(stmt)
+    return digest
+
+
+def store_many(db: Session, records: List[Dict[str, Any]]) -> List[str]:
+    """
+    Version par lot de `store_features` : un INSERT multi-lignes (ON CONFLICT
+    DO NOTHING) par tranche de INSERT_CHUNK blobs distincts.
+
+    Returns:
+        List[str]: Hash de chaque jeu de features, dans l'ordre de `records`
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        return [store_features(db, features) for features in records]
+
+    canonicals = [canonical_json(features) for features in records]
+    digests = [content_hash(canonical) for canonical in canonicals]
+
+    # Un même profil présent plusieurs fois dans le lot n'est écrit qu'une fois
+    unique = {digest: (features, canonical) for digest, features, canonical in zip(digests, records, canonicals)}
+    now = datetime.utcnow()
+    values = [
+        {"hash": digest, "payload": payload_codec.encode(features, dialect, canonical), "referenced_at": now}
+        for digest, (features, canonical) in unique.items()
+    ]
+    module = postgresql if dialect == "postgresql" else sqlite
+    for begin in range(0, len(values), INSERT_CHUNK):
+        chunk = values[begin:begin + INSERT_CHUNK]
+        _touch(db, [value["hash"] for value in chunk], now)
+        stmt = module.insert(FeatureBlob).values(chunk)
+        db.execute(stmt.on_conflict_do_nothing(index_elements=["hash"]))
+    return digests
+
+
+def delete_orphan_blobs(db: Session, grace: timedelta = ORPHAN_GRACE, now: Optional[datetime] = None) -> int:
+    """
+    Supprime les blobs qui ne sont plus référencés par aucun log
+    (typiquement après l'archivage des anciennes périodes) et dont la
+    dernière référence date de plus de `grace`.
+
+    Returns:
+        int: Nombre de blobs supprimés
+    """
+    cutoff = (now or datetime.utcnow()) - grace
+    referenced = exists().where(PredictionLog.features_hash == FeatureBlob.hash)
+    result = db.execute(delete(FeatureBlob).where(~referenced, _last_referenced() < cutoff))
+    db.commit()
+    return result.rowcount
+
+
+
+# =============================================================================
+# SCHÉMAS DU CODEC "PACKED"
+# =============================================================================
+
+def save_schema(bind, feature_names) -> int:
+    """Enregistre un schéma dans feature_schemas (sans effet s'il y est déjà)."""
+    names = list(feature_names)
+    sid = payload_codec.schema_id(names)
+    with bind.begin() as conn:
+        known = conn.execute(select(FeatureSchema.id).where(FeatureSchema.id == sid)).first()
+        if known is None:
+            conn.execute(insert(FeatureSchema).values(
+                id=sid, feature_names=json.dumps(names, ensure_ascii=False), created_at=datetime.utcnow()
+            ))
+    return sid
+
+
+def load_schema(bind, sid: int) -> Optional[List[str]]:
+    """Features d'un schéma enregistré (None s'il est inconnu)."""
+    with bind.connect() as conn:
+        names = conn.execute(
+            select(FeatureSchema.feature_names).where(FeatureSchema.id == sid)
+        ).scalar()
+    return json.loads(names) if names is not None else None
+
+
+def init_schemas(bind, feature_names=None) -> None:
+    """
+    À appeler au démarrage de chaque processus qui lit ou écrit des
+    features (API, import, archivage) :
+    - les schémas inconnus en mémoire sont relus dans feature_schemas ;
+    - `feature_names` (modèle servi) devient le schéma d'écriture et est
+      enregistré en base.
+    """
+    payload_codec.set_schema_resolver(lambda sid: load_schema(bind, sid))
+    if feature_names is None:
+        return
+    payload_codec.register_schema(feature_names)
+    try:
+        save_schema(bind, feature_names)
+    except SQLAlchemyError as e:
+        # Table absente (alembic upgrade head pas encore lancé)
+        if payload_codec.codec.name == "packed":
+            raise RuntimeError(
+                "❌ Codec 'packed' : schéma de features non enregistré dans feature_schemas "
+                "(lancez `alembic upgrade head`)"
+            ) from e
+        logger.warning(f"⚠️ Schéma de features non enregistré en base : {e}")
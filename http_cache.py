@@ -0,0 +1,75 @@
+"""
+Cache HTTP : ETag, Last-Modified, If-None-Match et Cache-Control par route
+
+- /predict/log/{log_id} : un log n'est jamais modifié (id jamais réattribués,
+  AUTOINCREMENT sous SQLite). L'ETag vient de l'id, de la date de création
+  et de la vue (full / lean) : la ligne est lue, mais un If-None-Match valide
+  reçoit un 304 sans décoder ni sérialiser les features.
+- /employees/{employee_id} : l'ETag vient des colonnes de version
+  (features_hash, target, ...) lues sans les features ; 304 sans lire ni
+  sérialiser le JSON. Pour les lignes sans features_hash (anciens imports),
+  l'ETag est le hash du corps de la réponse.
+- /stats : ETag = hash des compteurs en cache, jamais de requête dédiée.
+
+Les politiques Cache-Control sont dans CACHE_CONTROL (surchargeables par
+variables d'environnement).
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+from fastapi import Request, Response, status
+
+import fast_json
+
+# À incrémenter quand la représentation JSON d'une ressource change
+REPRESENTATION_VERSION = "1"
+
+CACHE_CONTROL = {
+    # Log immuable, mais protégé par API Key : cache du client seulement
+    "prediction_log": os.getenv("CACHE_CONTROL_PREDICTION_LOG", "private, max-age=31536000, immutable"),
+    "employee": os.getenv("CACHE_CONTROL_EMPLOYEE", "public, max-age=60, must-revalidate"),
+    "stats": os.getenv("CACHE_CONTROL_STATS", f"public, max-age={int(float(os.getenv('STATS_CACHE_TTL', '5')))}"),
+}
+
+
+def make_etag(*parts) -> str:
+    """ETag fort calculé à partir de valeurs JSON-sérialisables."""
+    digest = hashlib.sha256(fast_json.dumps([REPRESENTATION_VERSION, *parts], sort_keys=True)).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def http_date(moment: datetime) -> str:
+    """Date HTTP (RFC 7231) ; les datetime naïfs de la base sont en UTC."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return format_datetime(moment.astimezone(timezone.utc), usegmt=True)
+
+
+def matches(request: Request, etag: str) -> bool:
+    """Vrai si If-None-Match contient cet ETag (comparaison faible) ou '*'."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def headers(route: str, etag: str, last_modified: Optional[datetime] = None, vary: Optional[str] = None) -> Dict[str, str]:
+    """En-têtes de cache d'une réponse 200 ou 304."""
+    values = {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+    if last_modified is not None:
+        values["Last-Modified"] = http_date(last_modified)
+    if vary:
+        values["Vary"] = vary
+    return values
+
+
+def not_modified(route: str, etag: str, last_modified: Optional[datetime] = None, vary: Optional[str] = None) -> Response:
+    """Réponse 304 sans corps."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers(route, etag, last_modified, vary))
@@ -1,63 +1,424 @@
-import json
-import pandas as pd
+"""
+Import incrémental du dataset RH dans la table employees
+
+Les conversions se font colonne par colonne (NaN → null, cible, identifiants),
+les features sont encodées en une passe (payload_codec), puis chaque lot est
+rapproché de la base sur `Employee.identifier` :
+- identifiant inconnu → insertion en masse (insert() Core en executemany sur
+  SQLite, COPY ... FROM STDIN sur PostgreSQL) ;
+- features (hash SHA-256 du JSON canonique) ou cible modifiées → UPDATE ;
+- sinon la ligne est ignorée.
+
+La base n'est plus supprimée : predictions_logs est conservée et un
+rafraîchissement ne coûte que ce qui a changé.
+
+Pour les gros extraits (CSV, Parquet ou joblib), `--workers N` active
+l'import parallèle par morceaux (parallel_load) : mémoire bornée, encodage
+réparti sur N processus, un seul écrivain.
+
+Usage :
+    python import_data.py
+    python import_data.py --input data/synthetic_1m.joblib --batch-size 50000
+    python import_data.py --input extract.parquet --workers 8 --chunk-size 100000
+"""
+
+import argparse
+import io
 import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
 import joblib
-from database import SessionLocal, engine
+import pandas as pd
+from sqlalchemy import bindparam, insert, select, update
+
+from database import engine, require_current_schema
 from models import Base, Employee
+import feature_store
+import payload_codec
+
+DATASET_PATH = "01_classe.joblib"
+TARGET_COLUMN = "démission"
+BATCH_SIZE = 20000
+# Identifiants par requête IN lors du rapprochement avec la base
+LOOKUP_CHUNK = 5000
+# Import parallèle : lignes par morceau envoyé aux workers, lignes par commit
+CHUNK_SIZE = 50000
+COMMIT_ROWS = 200000
+# Le CSV perd les types : colonnes catégorielles codées en chiffres
+CSV_DTYPES = {"niveau_education": str}
+
+EMPLOYEE_COLUMNS = ["identifier", "features", "features_hash", "target", "created_at"]
+
+
+# =============================================================================
+# PRÉPARATION (VECTORISÉE)
+# =============================================================================
+
+def load_dataset(path: str = DATASET_PATH) -> pd.DataFrame:
+    """Charge le DataFrame sérialisé avec joblib."""
+    with open(path, "rb") as f:
+        return joblib.load(f)
+
+
+def read_source(path: str) -> pd.DataFrame:
+    """Charge une source entière : .csv, .parquet ou DataFrame joblib."""
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(path, dtype=CSV_DTYPES)
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    return load_dataset(path)
+
+
+def feature_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """
+    Features de chaque ligne en dictionnaires Python, NaN convertis en None.
 
-# Supprimer l'ancienne base si elle existe
-DB_PATH = "hr_analytics.db"
-if os.path.exists(DB_PATH):
-    print(f"🗑️  Suppression de l'ancienne base : {DB_PATH}")
-    os.remove(DB_PATH)
+    Les conversions sont faites colonne par colonne (tolist() donne des
+    scalaires Python) ; seules les colonnes qui ont des manquants passent par
+    where(). Les dictionnaires sont ensuite assemblés par zip, sans iterrows.
+    """
+    features = df.drop(columns=[TARGET_COLUMN])
+    columns = []
+    for name in features.columns:
+        column = features[name]
+        if column.hasnans:
+            column = column.astype(object).where(column.notna(), None)
+        columns.append(column.tolist())
+    names = features.columns.tolist()
+    return [dict(zip(names, values)) for values in zip(*columns)]
 
-# Recréer les tables
-print("📋 Création des tables...")
-Base.metadata.create_all(bind=engine)
 
-print("📂 Chargement du dataset...")
+def prepare_rows(df: pd.DataFrame, dialect: str) -> pd.DataFrame:
+    """
+    Construit les colonnes de la table employees pour tout le DataFrame.
 
-# Charger le fichier joblib
-with open('01_classe.joblib', 'rb') as f:
-    df = joblib.load(f)
+    Returns:
+        DataFrame aux colonnes EMPLOYEE_COLUMNS
+    """
+    target = df[TARGET_COLUMN]
+    now = datetime.utcnow()
+    records = feature_records(df)
+    canonical = [feature_store.canonical_json(features) for features in records]
 
-print(f"✅ Dataset chargé : {len(df)} lignes, {len(df.columns)} colonnes")
-print(f"Colonnes : {df.columns.tolist()}")
+    if dialect in payload_codec.NATIVE_JSON_DIALECTS or not payload_codec.codec.binary:
+        # JSON canonique : déjà calculé pour le hash (COPY attend aussi du texte)
+        payloads = canonical
+    else:
+        payloads = [payload_codec.encode(features, dialect) for features in records]
 
-# Connexion à la base de données
-db = SessionLocal()
+    return pd.DataFrame({
+        "identifier": "RECORD_" + df.index.astype(str),
+        "features": payloads,
+        "features_hash": [feature_store.content_hash(text) for text in canonical],
+        "target": target.astype(str).where(target.notna(), None),
+        "created_at": pd.Series(now, index=df.index, dtype=object),
+    }, index=df.index)
 
-print("\n📥 Importation dans la base de données...")
 
-count = 0
+# =============================================================================
+# RAPPROCHEMENT AVEC LA BASE
+# =============================================================================
 
-try:
-    for index, row in df.iterrows():
-        target_value = str(row['démission']) if pd.notna(row['démission']) else None
-        features_dict = row.drop('démission').to_dict()
-        features_dict = {k: (None if pd.isna(v) else v) for k, v in features_dict.items()}
-        features_json = json.dumps(features_dict)
-        
-        db_entry = Employee(
-            identifier=f"RECORD_{index}",
-            features=features_json,
-            target=target_value
+def existing_versions(conn, identifiers: List[str]) -> Dict[str, Tuple[str, str]]:
+    """(features_hash, target) des employés déjà présents, par identifiant."""
+    table = Employee.__table__
+    versions = {}
+    for start in range(0, len(identifiers), LOOKUP_CHUNK):
+        chunk = identifiers[start:start + LOOKUP_CHUNK]
+        result = conn.execute(
+            select(table.c.identifier, table.c.features_hash, table.c.target)
+            .where(table.c.identifier.in_(chunk))
         )
-        
-        db.add(db_entry)
-        count += 1
-        
-        if count % 100 == 0:
-            db.commit()
-            print(f"  → {count}/{len(df)} lignes importées...")
-    
-    db.commit()
-    print(f"\n✅ {count} lignes ajoutées à la table 'employees'")
-
-except Exception as e:
-    db.rollback()
-    print(f"❌ Erreur : {e}")
-    raise
-
-finally:
-    db.close()
\ No newline at end of file
+        versions.update({identifier: (digest, target) for identifier, digest, target in result})
+    return versions
+
+
+def classify(rows: pd.DataFrame, versions: Dict[str, Tuple[str, str]]) -> Tuple[pd.DataFrame, pd.DataFrame, int]:
+    """
+    Sépare un lot en lignes nouvelles, modifiées et inchangées.
+
+    Une ligne existante sans hash (importée avant la colonne features_hash)
+    est considérée comme modifiée : elle est réécrite une fois avec son hash.
+
+    Returns:
+        (nouvelles, modifiées, nombre d'inchangées)
+    """
+    known = rows["identifier"].map(versions)
+    is_new = known.isna()
+    stored_hash = known.map(lambda version: version[0] if isinstance(version, tuple) else None)
+    stored_target = known.map(lambda version: version[1] if isinstance(version, tuple) else None)
+    unchanged = ~is_new & (stored_hash == rows["features_hash"]) & (
+        (stored_target == rows["target"]) | (stored_target.isna() & rows["target"].isna())
+    )
+    changed = ~is_new & ~unchanged
+    return rows[is_new], rows[changed], int(unchanged.sum())
+
+
+# =============================================================================
+# ÉCRITURE
+# =============================================================================
+
+def insert_batches(conn, rows: pd.DataFrame, batch_size: int = BATCH_SIZE) -> None:
+    """insert() Core en executemany, par lots de `batch_size` lignes."""
+    statement = insert(Employee.__table__)
+    # Colonnes → listes Python une fois pour toutes (plus rapide que to_dict("records"))
+    columns = [rows[name].tolist() for name in EMPLOYEE_COLUMNS]
+    records = [dict(zip(EMPLOYEE_COLUMNS, values)) for values in zip(*columns)]
+    for start in range(0, len(records), batch_size):
+        conn.execute(statement, records[start:start + batch_size])
+
+
+def copy_rows(conn, rows: pd.DataFrame, batch_size: int = BATCH_SIZE) -> None:
+    """COPY FROM STDIN (PostgreSQL), un flux CSV par lot."""
+    cursor = conn.connection.driver_connection.cursor()
+    columns = ", ".join(EMPLOYEE_COLUMNS)
+    try:
+        for start in range(0, len(rows), batch_size):
+            buffer = io.StringIO()
+            rows.iloc[start:start + batch_size].to_csv(buffer, index=False, header=False)
+            buffer.seek(0)
+            cursor.copy_expert(
+                f"COPY {Employee.__tablename__} ({columns}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+    finally:
+        cursor.close()
+
+
+def update_rows(conn, rows: pd.DataFrame, batch_size: int = BATCH_SIZE) -> None:
+    """UPDATE en executemany des employés modifiés, par identifiant."""
+    table = Employee.__table__
+    statement = (
+        update(table)
+        .where(table.c.identifier == bindparam("b_identifier"))
+        .values(
+            features=bindparam("b_features"),
+            features_hash=bindparam("b_features_hash"),
+            target=bindparam("b_target"),
+        )
+    )
+    params = [
+        {"b_identifier": i, "b_features": f, "b_features_hash": h, "b_target": t}
+        for i, f, h, t in zip(
+            rows["identifier"].tolist(), rows["features"].tolist(),
+            rows["features_hash"].tolist(), rows["target"].tolist()
+        )
+    ]
+    for start in range(0, len(params), batch_size):
+        conn.execute(statement, params[start:start + batch_size])
+
+
+def write_rows(conn, rows: pd.DataFrame, dialect: str, batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+    """
+    Rapproche des lignes préparées avec la base puis les écrit, dans la
+    transaction courante de `conn`.
+
+    Returns:
+        dict: inserted, updated, unchanged
+    """
+    report = {"inserted": 0, "updated": 0, "unchanged": 0}
+    for start in range(0, len(rows), batch_size):
+        batch = rows.iloc[start:start + batch_size]
+        versions = existing_versions(conn, batch["identifier"].tolist())
+        new, changed, unchanged = classify(batch, versions)
+
+        if len(new):
+            if dialect == "postgresql":
+                copy_rows(conn, new, batch_size)
+            else:
+                insert_batches(conn, new, batch_size)
+        if len(changed):
+            update_rows(conn, changed, batch_size)
+
+        report["inserted"] += len(new)
+        report["updated"] += len(changed)
+        report["unchanged"] += unchanged
+    return report
+
+
+def _finish(report: Dict[str, float], begin: float) -> Dict[str, float]:
+    seconds = time.perf_counter() - begin
+    report["rows"] = report["inserted"] + report["updated"] + report["unchanged"]
+    report.update(seconds=seconds, rows_per_s=report["rows"] / seconds if seconds else 0.0)
+    return report
+
+
+def bulk_load(df: pd.DataFrame, target_engine=engine, batch_size: int = BATCH_SIZE) -> Dict[str, float]:
+    """
+    Importe le DataFrame dans employees de manière incrémentale.
+
+    Chaque lot de `batch_size` lignes est rapproché puis écrit dans sa
+    propre transaction.
+
+    Returns:
+        dict: inserted, updated, unchanged, rows, seconds, rows_per_s
+    """
+    begin = time.perf_counter()
+    dialect = target_engine.dialect.name
+    rows = prepare_rows(df, dialect)
+    report = {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    for start in range(0, len(rows), batch_size):
+        with target_engine.begin() as conn:
+            counts = write_rows(conn, rows.iloc[start:start + batch_size], dialect, batch_size)
+        for key, value in counts.items():
+            report[key] += value
+
+    return _finish(report, begin)
+
+
+# =============================================================================
+# IMPORT PARALLÈLE PAR MORCEAUX
+# =============================================================================
+
+def iter_chunks(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Découpe une source en DataFrames de `chunk_size` lignes au plus.
+
+    - CSV : lecture en flux (read_csv chunksize), l'index continue d'un
+      morceau à l'autre ;
+    - Parquet : lecture par row groups (pyarrow iter_batches), index = rang
+      de la ligne dans le fichier ;
+    - joblib : le pickle est chargé en entier (format non découpable), puis
+      découpé. Seuls les CSV / Parquet gardent la mémoire bornée.
+    """
+    suffix = Path(path).suffix.lower()
+    if suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=CSV_DTYPES)
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        offset = 0
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            chunk = batch.to_pandas()
+            chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+            offset += len(chunk)
+            yield chunk
+    else:
+        df = load_dataset(path)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def _init_worker(codec_name: str, compression: Optional[str], schema: Optional[tuple]) -> None:
+    """Reproduit la configuration du codec du processus parent dans un worker."""
+    payload_codec.configure(codec_name, compression)
+    if schema is not None:
+        payload_codec.register_schema(schema)
+
+
+def parallel_load(
+    path: str,
+    target_engine=engine,
+    workers: Optional[int] = None,
+    chunk_size: int = CHUNK_SIZE,
+    commit_rows: int = COMMIT_ROWS,
+    batch_size: int = BATCH_SIZE
+) -> Dict[str, float]:
+    """
+    Import incrémental d'un gros fichier avec plusieurs processus.
+
+    - le lecteur (processus principal) découpe la source en morceaux ;
+    - `workers` processus normalisent et encodent les features (prepare_rows) ;
+    - un seul écrivain (processus principal) rapproche et écrit les morceaux
+      dans l'ordre, avec un commit toutes les `commit_rows` lignes.
+
+    Au plus 2 × `workers` morceaux sont en vol : la mémoire reste bornée
+    quelle que soit la taille du fichier (hors joblib, voir iter_chunks).
+
+    Returns:
+        dict: inserted, updated, unchanged, rows, seconds, rows_per_s
+    """
+    begin = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    dialect = target_engine.dialect.name
+    report = {"inserted": 0, "updated": 0, "unchanged": 0}
+    codec = payload_codec.codec
+    initargs = (codec.name, getattr(codec, "compression", None), payload_codec.current_schema())
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool, \
+            target_engine.connect() as conn:
+        in_flight = deque()
+        uncommitted = 0
+
+        def write_next():
+            nonlocal uncommitted
+            rows = in_flight.popleft().result()
+            counts = write_rows(conn, rows, dialect, batch_size)
+            for key, value in counts.items():
+                report[key] += value
+            uncommitted += len(rows)
+            if uncommitted >= commit_rows:
+                conn.commit()
+                uncommitted = 0
+
+        for chunk in iter_chunks(path, chunk_size):
+            in_flight.append(pool.submit(prepare_rows, chunk, dialect))
+            if len(in_flight) >= 2 * workers:
+                write_next()
+        while in_flight:
+            write_next()
+        conn.commit()
+
+    return _finish(report, begin)
+
+
+# =============================================================================
+# LIGNE DE COMMANDE
+# =============================================================================
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importe le dataset RH dans la table employees")
+    parser.add_argument("--input", default=DATASET_PATH, help="Source : .joblib (DataFrame), .csv ou .parquet")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Lignes par lot")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Processus d'encodage (0 = import simple en un seul processus)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Import parallèle : lignes par morceau")
+    parser.add_argument("--commit-rows", type=int, default=COMMIT_ROWS, help="Import parallèle : lignes par commit")
+    args = parser.parse_args()
+
+    # Créer les tables manquantes (la base existante est conservée). Les
+    # colonnes ajoutées depuis (ex. employees.features_hash) viennent des
+    # migrations Alembic.
+    print("📋 Vérification des tables...")
+    Base.metadata.create_all(bind=engine)
+    require_current_schema(engine)
+
+    # Format "packed" : même ordre de features que le modèle servi par l'API,
+    # enregistré dans feature_schemas
+    feature_names = None
+    if payload_codec.codec.name == "packed":
+        feature_names = joblib.load("models/xgboost_pipeline.joblib")["feature_names"]
+    feature_store.init_schemas(engine, feature_names)
+    print(f"🗜️  Codec des features : {payload_codec.codec.name}")
+
+    if args.workers:
+        print(f"\n📥 Import parallèle de {args.input} ({args.workers} workers, "
+              f"morceaux de {args.chunk_size} lignes)...")
+        report = parallel_load(
+            args.input, engine, args.workers, args.chunk_size, args.commit_rows, args.batch_size
+        )
+    else:
+        print("📂 Chargement du dataset...")
+        df = read_source(args.input)
+        print(f"✅ Dataset chargé : {len(df)} lignes, {len(df.columns)} colonnes")
+        print(f"Colonnes : {df.columns.tolist()}")
+
+        print("\n📥 Importation dans la base de données...")
+        report = bulk_load(df, engine, args.batch_size)
+
+    print(f"\n✅ {report['rows']} lignes traitées en {report['seconds']:.1f}s "
+          f"({report['rows_per_s']:.0f} lignes/s)")
+    print(f"   ➕ {report['inserted']} insérées")
+    print(f"   ✏️  {report['updated']} mises à jour")
+    print(f"   ⏭️  {report['unchanged']} inchangées")
+
+
+if __name__ == "__main__":
+    main()
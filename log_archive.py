@@ -0,0 +1,283 @@
+"""
+Archivage des logs de prédiction en fichiers Parquet compressés
+
+Les mois entièrement sortis de la fenêtre de rétention sont exportés en
+Parquet (compression zstd, un fichier par mois), puis retirés de la table
+chaude : détachement + suppression de la partition sur PostgreSQL,
+DELETE de la période sur SQLite. Un manifeste (manifest.json) garde la plage
+d'id de chaque fichier pour que /predict/log/{log_id} puisse retrouver un
+log archivé en n'ouvrant qu'un seul fichier.
+
+Usage :
+    python log_archive.py --retention-days 90
+    python log_archive.py --retention-days 90 --vacuum   # SQLite : rendre l'espace disque
+
+Nécessite pyarrow (lecture / écriture Parquet via pandas).
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+
+import partitioning
+import feature_store
+import payload_codec
+from models import FeatureBlob, PredictionLog
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = os.getenv("LOG_ARCHIVE_DIR", "archive/predictions_logs")
+RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "90"))
+MANIFEST_NAME = "manifest.json"
+
+ARCHIVE_COLUMNS = [
+    "id", "employee_id", "input_features", "prediction_result",
+    "confidence_score", "model_version", "created_at"
+]
+
+
+# =============================================================================
+# MANIFESTE
+# =============================================================================
+
+_manifest_cache: Dict[str, Any] = {"path": None, "mtime": None, "data": {}}
+_manifest_lock = threading.Lock()
+
+
+def load_manifest(archive_dir: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Charge le manifeste (mis en cache tant que le fichier ne change pas)."""
+    path = Path(archive_dir or ARCHIVE_DIR) / MANIFEST_NAME
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return {}
+
+    with _manifest_lock:
+        if _manifest_cache["path"] != str(path) or _manifest_cache["mtime"] != mtime:
+            _manifest_cache.update(
+                path=str(path),
+                mtime=mtime,
+                data=json.loads(path.read_text(encoding="utf-8"))
+            )
+        return _manifest_cache["data"]
+
+
+def archive_version(archive_dir: Optional[str] = None) -> Optional[int]:
+    """
+    Version des archives (date de modification du manifeste, None sans
+    archive) : change à chaque mois archivé, y compris par un autre processus.
+    """
+    try:
+        return (Path(archive_dir or ARCHIVE_DIR) / MANIFEST_NAME).stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def _save_manifest(archive_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    tmp = archive_dir / f"{MANIFEST_NAME}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, archive_dir / MANIFEST_NAME)
+
+
+# =============================================================================
+# ARCHIVAGE
+# =============================================================================
+
+def _period_filter(period: datetime):
+    return (
+        (PredictionLog.created_at >= period)
+        & (PredictionLog.created_at < partitioning.next_month(period))
+    )
+
+
+def resolved_logs_select():
+    """
+    SELECT des colonnes ARCHIVE_COLUMNS avec les features résolues (en ligne
+    ou dans feature_blobs) : la sortie est autonome, sans lien vers les blobs.
+    """
+    table = PredictionLog.__table__
+    blobs = FeatureBlob.__table__
+    columns = [
+        func.coalesce(table.c.input_features, blobs.c.payload).label(name)
+        if name == "input_features" else table.c[name]
+        for name in ARCHIVE_COLUMNS
+    ]
+    return select(*columns).select_from(
+        table.outerjoin(blobs, table.c.features_hash == blobs.c.hash)
+    )
+
+
+def _read_period(db: Session, period: datetime) -> pd.DataFrame:
+    """Lit les logs d'un mois (élagage de partition sur PostgreSQL)."""
+    result = db.execute(
+        resolved_logs_select()
+        .where(_period_filter(period))
+        .order_by(PredictionLog.id)
+    )
+    df = pd.DataFrame(result.fetchall(), columns=ARCHIVE_COLUMNS)
+    # Payloads binaires → JSON : l'archive ne dépend pas du codec
+    df["input_features"] = df["input_features"].map(payload_codec.to_json)
+    return df
+
+
+def _drop_period(db: Session, period: datetime) -> None:
+    """Retire un mois de la table chaude."""
+    conn = db.connection()
+    if partitioning.partition_exists(conn, period):
+        name = partitioning.partition_name(period)
+        conn.execute(text(f"ALTER TABLE {PredictionLog.__tablename__} DETACH PARTITION {name}"))
+        conn.execute(text(f"DROP TABLE {name}"))
+    # Sur PostgreSQL, attrape aussi les lignes tombées dans la partition DEFAULT
+    conn.execute(delete(PredictionLog.__table__).where(_period_filter(period)))
+
+
+def archive_old_periods(
+    db: Session,
+    retention_days: int = RETENTION_DAYS,
+    archive_dir: Optional[str] = None,
+    now: Optional[datetime] = None
+) -> List[Dict[str, Any]]:
+    """
+    Archive en Parquet tous les mois entièrement plus vieux que la rétention.
+
+    Chaque mois est traité dans sa propre transaction : le fichier et le
+    manifeste sont écrits AVANT la suppression des lignes, donc un échec
+    en cours de route ne perd jamais de données (au pire, le mois sera
+    réécrit au passage suivant).
+
+    Returns:
+        list: Un résumé {period, rows, file} par mois archivé
+    """
+    now = now or datetime.utcnow()
+    archive_dir = archive_dir or ARCHIVE_DIR
+    cutoff = partitioning.month_start(now - timedelta(days=retention_days))
+
+    oldest = db.execute(select(func.min(PredictionLog.created_at))).scalar()
+    if oldest is None:
+        return []
+
+    directory = Path(archive_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = dict(load_manifest(archive_dir))
+    summary = []
+
+    for period in partitioning.iter_months(oldest, cutoff):
+        df = _read_period(db, period)
+        if df.empty:
+            _drop_period(db, period)
+            db.commit()
+            continue
+
+        filename = f"{partitioning.partition_name(period)}.parquet"
+        if (directory / filename).exists():
+            # Logs arrivés en retard pour un mois déjà archivé : on fusionne
+            previous = pd.read_parquet(directory / filename)
+            df = pd.concat([previous, df]).drop_duplicates("id").sort_values("id")
+
+        tmp_path = directory / f"{filename}.tmp"
+        df.to_parquet(tmp_path, compression="zstd", index=False)
+        os.replace(tmp_path, directory / filename)
+
+        manifest[filename] = {
+            "period_start": period.isoformat(),
+            "period_end": partitioning.next_month(period).isoformat(),
+            "min_id": int(df["id"].min()),
+            "max_id": int(df["id"].max()),
+            "rows": int(len(df))
+        }
+        _save_manifest(directory, manifest)
+
+        _drop_period(db, period)
+        db.commit()
+
+        logger.info(f"📦 {len(df)} logs de {period:%Y-%m} archivés dans {filename}")
+        summary.append({"period": f"{period:%Y-%m}", "rows": int(len(df)), "file": filename})
+
+    return summary
+
+
+# =============================================================================
+# LECTURE
+# =============================================================================
+
+def find_archived_log(log_id: int, archive_dir: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Cherche un log dans les archives Parquet.
+
+    Seuls les fichiers dont la plage d'id contient `log_id` sont ouverts,
+    avec un filtre poussé au lecteur Parquet.
+
+    Returns:
+        dict | None: Les colonnes du log, ou None s'il n'est pas archivé
+    """
+    archive_dir = archive_dir or ARCHIVE_DIR
+    for filename, entry in load_manifest(archive_dir).items():
+        if not entry["min_id"] <= log_id <= entry["max_id"]:
+            continue
+
+        df = pd.read_parquet(
+            Path(archive_dir) / filename,
+            filters=[("id", "==", log_id)]
+        )
+        if df.empty:
+            continue
+
+        row = df.iloc[0].to_dict()
+        row["created_at"] = pd.Timestamp(row["created_at"]).to_pydatetime()
+        if pd.isna(row["employee_id"]):
+            row["employee_id"] = None
+        else:
+            row["employee_id"] = int(row["employee_id"])
+        return row
+
+    return None
+
+
+# =============================================================================
+# LIGNE DE COMMANDE
+# =============================================================================
+
+if __name__ == "__main__":
+    from database import SessionLocal, engine
+
+    parser = argparse.ArgumentParser(description="Archive les logs de prédiction anciens en Parquet")
+    parser.add_argument("--retention-days", type=int, default=RETENTION_DAYS,
+                        help="Nombre de jours gardés dans la table chaude")
+    parser.add_argument("--archive-dir", default=ARCHIVE_DIR,
+                        help="Dossier de destination des fichiers Parquet")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="SQLite : VACUUM après archivage pour rendre l'espace disque")
+    args = parser.parse_args()
+
+    partitioning.setup_partitioning(engine)
+    # Features "packed" : schémas relus dans feature_schemas
+    feature_store.init_schemas(engine)
+
+    db = SessionLocal()
+    try:
+        archived = archive_old_periods(db, args.retention_days, args.archive_dir)
+        orphans = feature_store.delete_orphan_blobs(db)
+    finally:
+        db.close()
+
+    for item in archived:
+        print(f"📦 {item['period']} : {item['rows']} logs → {item['file']}")
+    print(f"✅ {len(archived)} période(s) archivée(s) dans {args.archive_dir}")
+    print(f"🧹 {orphans} jeu(x) de features orphelin(s) supprimé(s)")
+
+    if args.vacuum and engine.dialect.name == "sqlite":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("VACUUM"))
+        print("🧹 VACUUM terminé")
+
+    # Préparer les partitions des prochains mois (PostgreSQL)
+    partitioning.prepare_upcoming_partitions(engine)
@@ -0,0 +1,186 @@
+"""
+Export en flux de la table predictions_logs (CSV, NDJSON, Parquet, msgpack)
+
+/predictions/logs/export parcourt la table une seule fois, triée sur
+(created_at, id), avec un curseur côté serveur (stream_results + yield_per) :
+la mémoire reste constante quelle que soit la taille de l'export, là où
+/predictions/logs oblige à paginer par OFFSET.
+
+Les features sont résolues comme pour l'archive (log_archive) : en ligne ou
+dans feature_blobs, toujours restituées en JSON quel que soit le codec.
+
+Le format Parquet nécessite pyarrow (un row group par lot de YIELD_PER lignes),
+le format msgpack le paquet msgpack (une map par log, concaténées).
+"""
+
+import csv
+import io
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+import fast_json
+import msgpack_io
+import payload_codec
+from log_archive import ARCHIVE_COLUMNS, resolved_logs_select
+from models import PredictionLog
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # dépendance optionnelle (format parquet)
+    pa = None
+    pq = None
+
+YIELD_PER = int(os.getenv("LOG_EXPORT_YIELD_PER", "5000"))
+
+EXPORT_COLUMNS = ARCHIVE_COLUMNS
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "msgpack": (msgpack_io.MEDIA_TYPE, "msgpack"),
+}
+
+
+def export_query(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    model_version: Optional[str] = None
+):
+    """
+    SELECT de l'export : période [start, end[ et version de modèle, servi par
+    ix_predictions_logs_created_at_id (ou ..._model_version_created_at).
+    """
+    query = resolved_logs_select()
+    if start is not None:
+        query = query.where(PredictionLog.created_at >= start)
+    if end is not None:
+        query = query.where(PredictionLog.created_at < end)
+    if model_version is not None:
+        query = query.where(PredictionLog.model_version == model_version)
+    return query.order_by(PredictionLog.created_at, PredictionLog.id)
+
+
+def iter_batches(db: Session, query, yield_per: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+    """Lots de lignes (dict) lus via un curseur côté serveur."""
+    result = db.execute(query.execution_options(stream_results=True, yield_per=yield_per or YIELD_PER))
+    try:
+        for partition in result.partitions():
+            rows = [dict(row._mapping) for row in partition]
+            for row in rows:
+                row["input_features"] = payload_codec.to_json(row["input_features"])
+            yield rows
+    finally:
+        result.close()
+
+
+# =============================================================================
+# FORMATS
+# =============================================================================
+
+def _iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def stream_csv(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[str]:
+    """CSV avec en-tête, features en JSON dans la colonne input_features."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, lineterminator="\n")
+    writer.writeheader()
+    for rows in batches:
+        for row in rows:
+            row["created_at"] = _iso(row["created_at"])
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def stream_ndjson(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Un objet JSON par ligne, features en objet (pas en chaîne)."""
+    for rows in batches:
+        lines = []
+        for row in rows:
+            if row["input_features"] is not None:
+                row["input_features"] = fast_json.loads(row["input_features"])
+            lines.append(fast_json.dumps(row))
+        if lines:
+            yield b"\n".join(lines) + b"\n"
+
+
+def stream_msgpack(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Une map msgpack par log (à lire avec msgpack.Unpacker), features en map."""
+    for rows in batches:
+        for row in rows:
+            if row["input_features"] is not None:
+                row["input_features"] = fast_json.loads(row["input_features"])
+        if rows:
+            yield b"".join(msgpack_io.packb(row) for row in rows)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Fichier en écriture seule dont on récupère les octets au fil de l'eau."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("id", pa.int64()),
+        ("employee_id", pa.int64()),
+        ("input_features", pa.string()),
+        ("prediction_result", pa.string()),
+        ("confidence_score", pa.float64()),
+        ("model_version", pa.string()),
+        ("created_at", pa.timestamp("us")),
+    ])
+
+
+def stream_parquet(batches: Iterator[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """Fichier Parquet (zstd) écrit row group par row group."""
+    if pq is None:
+        raise RuntimeError("❌ L'export Parquet nécessite le paquet pyarrow")
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="zstd")
+    try:
+        for rows in batches:
+            writer.write_table(pa.Table.from_pylist(rows, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+STREAMERS = {
+    "csv": stream_csv, "ndjson": stream_ndjson, "parquet": stream_parquet, "msgpack": stream_msgpack
+}
+
+
+def stream(db: Session, fmt: str, query, yield_per: Optional[int] = None) -> Iterator:
+    """Contenu de l'export au format `fmt` (clé de FORMATS)."""
+    return STREAMERS[fmt](iter_batches(db, query, yield_per))
@@ -1,19 +1,43 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Security
+from fastapi import FastAPI, Depends, HTTPException, status, Security, Request, Response, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
+from fast_json import FastJSONResponse
 from fastapi.security import APIKeyHeader
-from sqlalchemy.orm import Session
-from database import get_db
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session, defer, selectinload
+from database import get_db, get_read_db, is_replica_session, naive_utc, SessionLocal, engine
 from models import Employee, PredictionLog
 from schemas import (
     EmployeeResponse, 
     PredictionFromIdRequest, 
     PredictionNewEmployeeRequest,
     PredictionLogResponse,
-    PredictionDetailedResponse
+    PredictionDetailedResponse,
+    PredictionBatchRequest,
+    PredictionBatchResponse,
+    PredictionFromIdsRequest,
+    PredictionFromIdsResponse
 )
 import json
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from model_loader import model_loader
+import pagination
+from stats_cache import stats_cache
+from prediction_analytics import analytics_cache
+import log_archive
+import log_export
+import partitioning
+import feature_store
+import batch_scoring
+import payload_codec
+import feature_filters
+import projection
+import http_cache
+import admission
+import deadlines
+import msgpack_io
+from deadlines import Deadline
+from compression import CompressionMiddleware
 import logging
 import os
 from dotenv import load_dotenv
@@ -75,13 +99,28 @@ def verify_api_key(api_key: str = Security(api_key_header)):
 app = FastAPI(
     title="API de Prédiction de Démission",
     description="API pour prédire les démissions d'employés avec XGBoost",
-    version="2.0.0"
+    version="2.0.0",
+    # orjson si installé (voir fast_json.py)
+    default_response_class=FastJSONResponse
 )
 
+# Compression brotli / gzip négociée (listes, exports ; pas les petites réponses)
+app.add_middleware(CompressionMiddleware)
+
+def prepare():
+    """Charger le modèle ML et préparer la base (une fois par processus)"""
+    model_loader.load_model()
+    # Ordre des features du codec "packed" (enregistré dans feature_schemas)
+    feature_store.init_schemas(engine, model_loader.feature_names)
+    # PostgreSQL : partitions mensuelles des prochains mois pour predictions_logs
+    partitioning.prepare_upcoming_partitions(engine)
+
 @app.on_event("startup")
 def startup_event():
     """Charger le modèle ML au démarrage de l'application"""
-    model_loader.load_model()
+    # Déjà fait par serve.py dans le processus parent, avant le fork des workers
+    if model_loader.pipeline is None:
+        prepare()
 
 # =============================================================================
 # ENDPOINTS DE BASE (PUBLICS - SANS AUTHENTIFICATION)
@@ -131,43 +170,100 @@ def health_check():
 
 @app.get("/employees", response_model=List[EmployeeResponse])
 def get_employees(
+    response: Response,
     skip: int = 0, 
     limit: int = 10, 
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = None,
+    filters: dict = Depends(feature_filters.query_filters),
+    fields: Optional[List[str]] = Depends(projection.employee_fields),
+    db: Session = Depends(get_read_db)
 ):
     """
     📋 Récupérer les employés (pagination) - PUBLIC
     
     Aucune authentification requise pour consulter la liste.
+    
+    - `cursor` : jeton renvoyé dans le header X-Next-Cursor de la page
+      précédente (pagination keyset sur l'id, coût constant)
+    - `skip` : ancienne pagination par OFFSET, conservée pour compatibilité
+    - `departement`, `poste`, `heure_supplementaires` : filtres sur les
+      features, évalués par la base (index GIN sur PostgreSQL)
+    - `fields` : colonnes à renvoyer (ex. `id,identifier,target`), les
+      autres ne sont pas lues en base
     """
-    employees = db.query(Employee).offset(skip).limit(limit).all()
+    query = db.query(Employee).order_by(Employee.id)
+    if fields:
+        query = query.options(*projection.employee_options(fields))
+    
+    if filters:
+        query = query.filter(feature_filters.employees_filter(db, filters))
+    
+    if cursor:
+        try:
+            last_id = pagination.decode_employees_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.filter(Employee.id > last_id)
+    elif skip:
+        query = query.offset(skip)
+    
+    employees = query.limit(limit).all()
+    
+    # Page pleine → il peut y avoir une suite
+    if employees and len(employees) == limit:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.employees_cursor(employees[-1])
+    
+    if fields:
+        return FastJSONResponse(projection.project(employees, fields), headers=dict(response.headers))
     return employees
 
 @app.get("/employees/count")
-def count_employees(db: Session = Depends(get_db)):
+def count_employees(background_tasks: BackgroundTasks, db: Session = Depends(get_read_db)):
     """
     🔢 Compter le nombre total d'employés - PUBLIC
     
     Aucune authentification requise.
+    Servi depuis les mêmes compteurs en cache que /stats.
     """
-    count = db.query(Employee).count()
-    return {"total": count}
+    counters = stats_cache.get(db, background_tasks)
+    return {"total": counters["employees"]["total"]}
 
 @app.get("/employees/{employee_id}", response_model=EmployeeResponse)
-def get_employee_by_id(employee_id: int, db: Session = Depends(get_db)):
+def get_employee_by_id(employee_id: int, request: Request, db: Session = Depends(get_read_db)):
     """
     👤 Récupérer un employé spécifique - PUBLIC
     
     Aucune authentification requise pour consulter.
+    
+    ETag calculé sans lire les features (features_hash) : un If-None-Match
+    à jour reçoit un 304 sans décodage ni sérialisation.
     """
     try:
-        employee = db.query(Employee).filter(Employee.id == employee_id).first()
+        # Les features ne sont lues que si la réponse doit être envoyée
+        employee = db.query(Employee).options(defer(Employee.features)).filter(Employee.id == employee_id).first()
         if not employee:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Employé avec l'ID {employee_id} non trouvé"
             )
-        return employee
+        
+        etag = None
+        if employee.features_hash is not None:
+            etag = http_cache.make_etag(
+                "employee", employee.id, employee.identifier, employee.target,
+                employee.created_at, employee.features_hash
+            )
+            if http_cache.matches(request, etag):
+                return http_cache.not_modified("employee", etag)
+        
+        content = EmployeeResponse.model_validate(employee).model_dump(mode="json")
+        if etag is None:
+            # Anciennes lignes sans features_hash : ETag sur le contenu
+            etag = http_cache.make_etag("employee", content)
+            if http_cache.matches(request, etag):
+                return http_cache.not_modified("employee", etag)
+        
+        return FastJSONResponse(content, headers=http_cache.headers("employee", etag))
     
     except HTTPException:
         raise
@@ -179,14 +275,75 @@ def get_employee_by_id(employee_id: int, db: Session = Depends(get_db)):
             detail="Erreur interne lors de la récupération de l'employé"
         )
 
+@app.get("/employees/{employee_id}/predictions", response_model=List[PredictionLogResponse])
+def get_employee_predictions(
+    employee_id: int,
+    response: Response,
+    limit: int = 10,
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    fields: Optional[List[str]] = Depends(projection.log_fields),
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
+):
+    """
+    🕒 Historique des prédictions d'un employé - 🔒 PROTÉGÉ
+    
+    ⚠️ Requiert une API Key valide dans le header X-API-Key
+    
+    Du plus récent au plus ancien, servi par l'index
+    ix_predictions_logs_employee_id_created_at. Pagination par `cursor`
+    (header X-Next-Cursor). `since` ne renvoie que les prédictions
+    postérieures à cette date (synchronisation incrémentale). `fields` :
+    voir /predictions/logs.
+    """
+    if db.get(Employee, employee_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Employé avec l'ID {employee_id} non trouvé"
+        )
+    
+    query = db.query(PredictionLog).options(
+        *(projection.log_options(fields) if fields else [selectinload(PredictionLog.features_blob)])
+    ).filter(
+        PredictionLog.employee_id == employee_id
+    ).order_by(
+        PredictionLog.created_at.desc(),
+        PredictionLog.id.desc()
+    )
+    
+    if since is not None:
+        query = query.filter(PredictionLog.created_at > since)
+    
+    if cursor:
+        try:
+            last_created_at, last_id = pagination.decode_logs_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.filter(
+            tuple_(PredictionLog.created_at, PredictionLog.id) < tuple_(last_created_at, last_id)
+        )
+    
+    logs = query.limit(limit).all()
+    
+    if logs and len(logs) == limit:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.logs_cursor(logs[-1])
+    
+    if fields:
+        return FastJSONResponse(projection.project(logs, fields), headers=dict(response.headers))
+    return logs
+
 # =============================================================================
 # ENDPOINT 1 : PRÉDICTION À PARTIR D'UN ID EXISTANT 🔒 PROTÉGÉ
 # =============================================================================
 
-@app.post("/predict/from_id/{employee_id}", response_model=PredictionDetailedResponse)
+@app.post("/predict/from_id/{employee_id}", response_model=PredictionDetailedResponse,
+          dependencies=[Depends(admission.limit("predict_from_id"))])
 def predict_from_employee_id(
     employee_id: int,
-    db: Session = Depends(get_db),
+    lean: bool = Depends(projection.prediction_view),
+    deadline: Deadline = Depends(deadlines.for_route("predict_from_id")),
+    db: Session = Depends(deadlines.session("predict_from_id")),
     api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
 ):
     """
@@ -197,6 +354,7 @@ def predict_from_employee_id(
     - Récupère les features de l'employé depuis la DB
     - Fait une prédiction avec le modèle
     - Loggue la prédiction dans predictions_logs
+    - Échéance (X-Request-Timeout) vérifiée avant chaque étape : 504 si dépassée
     """
     try:
         # Vérifier que le modèle est chargé
@@ -207,6 +365,7 @@ def predict_from_employee_id(
             )
         
         # 1. Récupérer l'employé
+        deadline.check("lecture de l'employé")
         employee = db.query(Employee).filter(Employee.id == employee_id).first()
         if not employee:
             raise HTTPException(
@@ -214,18 +373,21 @@ def predict_from_employee_id(
                 detail=f"Employé {employee_id} non trouvé"
             )
         
-        # 2. Décoder les features (JSON → dict)
-        features = json.loads(employee.features)
+        # 2. Décoder les features (JSON ou binaire → dict)
+        deadline.check("décodage des features")
+        features = payload_codec.decode(employee.features)
         
         # 3. Faire la prédiction
+        deadline.check("prédiction")
         prediction_result = model_loader.predict(features)
         
-        # 4. Logger dans predictions_logs
-        features_json = json.dumps(features)
+        # 4. Logger dans predictions_logs (features dédupliquées par hash)
+        deadline.check("enregistrement du log")
+        features_hash = feature_store.store_features(db, features)
         
         log_entry = PredictionLog(
             employee_id=employee_id,
-            input_features=features_json,
+            features_hash=features_hash,
             prediction_result=prediction_result['prediction'],
             confidence_score=prediction_result['confidence_score'],
             model_version="XGBoost_Light_100%"
@@ -233,18 +395,22 @@ def predict_from_employee_id(
         
         db.add(log_entry)
         db.commit()
+        deadline.complete()
         db.refresh(log_entry)
+        stats_cache.record_prediction(log_entry.prediction_result)
         
-        # 5. Retourner la réponse détaillée
-        return PredictionDetailedResponse(
-            log_id=log_entry.id,
-            employee_id=employee_id,
-            features=features,
-            prediction=prediction_result['prediction'],
-            confidence_score=prediction_result['confidence_score'],
-            model_version="XGBoost_Light_100%",
-            timestamp=log_entry.created_at
-        )
+        # 5. Retourner la réponse détaillée (déjà sérialisable : pas de re-validation)
+        content = {
+            "log_id": log_entry.id,
+            "employee_id": employee_id,
+            "features": features,
+            "prediction": prediction_result['prediction'],
+            "probability": prediction_result['probability'],
+            "confidence_score": prediction_result['confidence_score'],
+            "model_version": "XGBoost_Light_100%",
+            "timestamp": log_entry.created_at
+        }
+        return FastJSONResponse(projection.lean(content) if lean else content)
     
     except HTTPException:
         raise
@@ -252,6 +418,9 @@ def predict_from_employee_id(
     except Exception as e:
         logger.error(f"Erreur lors de la prédiction pour l'employé {employee_id}: {e}")
         db.rollback()
+        if deadline.expired():
+            # Requête SQL interrompue par le timeout aligné sur l'échéance
+            raise deadline.exceeded("base de données")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la prédiction : {str(e)}"
@@ -261,10 +430,15 @@ def predict_from_employee_id(
 # ENDPOINT 2 : PRÉDICTION POUR UN NOUVEL EMPLOYÉ 🔒 PROTÉGÉ
 # =============================================================================
 
-@app.post("/predict/new_employee", response_model=PredictionDetailedResponse)
+@app.post("/predict/new_employee", response_model=PredictionDetailedResponse,
+          dependencies=[Depends(admission.limit("predict_new_employee"))],
+          openapi_extra=msgpack_io.openapi(PredictionNewEmployeeRequest))
 def predict_new_employee(
-    request: PredictionNewEmployeeRequest,
-    db: Session = Depends(get_db),
+    request: PredictionNewEmployeeRequest = Depends(msgpack_io.body(PredictionNewEmployeeRequest)),
+    lean: bool = Depends(projection.prediction_view),
+    binary: bool = Depends(msgpack_io.accepts_msgpack),
+    deadline: Deadline = Depends(deadlines.for_route("predict_new_employee")),
+    db: Session = Depends(deadlines.session("predict_new_employee")),
     api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
 ):
     """
@@ -272,9 +446,10 @@ def predict_new_employee(
     
     ⚠️ Requiert une API Key valide dans le header X-API-Key
     
-    - Reçoit les features en JSON
+    - Reçoit les features en JSON (ou msgpack : Content-Type application/x-msgpack)
     - Fait une prédiction avec le modèle
     - Loggue la prédiction dans predictions_logs
+    - Échéance (X-Request-Timeout) vérifiée avant chaque étape : 504 si dépassée
     """
     try:
         # Vérifier que le modèle est chargé
@@ -285,14 +460,16 @@ def predict_new_employee(
             )
         
         # 1. Faire la prédiction
+        deadline.check("prédiction")
         prediction_result = model_loader.predict(request.features)
         
-        # 2. Logger dans predictions_logs
-        features_json = json.dumps(request.features)
+        # 2. Logger dans predictions_logs (features dédupliquées par hash)
+        deadline.check("enregistrement du log")
+        features_hash = feature_store.store_features(db, request.features)
         
         log_entry = PredictionLog(
             employee_id=None,  # Pas d'ID car nouvel employé
-            input_features=features_json,
+            features_hash=features_hash,
             prediction_result=prediction_result['prediction'],
             confidence_score=prediction_result['confidence_score'],
             model_version=request.model_version
@@ -300,18 +477,22 @@ def predict_new_employee(
         
         db.add(log_entry)
         db.commit()
+        deadline.complete()
         db.refresh(log_entry)
+        stats_cache.record_prediction(log_entry.prediction_result)
         
-        # 3. Retourner la réponse détaillée
-        return PredictionDetailedResponse(
-            log_id=log_entry.id,
-            employee_id=None,
-            features=request.features,
-            prediction=prediction_result['prediction'],
-            confidence_score=prediction_result['confidence_score'],
-            model_version=request.model_version,
-            timestamp=log_entry.created_at
-        )
+        # 3. Retourner la réponse détaillée (déjà sérialisable : pas de re-validation)
+        content = {
+            "log_id": log_entry.id,
+            "employee_id": None,
+            "features": request.features,
+            "prediction": prediction_result['prediction'],
+            "probability": prediction_result['probability'],
+            "confidence_score": prediction_result['confidence_score'],
+            "model_version": request.model_version,
+            "timestamp": log_entry.created_at
+        }
+        return msgpack_io.respond(projection.lean(content) if lean else content, binary)
     
     except HTTPException:
         raise
@@ -319,6 +500,129 @@ def predict_new_employee(
     except Exception as e:
         logger.error(f"Erreur lors de la prédiction pour un nouvel employé: {e}")
         db.rollback()
+        if deadline.expired():
+            raise deadline.exceeded("base de données")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la prédiction : {str(e)}"
+        )
+
+# =============================================================================
+# PRÉDICTIONS PAR LOT 🔒 PROTÉGÉ
+# =============================================================================
+
+@app.post("/predict/batch", response_model=PredictionBatchResponse,
+          dependencies=[Depends(admission.limit("predict_batch"))],
+          openapi_extra=msgpack_io.openapi(PredictionBatchRequest))
+def predict_batch(
+    request: PredictionBatchRequest = Depends(msgpack_io.body(PredictionBatchRequest)),
+    binary: bool = Depends(msgpack_io.accepts_msgpack),
+    deadline: Deadline = Depends(deadlines.for_route("predict_batch")),
+    db: Session = Depends(deadlines.session("predict_batch")),
+    api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
+):
+    """
+    🎯 Prédictions pour plusieurs nouveaux employés en une requête - 🔒 PROTÉGÉ
+    
+    ⚠️ Requiert une API Key valide dans le header X-API-Key
+    
+    - Reçoit jusqu'à PREDICT_BATCH_MAX_SIZE jeux de features
+    - Les score en un seul appel au modèle
+    - Loggue toutes les prédictions en un INSERT multi-lignes et un commit
+    - Retourne un résultat par jeu de features (avec son log_id), dans l'ordre
+    """
+    if len(request.records) > batch_scoring.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lot trop grand : {len(request.records)} éléments (maximum {batch_scoring.MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        if model_loader.pipeline is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Le modèle n'est pas chargé. Veuillez réessayer dans quelques instants."
+            )
+        
+        results = batch_scoring.score_and_log(
+            db, [(None, features) for features in request.records], request.model_version, deadline
+        )
+        
+        return msgpack_io.respond({
+            "model_version": request.model_version,
+            "count": len(results),
+            "results": [{"index": index, **result} for index, result in enumerate(results)]
+        }, binary)
+    
+    except HTTPException:
+        raise
+    
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction par lot ({len(request.records)} éléments): {e}")
+        db.rollback()
+        if deadline.expired():
+            raise deadline.exceeded("base de données")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erreur lors de la prédiction : {str(e)}"
+        )
+
+@app.post("/predict/from_ids", response_model=PredictionFromIdsResponse,
+          dependencies=[Depends(admission.limit("predict_from_ids"))],
+          openapi_extra=msgpack_io.openapi(PredictionFromIdsRequest))
+def predict_from_employee_ids(
+    request: PredictionFromIdsRequest = Depends(msgpack_io.body(PredictionFromIdsRequest)),
+    binary: bool = Depends(msgpack_io.accepts_msgpack),
+    deadline: Deadline = Depends(deadlines.for_route("predict_from_ids")),
+    db: Session = Depends(deadlines.session("predict_from_ids")),
+    api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
+):
+    """
+    🎯 Prédictions pour plusieurs employés existants - 🔒 PROTÉGÉ
+    
+    ⚠️ Requiert une API Key valide dans le header X-API-Key
+    
+    - Lit les employés par WHERE id IN (...) (par tranches)
+    - Les score en un seul appel au modèle
+    - Loggue toutes les prédictions en un INSERT multi-lignes et un commit
+    - Un id inconnu (found=false, listé dans `missing`) ou un employé aux
+      features illisibles ou invalides (listé dans `invalid` avec la raison)
+      est signalé dans son résultat, sans faire échouer le reste du lot
+    """
+    if len(request.employee_ids) > batch_scoring.MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Lot trop grand : {len(request.employee_ids)} éléments (maximum {batch_scoring.MAX_BATCH_SIZE})"
+        )
+    
+    try:
+        if model_loader.pipeline is None:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Le modèle n'est pas chargé. Veuillez réessayer dans quelques instants."
+            )
+        
+        results = batch_scoring.score_employees(db, request.employee_ids, "XGBoost_Light_100%", deadline)
+        
+        return msgpack_io.respond({
+            "model_version": "XGBoost_Light_100%",
+            "count": sum(result["log_id"] is not None for result in results),
+            "missing": [result["employee_id"] for result in results if not result["found"]],
+            "invalid": [
+                {"employee_id": result["employee_id"], "reason": result["error"]}
+                for result in results if result["found"] and result["log_id"] is None
+            ],
+            "results": results
+        }, binary)
+    
+    except HTTPException:
+        raise
+    
+    except Exception as e:
+        logger.error(f"Erreur lors de la prédiction pour {len(request.employee_ids)} employés: {e}")
+        db.rollback()
+        if deadline.expired():
+            raise deadline.exceeded("base de données")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erreur lors de la prédiction : {str(e)}"
@@ -328,10 +632,13 @@ def predict_new_employee(
 # ENDPOINT 3 : RÉCUPÉRER UNE PRÉDICTION VIA LOG_ID 🔒 PROTÉGÉ
 # =============================================================================
 
-@app.get("/predict/log/{log_id}", response_model=PredictionDetailedResponse)
+@app.get("/predict/log/{log_id}", response_model=PredictionDetailedResponse,
+          dependencies=[Depends(admission.limit("predict_log"))])
 def get_prediction_log(
     log_id: int,
-    db: Session = Depends(get_db),
+    request: Request,
+    lean: bool = Depends(projection.prediction_view),
+    db: Session = Depends(get_read_db),
     api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
 ):
     """
@@ -340,30 +647,57 @@ def get_prediction_log(
     ⚠️ Requiert une API Key valide dans le header X-API-Key
     
     - Récupère un log de prédiction par son ID
+    - Si le log a été archivé (log_archive.py), le relit depuis le Parquet
     - Retourne les features + la prédiction + timestamp
+    - `view=lean` : sans les features, qui ne sont alors pas lues en base
+    - Un log ne change jamais : If-None-Match sur son ETag (id + date de
+      création) → 304 sans décoder ni sérialiser les features ; un id
+      inconnu reste un 404, même avec `If-None-Match: *`
     """
     try:
         # 1. Récupérer le log
-        log_entry = db.query(PredictionLog).filter(PredictionLog.id == log_id).first()
+        query = db.query(PredictionLog)
+        if lean:
+            query = query.options(*projection.log_options(list(projection.LEAN_LOG_COLUMNS)))
+        log_entry = query.filter(PredictionLog.id == log_id).first()
+        if not log_entry and is_replica_session(db):
+            # Lecture de sa propre écriture : le log peut ne pas être encore répliqué
+            with SessionLocal() as primary:
+                log_entry = primary.query(PredictionLog).filter(PredictionLog.id == log_id).first()
         if not log_entry:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Log {log_id} non trouvé"
-            )
-        
-        # 2. Décoder les features
-        features = json.loads(log_entry.input_features)
+            archived = log_archive.find_archived_log(log_id)
+            if archived is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Log {log_id} non trouvé"
+                )
+            log_entry = PredictionLog(**archived)
         
-        # 3. Retourner la réponse
-        return PredictionDetailedResponse(
-            log_id=log_entry.id,
-            employee_id=log_entry.employee_id,
-            features=features,
-            prediction=log_entry.prediction_result,
-            confidence_score=log_entry.confidence_score,
-            model_version=log_entry.model_version,
-            timestamp=log_entry.created_at
+        # 2. Log inchangé côté client → 304 (l'id seul ne suffit pas : ETag
+        #    lié à la ligne, au cas où une base restaurée réattribue l'id)
+        etag = http_cache.make_etag(
+            "prediction_log", log_entry.id, log_entry.created_at.isoformat(), "lean" if lean else "full"
         )
+        if http_cache.matches(request, etag):
+            return http_cache.not_modified("prediction_log", etag, log_entry.created_at, vary="Accept")
+        
+        # 3. Retourner la réponse (déjà sérialisable : pas de re-validation)
+        content = {
+            "log_id": log_entry.id,
+            "employee_id": log_entry.employee_id,
+            "prediction": log_entry.prediction_result,
+            "probability": projection.probability(log_entry.prediction_result, log_entry.confidence_score),
+            "confidence_score": log_entry.confidence_score,
+            "model_version": log_entry.model_version,
+            "timestamp": log_entry.created_at
+        }
+        cache_headers = http_cache.headers("prediction_log", etag, log_entry.created_at, vary="Accept")
+        if lean:
+            return FastJSONResponse(projection.lean(content), headers=cache_headers)
+        
+        # 4. Décoder les features
+        content["features"] = payload_codec.decode(log_entry.input_features)
+        return FastJSONResponse(content, headers=cache_headers)
     
     except HTTPException:
         raise
@@ -381,68 +715,196 @@ def get_prediction_log(
 
 @app.get("/predictions/logs", response_model=List[PredictionLogResponse])
 def get_prediction_logs(
+    response: Response,
     skip: int = 0,
     limit: int = 10,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = None,
+    filters: dict = Depends(feature_filters.query_filters),
+    fields: Optional[List[str]] = Depends(projection.log_fields),
+    db: Session = Depends(get_read_db),
     api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
 ):
     """
     📜 Récupérer l'historique des prédictions - 🔒 PROTÉGÉ
     
     ⚠️ Requiert une API Key valide dans le header X-API-Key
+    
+    Tri du plus récent au plus ancien sur (created_at, id), servi par
+    l'index ix_predictions_logs_created_at_id. Passer le header
+    X-Next-Cursor de la réponse dans `cursor` pour obtenir la page suivante.
+    Filtres `departement`, `poste`, `heure_supplementaires` : voir /employees.
+    `fields` : colonnes à renvoyer ; sans `input_features`, ni le JSON des
+    features ni feature_blobs ne sont lus.
     """
-    logs = db.query(PredictionLog).order_by(PredictionLog.created_at.desc()).offset(skip).limit(limit).all()
+    query = db.query(PredictionLog).options(
+        # Une seule requête pour les blobs de la page (partagés entre logs)
+        *(projection.log_options(fields) if fields else [selectinload(PredictionLog.features_blob)])
+    ).order_by(
+        PredictionLog.created_at.desc(),
+        PredictionLog.id.desc()
+    )
+    
+    if filters:
+        query = query.filter(feature_filters.logs_filter(db, filters))
+    
+    if cursor:
+        try:
+            last_created_at, last_id = pagination.decode_logs_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        query = query.filter(
+            tuple_(PredictionLog.created_at, PredictionLog.id) < tuple_(last_created_at, last_id)
+        )
+    elif skip:
+        query = query.offset(skip)
+    
+    logs = query.limit(limit).all()
+    
+    if logs and len(logs) == limit:
+        response.headers[pagination.NEXT_CURSOR_HEADER] = pagination.logs_cursor(logs[-1])
+    
+    if fields:
+        return FastJSONResponse(projection.project(logs, fields), headers=dict(response.headers))
     return logs
 
+@app.get("/predictions/logs/export")
+def export_prediction_logs(
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson|parquet|msgpack)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    model_version: Optional[str] = None,
+    binary: bool = Depends(msgpack_io.accepts_msgpack),
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
+):
+    """
+    📦 Exporter les logs de prédiction en flux (CSV, NDJSON, Parquet, msgpack) - 🔒 PROTÉGÉ
+    
+    ⚠️ Requiert une API Key valide dans le header X-API-Key
+    
+    Filtres : période [start, end[ sur created_at et version de modèle.
+    Lecture par curseur côté serveur, triée sur (created_at, id) : la
+    mémoire reste constante quelle que soit la taille de l'export.
+    Sans `format` : msgpack si le header Accept le préfère, CSV sinon.
+    """
+    if format is None:
+        format = "msgpack" if binary else "csv"
+    # created_at est en UTC naïf : bornes avec fuseau ramenées en UTC
+    start = naive_utc(start) if start is not None else None
+    end = naive_utc(end) if end is not None else None
+    if start is not None and end is not None and start >= end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start doit être antérieur à end"
+        )
+    if format == "parquet" and log_export.pq is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Export Parquet indisponible : pyarrow n'est pas installé"
+        )
+    if format == "msgpack" and msgpack_io.msgpack is None:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Export msgpack indisponible : msgpack n'est pas installé"
+        )
+    
+    media_type, extension = log_export.FORMATS[format]
+    query = log_export.export_query(start, end, model_version)
+    return StreamingResponse(
+        log_export.stream(db, format, query),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="predictions_logs.{extension}"'}
+    )
+
 @app.get("/predictions/logs/count")
 def count_prediction_logs(
-    db: Session = Depends(get_db),
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_read_db),
     api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
 ):
     """
     🔢 Compter le nombre total de prédictions loguées - 🔒 PROTÉGÉ
     
     ⚠️ Requiert une API Key valide dans le header X-API-Key
+    Servi depuis les mêmes compteurs en cache que /stats.
+    """
+    counters = stats_cache.get(db, background_tasks)
+    return {"total": counters["predictions"]["total"]}
+
+@app.get("/predictions/analytics")
+def get_prediction_analytics(
+    interval: str = Query("day", pattern="^(hour|day|week)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    by_model_version: bool = False,
+    db: Session = Depends(get_read_db),
+    api_key: str = Depends(verify_api_key)  # 🔒 AUTHENTIFICATION REQUISE
+):
+    """
+    📈 Volumes, répartition Oui/Non et confiance moyenne par tranche - 🔒 PROTÉGÉ
+    
+    ⚠️ Requiert une API Key valide dans le header X-API-Key
+    
+    Tranches d'une heure, d'un jour ou d'une semaine (lundi), éventuellement
+    par model_version. Une requête GROUP BY sur created_at ; les tranches
+    closes sont gardées en cache (voir prediction_analytics.py).
     """
-    count = db.query(PredictionLog).count()
-    return {"total": count}
+    try:
+        buckets = analytics_cache.get(db, interval, start, end, by_model_version)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return {"interval": interval, "buckets": buckets}
 
 # =============================================================================
 # STATISTIQUES (PUBLIC)
 # =============================================================================
 
 @app.get("/stats")
-def get_statistics(db: Session = Depends(get_db)):
+def get_statistics(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_read_db)):
     """
     📊 Statistiques générales - PUBLIC
     
     Aucune authentification requise pour consulter les stats.
-    """
-    total_employees = db.query(Employee).count()
-    total_predictions = db.query(PredictionLog).count()
     
-    # Compter les démissions dans les données d'entraînement
-    oui_count = db.query(Employee).filter(Employee.target == "Oui").count()
-    non_count = db.query(Employee).filter(Employee.target == "Non").count()
-    
-    # Compter les prédictions
-    pred_oui = db.query(PredictionLog).filter(PredictionLog.prediction_result == "Oui").count()
-    pred_non = db.query(PredictionLog).filter(PredictionLog.prediction_result == "Non").count()
+    Les compteurs viennent d'une seule requête GROUP BY mise en cache
+    (TTL STATS_CACHE_TTL, rafraîchie en tâche de fond une fois expirée).
+    ETag sur les compteurs : 304 si le client a déjà cette version.
+    """
+    counters = stats_cache.get(db, background_tasks)
+    employees = counters["employees"]
+    predictions = counters["predictions"]
     
-    return {
+    content = {
         "employees": {
-            "total": total_employees,
-            "demissions_oui": oui_count,
-            "demissions_non": non_count
+            "total": employees["total"],
+            "demissions_oui": employees["Oui"],
+            "demissions_non": employees["Non"]
         },
         "predictions": {
-            "total": total_predictions,
-            "predicted_oui": pred_oui,
-            "predicted_non": pred_non
+            "total": predictions["total"],
+            "predicted_oui": predictions["Oui"],
+            "predicted_non": predictions["Non"]
         },
         "model": {
             "type": "XGBoost",
             "version": "Light_100%",
             "threshold": model_loader.optimal_threshold if model_loader.pipeline else None  # ✅ CORRECTION
         }
-    }
\ No newline at end of file
+    }
+    
+    etag = http_cache.make_etag("stats", content)
+    if http_cache.matches(request, etag):
+        return http_cache.not_modified("stats", etag, stats_cache.modified_at)
+    return FastJSONResponse(content, headers=http_cache.headers("stats", etag, stats_cache.modified_at))
+
+@app.get("/metrics/admission")
+def get_admission_metrics():
+    """
+    🚦 Métriques du contrôle d'admission - PUBLIC
+    
+    Par endpoint /predict/* : limites, requêtes en cours et en attente,
+    admises, rejetées (file pleine, attente estimée, délai dépassé) et temps
+    de service moyen.
+    """
+    return admission.metrics()
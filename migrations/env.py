@@ -0,0 +1,95 @@
+"""
+Environnement Alembic
+
+Réutilise le moteur de database.py (mêmes pragmas SQLite) et les modèles
+de models.py comme métadonnées cibles. include_object écarte de
+l'autogenerate (et d'`alembic check`) les objets gérés à la main par les
+migrations : index propres à un dialecte et partitions mensuelles.
+"""
+
+import re
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import Base, DATABASE_URL, make_engine
+import models  # noqa: F401  (enregistre les tables dans Base.metadata)
+from partitioning import TABLE_NAME as LOGS_TABLE
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Index GIN (PostgreSQL) et index d'expression / partiels (SQLite) déclarés
+# avec ddl_if : créés par 0004 / 0007, absents de l'autre dialecte et mal
+# reflétés (jsonb_path_ops, json_extract), donc jamais comparés
+DIALECT_INDEXES = {
+    index.name
+    for table in target_metadata.tables.values()
+    for index in table.indexes
+    if index._ddl_if is not None
+}
+
+# Partitions mensuelles de predictions_logs (partitioning.py, PostgreSQL)
+PARTITION_PATTERN = re.compile(rf"^{LOGS_TABLE}_(\d{{4}}_\d{{2}}|default)$")
+
+
+def include_object(object, name, type_, reflected, compare_to) -> bool:
+    """Objets comparés par autogenerate (voir DIALECT_INDEXES / PARTITION_PATTERN)."""
+    if type_ == "index" and name in DIALECT_INDEXES:
+        return False
+    if type_ == "table" and reflected and compare_to is None and PARTITION_PATTERN.match(name):
+        return False
+    return True
+
+
+def get_url() -> str:
+    """URL de alembic.ini si renseignée, sinon DATABASE_URL."""
+    return config.get_main_option("sqlalchemy.url") or DATABASE_URL
+
+
+def run_migrations_offline() -> None:
+    """Génère le SQL sans se connecter (alembic upgrade head --sql)."""
+    context.configure(
+        url=get_url(),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Applique les migrations sur la base."""
+    connectable = make_engine(get_url())
+
+    with connectable.connect() as connection:
+        if connection.dialect.name == "sqlite":
+            # batch_alter_table recrée les tables : clés étrangères vérifiées
+            # après coup seulement (pragma sans effet dans une transaction)
+            connection.exec_driver_sql("PRAGMA foreign_keys=OFF")
+            connection.commit()
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=True,  # ALTER TABLE limité sur SQLite
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+    connectable.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
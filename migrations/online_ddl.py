@@ -0,0 +1,97 @@
+"""
+Opérations DDL "en ligne" partagées par les migrations
+
+Sur PostgreSQL, les index sont construits avec CONCURRENTLY (hors transaction)
+pour ne pas bloquer les écritures de l'API pendant la migration. Sur SQLite,
+aucune construction concurrente n'existe : on se contente de IF NOT EXISTS
+pour que les migrations restent rejouables.
+"""
+
+import re
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def is_partitioned(table: str) -> bool:
+    """True si `table` est une table partitionnée PostgreSQL."""
+    bind = op.get_bind()
+    if bind.dialect.name != "postgresql" or op.get_context().as_sql:
+        return False
+    return bind.execute(sa.text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table"
+    ), {"table": table}).first() is not None
+
+
+def partitions(table: str):
+    """Noms des partitions d'une table partitionnée PostgreSQL."""
+    return op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table}).scalars().all()
+
+
+def column_exists(table: str, column: str) -> bool:
+    """True si la colonne existe déjà (base créée par create_all)."""
+    if op.get_context().as_sql:
+        return False
+    columns = sa.inspect(op.get_bind()).get_columns(table)
+    return any(c["name"] == column for c in columns)
+
+
+def table_exists(table: str) -> bool:
+    if op.get_context().as_sql:
+        return False
+    return table in sa.inspect(op.get_bind()).get_table_names()
+
+
+def create_index_online(name: str, table: str, columns, using: str = None) -> None:
+    """
+    Crée un index sans bloquer les écritures.
+
+    Sur une table partitionnée, CONCURRENTLY est interdit sur le parent :
+    l'index est créé ON ONLY sur le parent, puis CONCURRENTLY sur chaque
+    partition, puis attaché.
+
+    Args:
+        columns: Colonnes, éventuellement suivies d'une classe d'opérateurs
+            ("features jsonb_path_ops")
+        using: Méthode d'index PostgreSQL (ex. "gin"), None pour btree
+    """
+    bind = op.get_bind()
+    cols = ", ".join(columns)
+    method = f" USING {using}" if using else ""
+
+    if bind.dialect.name != "postgresql":
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({cols})")
+        return
+
+    if not is_partitioned(table):
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table}{method} ({cols})")
+        return
+
+    children = partitions(table)
+    suffix = re.sub(r"\W+", "_", "_".join(columns))
+    op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON ONLY {table}{method} ({cols})")
+    with op.get_context().autocommit_block():
+        for partition in children:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_{partition}_{suffix} "
+                f"ON {partition}{method} ({cols})"
+            )
+    for partition in children:
+        op.execute(f"ALTER INDEX {name} ATTACH PARTITION ix_{partition}_{suffix}")
+
+
+def drop_index_online(name: str, table: str) -> None:
+    """Supprime un index (CONCURRENTLY quand PostgreSQL le permet)."""
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql" and not is_partitioned(table):
+        with op.get_context().autocommit_block():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
+    else:
+        op.execute(f"DROP INDEX IF EXISTS {name}")
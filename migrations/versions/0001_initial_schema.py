@@ -0,0 +1,62 @@
+"""Schéma initial : tables employees et predictions_logs
+
+Reprend le schéma créé jusqu'ici par `Base.metadata.create_all`. Les tables
+déjà présentes (bases créées par create_tables.py / import_data.py) sont
+laissées telles quelles, ce qui permet d'adopter Alembic sur une base existante
+avec un simple `alembic upgrade head`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_context().as_sql:  # mode --sql : pas de base à inspecter
+        existing = set()
+    else:
+        existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "employees" not in existing:
+        op.create_table(
+            "employees",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("identifier", sa.String(), nullable=True),
+            sa.Column("features", sa.Text(), nullable=True),
+            sa.Column("target", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_employees_id", "employees", ["id"])
+        op.create_index("ix_employees_identifier", "employees", ["identifier"], unique=True)
+
+    if "predictions_logs" not in existing:
+        op.create_table(
+            "predictions_logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("employee_id", sa.Integer(), sa.ForeignKey("employees.id"), nullable=True),
+            sa.Column("input_features", sa.Text(), nullable=False),
+            sa.Column("prediction_result", sa.String(), nullable=False),
+            sa.Column("confidence_score", sa.Float(), nullable=True),
+            sa.Column("model_version", sa.String(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_predictions_logs_id", "predictions_logs", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("predictions_logs")
+    op.drop_table("employees")
@@ -0,0 +1,57 @@
+"""Index de performance pour les requêtes de main.py
+
+| Index                                        | Requête servie                                   |
+|----------------------------------------------|--------------------------------------------------|
+| predictions_logs (created_at, id)            | /predictions/logs : tri + curseur keyset         |
+| predictions_logs (employee_id, created_at)   | historique d'un employé, du plus récent          |
+| predictions_logs (prediction_result)         | /stats : GROUP BY prediction_result              |
+| predictions_logs (model_version, created_at) | volumes par version de modèle sur une période    |
+| employees (target)                           | /stats : GROUP BY target                         |
+
+L'index (created_at, id) couvre aussi les requêtes sur created_at seul.
+
+Création en ligne (voir migrations/online_ddl.py) :
+- PostgreSQL : CREATE INDEX CONCURRENTLY (hors transaction), sans bloquer
+  les écritures. Sur une table partitionnée, CONCURRENTLY est interdit sur le
+  parent : l'index est créé ON ONLY sur le parent, puis CONCURRENTLY sur
+  chaque partition, puis attaché.
+- SQLite : CREATE INDEX IF NOT EXISTS (pas de construction concurrente possible).
+
+Chaque index est justifié par un EXPLAIN dans tests/functional/test_indexes.py.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 10:05:00.000000
+
+"""
+from typing import Sequence, Union
+
+from migrations.online_ddl import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+INDEXES = [
+    ("ix_predictions_logs_created_at_id", "predictions_logs", ["created_at", "id"]),
+    ("ix_predictions_logs_employee_id_created_at", "predictions_logs", ["employee_id", "created_at"]),
+    ("ix_predictions_logs_prediction_result", "predictions_logs", ["prediction_result"]),
+    ("ix_predictions_logs_model_version_created_at", "predictions_logs", ["model_version", "created_at"]),
+    ("ix_employees_target", "employees", ["target"]),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for name, table, columns in INDEXES:
+        create_index_online(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for name, table, _ in reversed(INDEXES):
+        drop_index_online(name, table)
@@ -0,0 +1,103 @@
+"""Features des logs dédupliquées dans feature_blobs
+
+Les logs de prédiction ne stockent plus le JSON des features en ligne mais
+le SHA-256 de sa forme canonique (feature_blobs.hash). Les logs existants
+gardent leur colonne input_features, désormais nullable ; une contrainte
+CHECK garantit qu'un log a toujours l'un ou l'autre.
+
+Sur PostgreSQL, toutes les opérations sont en ligne : ajout d'une colonne
+nullable sans défaut (métadonnées seules), contraintes ajoutées NOT VALID
+puis validées sans bloquer les écritures, index créé CONCURRENTLY. La
+validation a lieu après le commit de l'ajout, hors transaction : le verrou
+ACCESS EXCLUSIVE de l'ALTER est relâché avant le parcours de la table
+(VALIDATE ne prend qu'un verrou SHARE UPDATE EXCLUSIVE).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online_ddl import (
+    column_exists, create_index_online, drop_index_online, is_partitioned, table_exists
+)
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+CHECK_NAME = "ck_predictions_logs_features"
+CHECK_SQL = "input_features IS NOT NULL OR features_hash IS NOT NULL"
+FK_NAME = "fk_predictions_logs_features_hash"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not table_exists("feature_blobs"):
+        op.create_table(
+            "feature_blobs",
+            sa.Column("hash", sa.String(64), primary_key=True),
+            sa.Column("payload", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+        )
+
+    if not column_exists("predictions_logs", "features_hash"):
+        if op.get_bind().dialect.name == "postgresql":
+            # NOT VALID n'est pas accepté sur une table partitionnée
+            not_valid = "" if is_partitioned("predictions_logs") else " NOT VALID"
+            op.execute("ALTER TABLE predictions_logs ADD COLUMN features_hash VARCHAR(64)")
+            op.execute("ALTER TABLE predictions_logs ALTER COLUMN input_features DROP NOT NULL")
+            op.execute(
+                f"ALTER TABLE predictions_logs ADD CONSTRAINT {FK_NAME} "
+                f"FOREIGN KEY (features_hash) REFERENCES feature_blobs (hash){not_valid}"
+            )
+            op.execute(f"ALTER TABLE predictions_logs ADD CONSTRAINT {CHECK_NAME} CHECK ({CHECK_SQL}){not_valid}")
+            if not_valid:
+                with op.get_context().autocommit_block():
+                    op.execute(f"ALTER TABLE predictions_logs VALIDATE CONSTRAINT {FK_NAME}")
+                    op.execute(f"ALTER TABLE predictions_logs VALIDATE CONSTRAINT {CHECK_NAME}")
+        else:
+            # SQLite : ALTER limité, batch_alter_table reconstruit la table
+            with op.batch_alter_table("predictions_logs") as batch:
+                batch.add_column(sa.Column("features_hash", sa.String(64), nullable=True))
+                batch.alter_column("input_features", existing_type=sa.Text(), nullable=True)
+                batch.create_foreign_key(FK_NAME, "feature_blobs", ["features_hash"], ["hash"])
+                batch.create_check_constraint(CHECK_NAME, sa.text(CHECK_SQL))
+
+    create_index_online("ix_predictions_logs_features_hash", "predictions_logs", ["features_hash"])
+
+
+def _features_fk_name() -> str:
+    """Nom réel de la clé étrangère (base créée par create_all avant qu'elle soit nommée)."""
+    if op.get_context().as_sql:
+        return FK_NAME
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys("predictions_logs"):
+        if foreign_key["constrained_columns"] == ["features_hash"] and foreign_key["name"]:
+            return foreign_key["name"]
+    return FK_NAME
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    fk_name = _features_fk_name()
+    drop_index_online("ix_predictions_logs_features_hash", "predictions_logs")
+
+    # Remettre les features en ligne avant de supprimer la référence
+    op.execute(
+        "UPDATE predictions_logs SET input_features = "
+        "(SELECT payload FROM feature_blobs WHERE feature_blobs.hash = predictions_logs.features_hash) "
+        "WHERE input_features IS NULL"
+    )
+    with op.batch_alter_table("predictions_logs") as batch:
+        batch.drop_constraint(CHECK_NAME, type_="check")
+        batch.drop_constraint(fk_name, type_="foreignkey")
+        batch.drop_column("features_hash")
+        batch.alter_column("input_features", existing_type=sa.Text(), nullable=False)
+    op.drop_table("feature_blobs")
@@ -0,0 +1,64 @@
+"""Features en JSONB + index GIN (PostgreSQL)
+
+Sur PostgreSQL, employees.features, feature_blobs.payload et
+predictions_logs.input_features passent de TEXT à JSONB, puis reçoivent un
+index GIN (jsonb_path_ops) pour les filtres `@>` de /employees et
+/predictions/logs (voir feature_filters.py).
+
+⚠️ Le changement de type réécrit les tables (verrou exclusif pendant la
+conversion) : à lancer dans une fenêtre de maintenance sur une grosse base.
+Les index sont ensuite créés CONCURRENTLY.
+
+Sur SQLite, rien à faire : les colonnes restent en TEXT et les filtres
+passent par json_extract().
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from migrations.online_ddl import create_index_online, drop_index_online
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    ("ix_employees_features_gin", "employees", "features"),
+    ("ix_feature_blobs_payload_gin", "feature_blobs", "payload"),
+    ("ix_predictions_logs_input_features_gin", "predictions_logs", "input_features"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for _, table, column in COLUMNS:
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE JSONB USING {column}::jsonb"
+        )
+    for name, table, column in COLUMNS:
+        create_index_online(name, table, [f"{column} jsonb_path_ops"], using="gin")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    for name, table, _ in reversed(COLUMNS):
+        drop_index_online(name, table)
+    for _, table, column in reversed(COLUMNS):
+        op.execute(
+            f"ALTER TABLE {table} ALTER COLUMN {column} TYPE TEXT USING {column}::text"
+        )
@@ -0,0 +1,37 @@
+"""Hash des features des employés (import incrémental)
+
+Ajoute employees.features_hash, utilisé par import_data.py pour ne réécrire
+que les employés dont les features ont changé. Colonne nullable sans défaut :
+ajout instantané (métadonnées seules) sur PostgreSQL. Les employés existants
+reçoivent leur hash au premier import incrémental.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online_ddl import column_exists
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not column_exists("employees", "features_hash"):
+        op.add_column("employees", sa.Column("features_hash", sa.String(64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("employees") as batch:
+        batch.drop_column("features_hash")
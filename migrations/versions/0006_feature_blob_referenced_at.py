@@ -0,0 +1,38 @@
+"""Date de dernière référence des blobs de features
+
+Ajoute feature_blobs.referenced_at, mise à jour quand une prédiction
+réutilise un blob : feature_store.delete_orphan_blobs ne supprime que les
+blobs orphelins non référencés depuis FEATURE_BLOB_GRACE_HOURS. Colonne
+nullable sans défaut : ajout instantané (métadonnées seules) sur
+PostgreSQL. Les blobs existants gardent NULL, created_at en tient lieu.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-20 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online_ddl import column_exists
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not column_exists("feature_blobs", "referenced_at"):
+        op.add_column("feature_blobs", sa.Column("referenced_at", sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("feature_blobs") as batch:
+        batch.drop_column("referenced_at")
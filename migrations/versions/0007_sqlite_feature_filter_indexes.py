@@ -0,0 +1,69 @@
+"""Index des filtres par feature sur SQLite
+
+Les filtres departement / poste / heure_supplementaires de /employees et
+/predictions/logs (feature_filters.py) lisaient chaque ligne avec
+json_extract() ou la fonction feature_value() : parcours complet de la
+table. Cette migration ajoute, sur employees.features, feature_blobs.payload
+et predictions_logs.input_features :
+- un index d'expression json_extract par feature, partiel (lignes JSON) ;
+- un index partiel des lignes binaires (payload_codec).
+
+Les lignes NULL (logs récents, features dans feature_blobs) n'entrent dans
+aucun index : pas de coût à l'écriture des prédictions.
+
+PostgreSQL n'est pas concerné (index GIN de la migration 0004).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-20 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, Sequence[str], None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# models.FILTERED_FEATURES à la date de la migration
+FEATURES = ("departement", "poste", "heure_supplementaires")
+
+# (table, colonne de features, clé primaire)
+COLUMNS = [
+    ("employees", "features", "id"),
+    ("feature_blobs", "payload", "hash"),
+    ("predictions_logs", "input_features", "id"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table, column, key in COLUMNS:
+        for feature in FEATURES:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_{feature} "
+                f"ON {table} (json_extract({column}, '$.{feature}')) WHERE typeof({column}) = 'text'"
+            )
+        op.execute(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_binary "
+            f"ON {table} ({key}) WHERE typeof({column}) = 'blob'"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    for table, column, _ in reversed(COLUMNS):
+        op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_binary")
+        for feature in FEATURES:
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_{column}_{feature}")
@@ -0,0 +1,42 @@
+"""Schémas du codec de features "packed"
+
+Ajoute feature_schemas (empreinte → liste ordonnée des features). Le codec
+"packed" n'écrit que les valeurs, dans l'ordre des features du modèle : sans
+cette table, ses payloads n'étaient lisibles que par un processus ayant
+chargé le même modèle (feature_store.init_schemas).
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-20 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.online_ddl import table_exists
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, Sequence[str], None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if not table_exists("feature_schemas"):
+        op.create_table(
+            "feature_schemas",
+            sa.Column("id", sa.BigInteger(), autoincrement=False, nullable=False),
+            sa.Column("feature_names", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("feature_schemas")
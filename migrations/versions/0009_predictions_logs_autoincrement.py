@@ -0,0 +1,84 @@
+"""Identifiants des logs jamais réutilisés (SQLite)
+
+Sans AUTOINCREMENT, SQLite attribue max(id) + 1 : une fois la fin de la
+table archivée (log_archive.py), les id archivés sont réattribués à de
+nouveaux logs. Un client qui garde /predict/log/{id} en cache (immutable)
+reçoit alors un autre log, et la fusion des archives (dédoublonnage sur id)
+écrase des logs.
+
+La table est reconstruite avec AUTOINCREMENT (SQLite n'a pas d'ALTER pour
+cela), puis sqlite_sequence est amorcée avec le plus grand id déjà archivé
+(manifeste de LOG_ARCHIVE_DIR). Les index sont recréés à l'identique.
+PostgreSQL (séquence, jamais réutilisée) n'est pas concerné.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-20 13:00:00.000000
+
+"""
+import json
+import os
+from pathlib import Path
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, Sequence[str], None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "predictions_logs"
+
+
+def _archived_max_id() -> int:
+    """Plus grand id archivé (0 sans archive), lu dans le manifeste de log_archive."""
+    path = Path(os.getenv("LOG_ARCHIVE_DIR", "archive/predictions_logs")) / "manifest.json"
+    if not path.exists():
+        return 0
+    entries = json.loads(path.read_text(encoding="utf-8")).values()
+    return max((entry["max_id"] for entry in entries), default=0)
+
+
+def _rebuild(autoincrement: bool) -> None:
+    bind = op.get_bind()
+    # Index d'expression et partiels : non reflétés par le mode batch, on
+    # garde leur DDL exacte pour les recréer après la reconstruction
+    indexes = bind.execute(sa.text(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"
+    ), {"table": TABLE}).all()
+    for name, _ in indexes:
+        op.execute(f"DROP INDEX {name}")
+
+    with op.batch_alter_table(TABLE, recreate="always", table_kwargs={"sqlite_autoincrement": autoincrement}):
+        pass
+
+    for _, sql in indexes:
+        op.execute(sql)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    if bind.dialect.name != "sqlite":
+        return
+    ddl = bind.execute(sa.text(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :table"
+    ), {"table": TABLE}).scalar()
+    if "AUTOINCREMENT" not in ddl.upper():
+        _rebuild(autoincrement=True)
+
+    # Jamais en dessous d'un id déjà attribué, y compris archivé
+    floor = max(_archived_max_id(), bind.execute(sa.text(f"SELECT COALESCE(MAX(id), 0) FROM {TABLE}")).scalar())
+    bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = :table"), {"table": TABLE})
+    bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES (:table, :seq)"), {"table": TABLE, "seq": floor})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    _rebuild(autoincrement=False)
@@ -5,7 +5,7 @@ Utilise joblib au lieu de pickle
 """
 
 import joblib  # ← CHANGEMENT
-from typing import Dict, Any
+from typing import Dict, Any, List
 import numpy as np
 import pandas as pd
 import logging
@@ -36,11 +36,14 @@ class ModelLoader:
             # Charger avec joblib
             saved_data = joblib.load(self.model_path)  # ← CHANGEMENT
             
-            # Extraire les composants
-            self.pipeline = saved_data['pipeline']
-            self.config = saved_data['config']
-            self.feature_names = saved_data['feature_names']
-            self.optimal_threshold = saved_data['optimal_threshold']
+            # Extraire les composants (tous lus avant d'être remplacés : un
+            # fichier incomplet laisse le modèle précédent intact)
+            self.pipeline, self.config, self.feature_names, self.optimal_threshold = (
+                saved_data['pipeline'],
+                saved_data['config'],
+                saved_data['feature_names'],
+                saved_data['optimal_threshold'],
+            )
             
             logger.info(f"✅ Modèle chargé : {len(self.feature_names)} features")
             logger.info(f"📊 Seuil optimal : {self.optimal_threshold}")
@@ -56,15 +59,33 @@ class ModelLoader:
                 f"Erreur : {e}"
             )
         
+    def set_threads(self, threads: int) -> None:
+        """
+        Fixe le nombre de threads de prédiction (n_jobs de XGBoost), pour
+        que plusieurs workers ne se disputent pas les mêmes cœurs.
+        """
+        if self.pipeline is None:
+            raise RuntimeError("Modèle non chargé. Appelez load_model() d'abord.")
+        for _, step in getattr(self.pipeline, "steps", [("model", self.pipeline)]):
+            if hasattr(step, "get_params") and "n_jobs" in step.get_params(deep=False):
+                step.set_params(n_jobs=threads)
+        
     def predict(self, features: Dict[str, Any]) -> Dict[str, Any]:
         """
         Faire une prédiction à partir d'un dictionnaire de features
         """
+        return self.predict_batch([features])[0]
+    
+    def predict_batch(self, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Prédictions pour plusieurs jeux de features en UN appel au pipeline
+        (une seule matrice, un seul predict_proba).
+        """
         if self.pipeline is None:
             raise RuntimeError("Modèle non chargé. Appelez load_model() d'abord.")
         
-        # Convertir en DataFrame (1 ligne)
-        df = pd.DataFrame([features])
+        # Convertir en DataFrame (1 ligne par jeu de features)
+        df = pd.DataFrame(records, index=range(len(records)))
         
         # S'assurer que toutes les features sont présentes
         for feature in self.feature_names:
@@ -76,20 +97,23 @@ class ModelLoader:
         
         try:
             # Prédiction (probabilité)
-            proba = self.pipeline.predict_proba(df)[0, 1]
-            
-            # Prédiction (classe) avec seuil optimal
-            prediction = "Oui" if proba >= self.optimal_threshold else "Non"
-            
-            # Score de confiance
-            confidence = proba if prediction == "Oui" else (1 - proba)
+            probas = self.pipeline.predict_proba(df)[:, 1]
             
-            return {
-                'prediction': prediction,
-                'probability': float(proba),
-                'confidence_score': float(confidence),
-                'threshold_used': self.optimal_threshold
-            }
+            results = []
+            for proba in probas.tolist():
+                # Prédiction (classe) avec seuil optimal
+                prediction = "Oui" if proba >= self.optimal_threshold else "Non"
+                
+                # Score de confiance
+                confidence = proba if prediction == "Oui" else (1 - proba)
+                
+                results.append({
+                    'prediction': prediction,
+                    'probability': float(proba),
+                    'confidence_score': float(confidence),
+                    'threshold_used': self.optimal_threshold
+                })
+            return results
             
         except Exception as e:
             logger.error(f"❌ Erreur lors de la prédiction : {e}")
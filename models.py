@@ -1,14 +1,102 @@
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, Text, Float, DateTime, ForeignKey, Index, CheckConstraint, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, synonym
+from sqlalchemy.types import TypeDecorator
 from database import Base
 from datetime import datetime
+import payload_codec
+
+class FeaturePayload(TypeDecorator):
+    """
+    Colonne de features :
+    - PostgreSQL : JSONB (valeur Python = dict), indexable en GIN
+    - autres bases : TEXT contenant du JSON ou un payload binaire (payload_codec)
+    """
+    impl = Text
+    cache_ok = True
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(JSONB())
+        return dialect.type_descriptor(Text())
+    
+    def process_bind_param(self, value, dialect):
+        # JSON texte ou binaire reçu sur PostgreSQL → dict pour le type JSONB
+        if dialect.name == "postgresql" and isinstance(value, (str, bytes)):
+            return payload_codec.decode(value)
+        return value
+
+def gin_index(name: str, column: str) -> Index:
+    """Index GIN (jsonb_path_ops) pour les filtres @> ; créé sur PostgreSQL uniquement."""
+    return Index(
+        name, column,
+        postgresql_using="gin",
+        postgresql_ops={column: "jsonb_path_ops"}
+    ).ddl_if(dialect="postgresql")
+
+# Features filtrables sur /employees et /predictions/logs (voir feature_filters.py)
+FILTERED_FEATURES = ("departement", "poste", "heure_supplementaires")
+
+def sqlite_feature_indexes(table: str, column: str, key: str) -> tuple:
+    """
+    Index des filtres par feature sur SQLite (créés sur SQLite uniquement) :
+    un index d'expression json_extract par feature filtrable, limité aux
+    lignes JSON, et un index partiel des lignes binaires (payload_codec).
+    `key` : clé primaire de la table.
+    """
+    json_indexes = tuple(
+        Index(
+            f"ix_{table}_{column}_{feature}",
+            text(f"json_extract({column}, '$.{feature}')"),
+            sqlite_where=text(f"typeof({column}) = 'text'")
+        ).ddl_if(dialect="sqlite")
+        for feature in FILTERED_FEATURES
+    )
+    binary_index = Index(
+        f"ix_{table}_{column}_binary", key, sqlite_where=text(f"typeof({column}) = 'blob'")
+    ).ddl_if(dialect="sqlite")
+    return json_indexes + (binary_index,)
 
 class Employee(Base):
     __tablename__ = "employees"
     
     id = Column(Integer, primary_key=True, index=True)
     identifier = Column(String, unique=True, index=True)
-    features = Column(Text)  # JSON avec features
-    target = Column(String, nullable=True)  # "Oui" ou "Non"
+    features = Column(FeaturePayload)  # JSON avec features
+    # SHA-256 du JSON canonique des features : import incrémental (import_data.py)
+    features_hash = Column(String(64), nullable=True)
+    target = Column(String, nullable=True, index=True)  # "Oui" ou "Non"
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Filtres par feature de /employees (migrations/versions/0004_jsonb_features.py)
+    __table_args__ = (
+        gin_index("ix_employees_features_gin", "features"),
+        *sqlite_feature_indexes("employees", "features", "id"),
+    )
+
+class FeatureBlob(Base):
+    """Features d'entrée stockées une seule fois, adressées par leur contenu."""
+    __tablename__ = "feature_blobs"
+    
+    # SHA-256 du JSON canonique (voir feature_store.py)
+    hash = Column(String(64), primary_key=True)
+    payload = Column(FeaturePayload, nullable=False)  # voir payload_codec.py
+    created_at = Column(DateTime, default=datetime.utcnow)
+    # Dernière référence par un log (voir feature_store.delete_orphan_blobs)
+    referenced_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        gin_index("ix_feature_blobs_payload_gin", "payload"),
+        *sqlite_feature_indexes("feature_blobs", "payload", "hash"),
+    )
+
+class FeatureSchema(Base):
+    """Ordre des features d'un payload "packed" (payload_codec), par empreinte."""
+    __tablename__ = "feature_schemas"
+    
+    # payload_codec.schema_id (CRC32, jusqu'à 2^32 - 1 : BIGINT sur PostgreSQL)
+    id = Column(BigInteger, primary_key=True, autoincrement=False)
+    feature_names = Column(Text, nullable=False)  # liste JSON, dans l'ordre
     created_at = Column(DateTime, default=datetime.utcnow)
 
 class PredictionLog(Base):
@@ -19,8 +107,30 @@ class PredictionLog(Base):
     # Lien optionnel vers un employé existant (pour endpoint 1)
     employee_id = Column(Integer, ForeignKey('employees.id'), nullable=True)
     
-    # Features utilisées pour la prédiction (JSON)
-    input_features = Column(Text, nullable=False)
+    # Features utilisées pour la prédiction :
+    # - features_hash → feature_blobs (logs écrits par l'API, dédupliqués)
+    # - colonne input_features → JSON en ligne (logs historiques)
+    features_hash = Column(
+        String(64), ForeignKey('feature_blobs.hash', name="fk_predictions_logs_features_hash"), nullable=True
+    )
+    features_blob = relationship(FeatureBlob)
+    _input_features = Column("input_features", FeaturePayload, nullable=True)
+    
+    def _get_input_features(self):
+        if self._input_features is not None:
+            return self._input_features
+        if self.features_blob is not None:
+            return self.features_blob.payload
+        return None
+    
+    def _set_input_features(self, value):
+        self._input_features = value
+    
+    # JSON des features, quel que soit le mode de stockage
+    input_features = synonym(
+        "_input_features",
+        descriptor=property(_get_input_features, _set_input_features)
+    )
     
     # Résultat de la prédiction
     prediction_result = Column(String, nullable=False)  # "Oui" ou "Non"
@@ -32,4 +142,29 @@ class PredictionLog(Base):
     model_version = Column(String, default="v1.0")
     
     # Timestamp
-    created_at = Column(DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = Column(DateTime, default=datetime.utcnow)
+    
+    # Index créés sur les bases existantes par migrations/versions/0002_performance_indexes.py
+    __table_args__ = (
+        # Pagination par curseur sur (created_at, id) décroissant
+        Index("ix_predictions_logs_created_at_id", "created_at", "id"),
+        # Historique d'un employé, du plus récent au plus ancien
+        Index("ix_predictions_logs_employee_id_created_at", "employee_id", "created_at"),
+        # /stats : GROUP BY prediction_result
+        Index("ix_predictions_logs_prediction_result", "prediction_result"),
+        # Volumes par version de modèle sur une période
+        Index("ix_predictions_logs_model_version_created_at", "model_version", "created_at"),
+        # Nettoyage des blobs orphelins après archivage
+        Index("ix_predictions_logs_features_hash", "features_hash"),
+        # Filtres par feature sur les logs historiques (features en ligne)
+        gin_index("ix_predictions_logs_input_features_gin", "input_features"),
+        *sqlite_feature_indexes("predictions_logs", "input_features", "id"),
+        # Features en ligne OU référencées, jamais absentes
+        CheckConstraint(
+            "input_features IS NOT NULL OR features_hash IS NOT NULL",
+            name="ck_predictions_logs_features"
+        ),
+        # SQLite : id jamais réattribués après archivage de la fin de la table
+        # (migrations/versions/0009_predictions_logs_autoincrement.py)
+        {"sqlite_autoincrement": True},
+    )
\ No newline at end of file
@@ -0,0 +1,145 @@
+"""
+Négociation msgpack des entrées / sorties de prédiction
+
+Les appelants internes à fort volume peuvent envoyer et recevoir les
+prédictions en msgpack (application/x-msgpack) au lieu de JSON :
+- requête : `Content-Type: application/x-msgpack`. Le corps est décodé par
+  msgpack puis validé directement dans le modèle Pydantic de la requête,
+  sans passer par du JSON ;
+- réponse : `Accept: application/x-msgpack` (préféré à application/json).
+
+JSON reste le format par défaut. Les datetime sont écrits en ISO 8601 (comme
+en JSON) et les clés des maps doivent être des chaînes.
+
+Utilisé par /predict/new_employee, /predict/batch, /predict/from_ids et
+l'export en flux /predictions/logs/export (format msgpack : une map par log,
+concaténées). Nécessite le paquet msgpack (sinon 415 pour un corps msgpack,
+et réponses en JSON).
+"""
+
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Type
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+from fast_json import FastJSONResponse
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+MEDIA_TYPE = "application/x-msgpack"
+MEDIA_TYPES = {MEDIA_TYPE, "application/msgpack", "application/vnd.msgpack"}
+# Media ranges servis en JSON
+_JSON_RANGES = {"application/json", "application/*", "*/*"}
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if hasattr(value, "tolist"):  # numpy
+        return value.tolist()
+    raise TypeError(f"Type non sérialisable en msgpack : {type(value).__name__}")
+
+
+def packb(value: Any) -> bytes:
+    """Encode en msgpack (datetime → ISO 8601, numpy → types Python)."""
+    return msgpack.packb(value, default=_default, use_bin_type=True)
+
+
+def unpackb(data: bytes) -> Any:
+    """Décode du msgpack (chaînes UTF-8, clés de map en chaînes uniquement)."""
+    return msgpack.unpackb(data, raw=False)
+
+
+def _media_type(content_type: str) -> str:
+    return content_type.split(";")[0].strip().lower()
+
+
+# =============================================================================
+# NÉGOCIATION
+# =============================================================================
+
+def accepts_msgpack(request: Request) -> bool:
+    """
+    Dépendance FastAPI : True si le client préfère msgpack à JSON.
+
+    Compare les q-values des media ranges de Accept ; à q égal, le premier
+    listé l'emporte. Toujours False si msgpack n'est pas installé.
+    """
+    if msgpack is None:
+        return False
+    best_msgpack = best_json = None
+    for position, media_range in enumerate(request.headers.get("accept", "").split(",")):
+        name, *parameters = media_range.split(";")
+        quality = 1.0
+        for parameter in parameters:
+            key, _, value = parameter.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        rank = (quality, -position)
+        name = name.strip().lower()
+        if name in MEDIA_TYPES and quality > 0:
+            best_msgpack = max(best_msgpack or rank, rank)
+        elif name in _JSON_RANGES and quality > 0:
+            best_json = max(best_json or rank, rank)
+    return best_msgpack is not None and (best_json is None or best_msgpack > best_json)
+
+
+def body(model: Type[BaseModel]):
+    """
+    Dépendance FastAPI : corps de la requête (JSON ou msgpack) validé dans
+    `model`. Erreurs de validation en 422, comme un corps JSON classique.
+    """
+    async def parse_body(request: Request) -> BaseModel:
+        raw = await request.body()
+        try:
+            if _media_type(request.headers.get("content-type", "")) in MEDIA_TYPES:
+                if msgpack is None:
+                    raise HTTPException(
+                        status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                        detail="Corps msgpack non supporté : le paquet msgpack n'est pas installé"
+                    )
+                try:
+                    data = unpackb(raw)
+                except (ValueError, msgpack.UnpackException) as e:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Corps msgpack invalide : {e}"
+                    )
+                return model.model_validate(data)
+            return model.model_validate_json(raw)
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+
+    return parse_body
+
+
+def respond(content: Any, binary: bool, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Réponse msgpack si `binary` (voir accepts_msgpack), JSON sinon."""
+    headers = {**(headers or {}), "Vary": "Accept"}
+    if binary:
+        return Response(packb(content), media_type=MEDIA_TYPE, headers=headers)
+    return FastJSONResponse(content, headers=headers)
+
+
+def openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """openapi_extra : corps de requête documenté en JSON et en msgpack."""
+    schema = model.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": schema},
+                MEDIA_TYPE: {"schema": schema},
+            },
+        }
+    }
@@ -0,0 +1,80 @@
+"""
+Pagination par curseur (keyset) pour les endpoints de listing
+
+Au lieu de `OFFSET skip`, qui oblige la base à parcourir puis jeter `skip`
+lignes, le client renvoie un curseur opaque contenant la clé de tri de la
+dernière ligne reçue. La page suivante démarre directement à cette clé
+grâce à l'index, donc la page N coûte autant que la page 1.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict
+
+# Header HTTP dans lequel le curseur de la page suivante est renvoyé
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """
+    Encode la clé de tri de la dernière ligne en un jeton opaque.
+
+    Args:
+        values: Dictionnaire JSON-sérialisable (datetimes acceptés)
+
+    Returns:
+        str: Jeton base64 URL-safe, sans padding
+    """
+    payload = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in values.items()
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """
+    Décode un jeton produit par `encode_cursor`.
+
+    Raises:
+        ValueError: Si le jeton est illisible
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError(f"Curseur invalide : {token!r}") from e
+
+    if not isinstance(payload, dict):
+        raise ValueError(f"Curseur invalide : {token!r}")
+    return payload
+
+
+def employees_cursor(employee) -> str:
+    """Curseur pour /employees (tri par id croissant)."""
+    return encode_cursor({"id": employee.id})
+
+
+def decode_employees_cursor(token: str) -> int:
+    """Retourne le dernier id vu, à partir d'un curseur /employees."""
+    payload = decode_cursor(token)
+    try:
+        return int(payload["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Curseur invalide : {token!r}") from e
+
+
+def logs_cursor(log) -> str:
+    """Curseur pour /predictions/logs (tri par (created_at, id) décroissant)."""
+    return encode_cursor({"created_at": log.created_at, "id": log.id})
+
+
+def decode_logs_cursor(token: str):
+    """Retourne le couple (created_at, id) de la dernière ligne vue."""
+    payload = decode_cursor(token)
+    try:
+        return datetime.fromisoformat(payload["created_at"]), int(payload["id"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Curseur invalide : {token!r}") from e
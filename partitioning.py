@@ -0,0 +1,203 @@
+"""
+Partitionnement temporel de la table predictions_logs
+
+- PostgreSQL : partitionnement natif `PARTITION BY RANGE (created_at)`, une
+  partition par mois (predictions_logs_AAAA_MM) + une partition DEFAULT.
+  Archiver un mois revient à détacher puis supprimer sa partition : les index
+  et le VACUUM ne portent que sur les mois encore dans la fenêtre de rétention.
+- SQLite : pas de partitionnement natif. La table reste unique et les périodes
+  tournent : chaque mois sorti de la fenêtre est exporté puis supprimé de la
+  table chaude par `log_archive.py`.
+"""
+
+import logging
+from datetime import datetime
+from typing import Iterator
+
+from sqlalchemy import text
+
+from models import PredictionLog
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = PredictionLog.__tablename__
+DEFAULT_PARTITION = f"{TABLE_NAME}_default"
+# Clé étrangère vers feature_blobs (même nom que models.py et la migration 0003)
+FEATURES_FK_NAME = "fk_predictions_logs_features_hash"
+
+
+# =============================================================================
+# PÉRIODES (MOIS)
+# =============================================================================
+
+def month_start(dt: datetime) -> datetime:
+    """Premier instant du mois contenant `dt`."""
+    return datetime(dt.year, dt.month, 1)
+
+
+def next_month(dt: datetime) -> datetime:
+    """Premier instant du mois suivant celui de `dt`."""
+    if dt.month == 12:
+        return datetime(dt.year + 1, 1, 1)
+    return datetime(dt.year, dt.month + 1, 1)
+
+
+def iter_months(start: datetime, end: datetime) -> Iterator[datetime]:
+    """Débuts de mois de `start` (inclus) à `end` (exclu)."""
+    current = month_start(start)
+    while current < end:
+        yield current
+        current = next_month(current)
+
+
+def partition_name(period_start: datetime) -> str:
+    """Nom de la partition (ou de l'archive) d'un mois : predictions_logs_AAAA_MM."""
+    return f"{TABLE_NAME}_{period_start:%Y_%m}"
+
+
+# =============================================================================
+# POSTGRESQL
+# =============================================================================
+
+def is_partitioned(conn) -> bool:
+    """True si predictions_logs est une table partitionnée PostgreSQL."""
+    if conn.dialect.name != "postgresql":
+        return False
+    row = conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name"
+    ), {"name": TABLE_NAME}).first()
+    return row is not None
+
+
+def partition_exists(conn, period_start: datetime) -> bool:
+    """True si la partition du mois existe (PostgreSQL uniquement)."""
+    if conn.dialect.name != "postgresql":
+        return False
+    row = conn.execute(
+        text("SELECT to_regclass(:name)"),
+        {"name": partition_name(period_start)}
+    ).scalar()
+    return row is not None
+
+
+def ensure_partitions(conn, start: datetime = None, months_ahead: int = 3) -> None:
+    """
+    Crée les partitions mensuelles manquantes de `start` jusqu'à
+    `months_ahead` mois après le mois courant. Sans effet hors PostgreSQL
+    ou si la table n'est pas partitionnée.
+    """
+    if not is_partitioned(conn):
+        return
+
+    now = datetime.utcnow()
+    end = month_start(now)
+    for _ in range(months_ahead + 1):
+        end = next_month(end)
+
+    for period in iter_months(start or now, end):
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition_name(period)} "
+            f"PARTITION OF {TABLE_NAME} "
+            f"FOR VALUES FROM ('{period:%Y-%m-%d}') TO ('{next_month(period):%Y-%m-%d}')"
+        ))
+
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {TABLE_NAME} DEFAULT"
+    ))
+
+
+def copy_rows(conn, source: str, target: str, now: datetime) -> int:
+    """
+    Copie toutes les lignes de `source` dans `target` et vérifie leur nombre.
+
+    created_at fait partie de la clé primaire de la table partitionnée : un
+    log sans date reçoit `now` (il rejoint la partition du mois courant) au
+    lieu d'être perdu. Lève RuntimeError si des lignes manquent après la
+    copie, pour que la transaction soit annulée avant la suppression de
+    `source`.
+    """
+    backfilled = conn.execute(
+        text(f"UPDATE {source} SET created_at = :now WHERE created_at IS NULL"),
+        {"now": now}
+    ).rowcount
+    if backfilled:
+        logger.warning(f"⚠️ {backfilled} log(s) sans created_at datés du {now:%Y-%m-%d %H:%M}")
+
+    expected = conn.execute(text(f"SELECT COUNT(*) FROM {source}")).scalar()
+    conn.execute(text(f"INSERT INTO {target} SELECT * FROM {source}"))
+    copied = conn.execute(text(f"SELECT COUNT(*) FROM {target}")).scalar()
+    if copied != expected:
+        raise RuntimeError(
+            f"Copie de {source} incomplète : {copied} ligne(s) sur {expected}, conversion annulée"
+        )
+    return copied
+
+
+def _convert_to_partitioned(conn) -> None:
+    """
+    Convertit une table predictions_logs classique (créée par create_all)
+    en table partitionnée, en conservant les lignes et la séquence des id.
+    """
+    legacy = f"{TABLE_NAME}_unpartitioned"
+    logger.info(f"🔧 Conversion de {TABLE_NAME} en table partitionnée par mois...")
+
+    # Les noms d'index et de contraintes sont globaux au schéma : on libère
+    # ceux de l'ancienne table avant de les recréer sur la table partitionnée.
+    for index in PredictionLog.__table__.indexes:
+        conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+    conn.execute(text(f"ALTER TABLE {TABLE_NAME} RENAME TO {legacy}"))
+    conn.execute(text(f"ALTER TABLE {legacy} RENAME CONSTRAINT {TABLE_NAME}_pkey TO {legacy}_pkey"))
+
+    # La clé primaire d'une table partitionnée doit inclure la clé de partition
+    conn.execute(text(
+        f"CREATE TABLE {TABLE_NAME} (LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE (created_at)"
+    ))
+    conn.execute(text(f"ALTER TABLE {TABLE_NAME} ADD PRIMARY KEY (id, created_at)"))
+    # Noms explicites, ceux des migrations (0003 les supprime par leur nom)
+    conn.execute(text(
+        f"ALTER TABLE {TABLE_NAME} ADD CONSTRAINT {TABLE_NAME}_employee_id_fkey "
+        f"FOREIGN KEY (employee_id) REFERENCES employees (id)"
+    ))
+    conn.execute(text(
+        f"ALTER TABLE {TABLE_NAME} ADD CONSTRAINT {FEATURES_FK_NAME} "
+        f"FOREIGN KEY (features_hash) REFERENCES feature_blobs (hash)"
+    ))
+    conn.execute(text(f"ALTER SEQUENCE {TABLE_NAME}_id_seq OWNED BY {TABLE_NAME}.id"))
+
+    now = datetime.utcnow()
+    oldest = conn.execute(text(f"SELECT MIN(created_at) FROM {legacy}")).scalar()
+    ensure_partitions(conn, start=oldest)
+
+    copy_rows(conn, legacy, TABLE_NAME, now)
+    conn.execute(text(f"DROP TABLE {legacy}"))
+
+    for index in PredictionLog.__table__.indexes:
+        index.create(conn)
+
+    logger.info(f"✅ {TABLE_NAME} partitionnée")
+
+
+def setup_partitioning(engine) -> None:
+    """
+    Met en place le partitionnement sur PostgreSQL (idempotent) et crée les
+    partitions des prochains mois. Sans effet sur SQLite.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            _convert_to_partitioned(conn)
+        ensure_partitions(conn)
+
+
+def prepare_upcoming_partitions(engine, months_ahead: int = 3) -> None:
+    """Crée à l'avance les partitions des prochains mois (PostgreSQL uniquement)."""
+    if engine.dialect.name != "postgresql":
+        return
+
+    with engine.begin() as conn:
+        ensure_partitions(conn, months_ahead=months_ahead)
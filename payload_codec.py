@@ -0,0 +1,252 @@
+"""
+Codec des features stockées (employees.features, feature_blobs.payload)
+
+Le format d'écriture est choisi par FEATURES_CODEC :
+- "json"    : JSON canonique en texte (défaut, format historique)
+- "msgpack" : dictionnaire MessagePack binaire
+- "packed"  : vecteur MessagePack des seules valeurs, dans l'ordre des
+              `feature_names` du modèle (les noms ne sont plus répétés)
+
+FEATURES_COMPRESSION=zlib compresse en plus les payloads binaires assez gros
+(seulement si le résultat est plus petit).
+
+Quel que soit le codec configuré, `decode` relit tous les formats : les lignes
+JSON existantes restent lisibles et le codec peut être changé à chaud. Un
+payload binaire commence par l'octet 0x00 (impossible en JSON), suivi d'un
+octet d'en-tête : identifiant du format + drapeau de compression.
+
+Les formats binaires ne sont écrits que sur SQLite, dont les colonnes TEXT
+acceptent des BLOB. Sur PostgreSQL, les colonnes sont en JSONB
+(models.FeaturePayload) : le payload est alors le dict lui-même.
+
+Les schémas du format "packed" (ordre des features) sont conservés dans la
+table feature_schemas (feature_store.init_schemas) : un schéma absent de la
+mémoire, ex. celui d'un modèle précédent ou dans un script lancé à part, est
+relu en base au premier payload qui l'utilise.
+
+Nécessite msgpack pour les formats binaires. La lecture du JSON passe par
+fast_json (orjson si installé).
+"""
+
+import json
+import logging
+import os
+import zlib
+from typing import Any, Callable, Dict, Iterable, Optional, Union
+
+import fast_json
+
+try:
+    import msgpack
+except ImportError:  # dépendance optionnelle
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+Payload = Union[str, bytes, Dict[str, Any]]
+
+MAGIC = b"\x00"
+FORMAT_MSGPACK = 0x01
+FORMAT_PACKED = 0x02
+FLAG_ZLIB = 0x80
+
+# Bases dont les colonnes TEXT peuvent recevoir un payload binaire
+BINARY_DIALECTS = {"sqlite"}
+# Bases où les features sont en JSON natif (JSONB) : le driver sérialise
+NATIVE_JSON_DIALECTS = {"postgresql"}
+
+COMPRESS_MIN_BYTES = int(os.getenv("FEATURES_COMPRESS_MIN_BYTES", "256"))
+
+# Schémas connus du format "packed" : empreinte → ordre des features
+_schemas: Dict[int, tuple] = {}
+# Schéma utilisé à l'écriture (celui du modèle servi)
+_current: Optional[int] = None
+# Recherche d'un schéma inconnu en mémoire (feature_store.init_schemas)
+_resolver: Optional[Callable[[int], Optional[Iterable[str]]]] = None
+
+
+def schema_id(feature_names: Iterable[str]) -> int:
+    """Empreinte (CRC32) d'une liste ordonnée de features."""
+    return zlib.crc32("\x1f".join(feature_names).encode("utf-8"))
+
+
+def register_schema(feature_names: Iterable[str]) -> int:
+    """
+    Déclare l'ordre des features du format "packed" (à appeler après le
+    chargement du modèle). Les schémas précédents restent décodables.
+    """
+    global _current
+    sid = add_schema(feature_names)
+    _current = sid
+    return sid
+
+
+def add_schema(feature_names: Iterable[str]) -> int:
+    """Ajoute un schéma en lecture seule (ex. modèle précédent) sans changer celui d'écriture."""
+    names = tuple(feature_names)
+    sid = schema_id(names)
+    _schemas[sid] = names
+    return sid
+
+
+def current_schema() -> Optional[tuple]:
+    """Ordre des features utilisé à l'écriture (None si aucun schéma déclaré)."""
+    return _schemas.get(_current) if _current is not None else None
+
+
+def set_schema_resolver(resolver: Optional[Callable[[int], Optional[Iterable[str]]]]) -> None:
+    """Fonction appelée avec l'empreinte d'un schéma inconnu ; renvoie ses features ou None."""
+    global _resolver
+    _resolver = resolver
+
+
+def _schema(sid: int) -> tuple:
+    if sid not in _schemas and _resolver is not None:
+        names = _resolver(sid)
+        if names is not None:
+            add_schema(names)
+    if sid not in _schemas:
+        raise ValueError(f"❌ Schéma de features inconnu ({sid:08x}) : absent de feature_schemas")
+    return _schemas[sid]
+
+
+# =============================================================================
+# CODECS
+# =============================================================================
+
+class JsonCodec:
+    name = "json"
+    binary = False
+
+    def encode(self, features: Dict[str, Any]) -> str:
+        return json.dumps(features, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+class MsgpackCodec:
+    name = "msgpack"
+    binary = True
+
+    def __init__(self, compression: Optional[str] = None):
+        if msgpack is None:
+            raise RuntimeError("❌ Le codec de features 'msgpack' nécessite le paquet msgpack")
+        self.compression = compression
+
+    def _frame(self, fmt: int, body: bytes) -> bytes:
+        if self.compression == "zlib" and len(body) >= COMPRESS_MIN_BYTES:
+            compressed = zlib.compress(body, 6)
+            if len(compressed) < len(body):
+                return MAGIC + bytes([fmt | FLAG_ZLIB]) + compressed
+        return MAGIC + bytes([fmt]) + body
+
+    def encode(self, features: Dict[str, Any]) -> bytes:
+        return self._frame(FORMAT_MSGPACK, msgpack.packb(features, use_bin_type=True))
+
+
+class PackedCodec(MsgpackCodec):
+    """
+    Vecteur de valeurs dans l'ordre du schéma enregistré. Un dictionnaire qui
+    n'a pas exactement les features du schéma est écrit en msgpack classique.
+    """
+    name = "packed"
+
+    def encode(self, features: Dict[str, Any]) -> bytes:
+        names = current_schema()
+        if names is None:
+            return super().encode(features)
+        sid = _current
+        if len(features) != len(names) or not all(name in features for name in names):
+            return super().encode(features)
+        body = sid.to_bytes(4, "big") + msgpack.packb(
+            [features[name] for name in names], use_bin_type=True
+        )
+        return self._frame(FORMAT_PACKED, body)
+
+
+CODECS = {"json": JsonCodec, "msgpack": MsgpackCodec, "packed": PackedCodec}
+
+
+def make_codec(name: str = "json", compression: Optional[str] = None):
+    """Instancie un codec par son nom (FEATURES_CODEC)."""
+    if name not in CODECS:
+        raise ValueError(f"❌ Codec de features inconnu : {name} (attendu : {', '.join(CODECS)})")
+    if name == "json":
+        return JsonCodec()
+    return CODECS[name](compression=compression if compression not in (None, "", "none") else None)
+
+
+_json_codec = JsonCodec()
+codec = make_codec(
+    os.getenv("FEATURES_CODEC", "json"),
+    os.getenv("FEATURES_COMPRESSION", "none")
+)
+
+
+def configure(name: str, compression: Optional[str] = None) -> None:
+    """Change le codec d'écriture (les lectures restent multi-formats)."""
+    global codec
+    codec = make_codec(name, compression)
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def encode(features: Dict[str, Any], dialect: Optional[str] = None, canonical: Optional[str] = None) -> Payload:
+    """
+    Encode des features pour le stockage.
+
+    Args:
+        features: Dictionnaire des features
+        dialect: Nom du dialecte de la base cible ; hors BINARY_DIALECTS,
+            le JSON est utilisé quel que soit le codec configuré
+        canonical: JSON canonique déjà calculé (feature_store), réutilisé
+            tel quel au lieu d'être ré-encodé
+    """
+    if dialect in NATIVE_JSON_DIALECTS:
+        return features
+    if codec.binary and (dialect is None or dialect in BINARY_DIALECTS):
+        return codec.encode(features)
+    return canonical if canonical is not None else _json_codec.encode(features)
+
+
+def decode(payload: Payload) -> Dict[str, Any]:
+    """Décode un payload stocké, quel que soit son format."""
+    if isinstance(payload, dict):  # JSONB
+        return payload
+    if isinstance(payload, str):
+        return fast_json.loads(payload)
+
+    payload = bytes(payload)
+    if not payload.startswith(MAGIC):
+        return fast_json.loads(payload)
+
+    if msgpack is None:
+        raise RuntimeError("❌ Payload binaire rencontré mais msgpack n'est pas installé")
+
+    header = payload[1]
+    body = payload[2:]
+    if header & FLAG_ZLIB:
+        body = zlib.decompress(body)
+    fmt = header & ~FLAG_ZLIB
+
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.unpackb(body, raw=False)
+    if fmt == FORMAT_PACKED:
+        names = _schema(int.from_bytes(body[:4], "big"))
+        return dict(zip(names, msgpack.unpackb(body[4:], raw=False)))
+    raise ValueError(f"❌ Format de payload inconnu : {fmt:#04x}")
+
+
+def to_json(payload: Optional[Payload]) -> Optional[str]:
+    """
+    Représentation JSON d'un payload stocké (contrat de l'API). Sans coût
+    pour les lignes déjà en JSON.
+    """
+    if payload is None or isinstance(payload, str):
+        return payload
+    if isinstance(payload, dict):  # JSONB
+        return fast_json.dumps(payload, sort_keys=True).decode("utf-8")
+    payload = bytes(payload)
+    if not payload.startswith(MAGIC):
+        return payload.decode("utf-8")
+    return fast_json.dumps(decode(payload), sort_keys=True).decode("utf-8")
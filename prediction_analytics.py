@@ -0,0 +1,211 @@
+"""
+Agrégats temporels des prédictions (volume, Oui / Non, confiance moyenne)
+
+/predictions/analytics découpe predictions_logs en tranches d'une heure, d'un
+jour ou d'une semaine (lundi 00:00), éventuellement par model_version. Le
+calcul est fait par la base en UNE requête GROUP BY, filtrée sur created_at
+(index ix_predictions_logs_created_at_id) :
+- PostgreSQL : date_trunc('hour' | 'day' | 'week', created_at) ;
+- SQLite : strftime() / date().
+
+Une tranche passée depuis plus de CLOSE_GRACE est figée : elle est gardée
+en mémoire et n'est plus recalculée. Le délai couvre les logs datés
+avant la fin de la tranche mais visibles après (commit tardif, retard de la
+réplique). Seules les tranches récentes et les tranches jamais vues sont
+relues, dans la même requête. Le cache est vidé quand log_archive retire
+des mois de la table (nouvelle version du manifeste des archives).
+"""
+
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+import log_archive
+from database import REPLICA_MAX_LAG_SECONDS, naive_utc
+from models import PredictionLog
+
+INTERVALS = {
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+}
+
+# Nombre de tranches renvoyées quand `start` n'est pas fourni
+DEFAULT_BUCKETS = 24
+# Garde-fou : nombre maximal de tranches par requête
+MAX_BUCKETS = int(os.getenv("ANALYTICS_MAX_BUCKETS", "5000"))
+# Délai après la fin d'une tranche avant de la figer : retard de réplication
+# toléré + marge entre l'horodatage d'un log (flush) et son commit
+CLOSE_GRACE = timedelta(seconds=float(
+    os.getenv("ANALYTICS_CLOSE_GRACE_SECONDS", str(REPLICA_MAX_LAG_SECONDS + 30))
+))
+
+
+def floor(moment: datetime, interval: str) -> datetime:
+    """Début de la tranche contenant `moment` (même découpage que la base)."""
+    if interval == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if interval == "day":
+        return day
+    return day - timedelta(days=day.weekday())
+
+
+def _bucket_expression(dialect: str, interval: str):
+    column = PredictionLog.created_at
+    if dialect == "postgresql":
+        return func.date_trunc(interval, column)
+    if interval == "hour":
+        return func.strftime("%Y-%m-%d %H:00:00", column)
+    if interval == "day":
+        return func.date(column)
+    # Dimanche suivant (ou le jour même) - 6 jours = lundi de la semaine
+    return func.date(column, "weekday 0", "-6 days")
+
+
+def _as_datetime(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.fromisoformat(value)
+
+
+def compute(
+    db: Session,
+    interval: str,
+    start: datetime,
+    end: datetime,
+    by_model_version: bool = False
+) -> Dict[datetime, List[Dict[str, Any]]]:
+    """
+    Agrégats des tranches de [start, end[ en une requête GROUP BY.
+
+    Returns:
+        {début de tranche: [ligne par model_version (ou une seule ligne)]}
+    """
+    bucket = _bucket_expression(db.get_bind().dialect.name, interval).label("bucket")
+    columns = [
+        bucket,
+        func.count().label("total"),
+        func.sum(case((PredictionLog.prediction_result == "Oui", 1), else_=0)).label("oui"),
+        func.sum(case((PredictionLog.prediction_result == "Non", 1), else_=0)).label("non"),
+        func.avg(PredictionLog.confidence_score).label("mean_confidence"),
+    ]
+    group_by = [bucket]
+    if by_model_version:
+        columns.insert(1, PredictionLog.model_version)
+        group_by.append(PredictionLog.model_version)
+
+    query = (
+        select(*columns)
+        .where(PredictionLog.created_at >= start, PredictionLog.created_at < end)
+        .group_by(*group_by)
+        .order_by(*group_by)
+    )
+
+    buckets: Dict[datetime, List[Dict[str, Any]]] = {}
+    for row in db.execute(query):
+        values = dict(row._mapping)
+        bucket_start = _as_datetime(values.pop("bucket"))
+        values["mean_confidence"] = (
+            float(values["mean_confidence"]) if values["mean_confidence"] is not None else None
+        )
+        buckets.setdefault(bucket_start, []).append(values)
+    return buckets
+
+
+class AnalyticsCache:
+    """Tranches closes déjà calculées, par (intervalle, regroupement)."""
+
+    def __init__(self, max_buckets: int = 100_000, grace: timedelta = CLOSE_GRACE):
+        self.max_buckets = max_buckets
+        self.grace = grace
+        self._closed: Dict[Tuple[str, bool], Dict[datetime, List[Dict[str, Any]]]] = {}
+        self._archive_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        db: Session,
+        interval: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        by_model_version: bool = False,
+        now: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Tranches non vides de [start, end[ (bornes étendues aux tranches
+        entières), triées par date puis model_version. Par défaut : les
+        DEFAULT_BUCKETS dernières tranches, tranche en cours comprise.
+        Les bornes avec fuseau sont ramenées en UTC.
+
+        Raises:
+            ValueError: intervalle inconnu, période vide ou trop de tranches
+        """
+        if interval not in INTERVALS:
+            raise ValueError(f"Intervalle inconnu : {interval} (attendu : {', '.join(INTERVALS)})")
+        step = INTERVALS[interval]
+        now = now or datetime.utcnow()
+        current = floor(now, interval)
+
+        # Bornes étendues aux tranches entières : [début de tranche, fin de tranche[
+        start = naive_utc(start) if start is not None else None
+        end = naive_utc(end) if end is not None else None
+        end = floor(end - timedelta.resolution, interval) + step if end is not None else current + step
+        start = floor(start, interval) if start is not None else end - DEFAULT_BUCKETS * step
+        if start >= end:
+            raise ValueError("start doit être antérieur à end")
+        if (end - start) / step > MAX_BUCKETS:
+            raise ValueError(f"Trop de tranches demandées (maximum {MAX_BUCKETS})")
+
+        key = (interval, by_model_version)
+        archive_version = log_archive.archive_version()
+        with self._lock:
+            if archive_version != self._archive_version:
+                # Mois archivés depuis le dernier appel : leurs tranches ont changé
+                self._closed.clear()
+                self._archive_version = archive_version
+            closed = dict(self._closed.get(key, {}))
+
+        # Tranche close : finie depuis au moins `grace` (fin <= now - grace)
+        closed_end = min(end, floor(now - self.grace, interval))
+        # Première tranche à relire : la plus ancienne tranche close absente
+        # du cache, sinon la première tranche encore ouverte
+        missing = start
+        while missing < closed_end and missing in closed:
+            missing += step
+
+        fresh: Dict[datetime, List[Dict[str, Any]]] = {}
+        if missing < end:
+            fresh = compute(db, interval, missing, end, by_model_version)
+            with self._lock:
+                if archive_version != self._archive_version:
+                    # Archivage pendant le calcul : ne rien figer
+                    closed_end = missing
+                cached = self._closed.setdefault(key, {})
+                if len(cached) > self.max_buckets:
+                    cached.clear()
+                bucket_start = missing
+                while bucket_start < closed_end:
+                    # Les tranches vides sont aussi mémorisées
+                    cached[bucket_start] = fresh.get(bucket_start, [])
+                    bucket_start += step
+
+        rows = []
+        bucket_start = start
+        while bucket_start < end:
+            source = fresh if bucket_start >= missing else closed
+            for values in source.get(bucket_start, []):
+                rows.append({"bucket_start": bucket_start, **values})
+            bucket_start += step
+        return rows
+
+    def invalidate(self) -> None:
+        """Oublie toutes les tranches (ex. après archivage de logs)."""
+        with self._lock:
+            self._closed.clear()
+
+
+# Instance globale
+analytics_cache = AnalyticsCache()
@@ -0,0 +1,130 @@
+"""
+Réponses allégées : vue "lean" des prédictions et projection `fields=`
+
+- Endpoints de prédiction : `?view=lean` (ou `Accept: application/json;
+  view=lean`) ne renvoie que log_id, prediction, probability,
+  confidence_score, model_version et timestamp, sans le dict `features`.
+- /employees, /predictions/logs, /employees/{id}/predictions : `fields=`
+  liste les colonnes voulues. Les autres ne sont pas lues en base
+  (load_only) : sans `features` / `input_features`, ni le JSON ni les
+  feature_blobs ne sont chargés.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException, Query, Request, status
+from sqlalchemy.orm import load_only, selectinload
+
+import payload_codec
+from models import Employee, PredictionLog
+
+LEAN_FIELDS = ("log_id", "prediction", "probability", "confidence_score", "model_version", "timestamp")
+# Colonnes de predictions_logs nécessaires à la vue lean de /predict/log/{log_id}
+LEAN_LOG_COLUMNS = ("employee_id", "prediction_result", "confidence_score", "model_version")
+
+EMPLOYEE_FIELDS = ("id", "identifier", "features", "target", "created_at")
+LOG_FIELDS = (
+    "id", "employee_id", "input_features", "prediction_result",
+    "confidence_score", "model_version", "created_at"
+)
+
+# Champs JSON exposés en texte (stockage possiblement binaire, cf. payload_codec)
+_PAYLOAD_FIELDS = {"features", "input_features"}
+
+
+# =============================================================================
+# VUE LEAN DES PRÉDICTIONS
+# =============================================================================
+
+def _accept_view(accept: str) -> Optional[str]:
+    for media_range in accept.split(","):
+        for parameter in media_range.split(";")[1:]:
+            key, _, value = parameter.partition("=")
+            if key.strip().lower() == "view":
+                return value.strip().strip('"').lower()
+    return None
+
+
+def prediction_view(
+    request: Request,
+    view: Optional[str] = Query(None, pattern="^(full|lean)$", description="lean : sans les features")
+) -> bool:
+    """Dépendance FastAPI : True si la réponse doit être allégée."""
+    if view is not None:
+        return view == "lean"
+    return _accept_view(request.headers.get("accept", "")) == "lean"
+
+
+def probability(prediction: str, confidence_score: Optional[float]) -> Optional[float]:
+    """Probabilité de démission, retrouvée depuis la confiance d'un log stocké."""
+    if confidence_score is None:
+        return None
+    return confidence_score if prediction == "Oui" else 1 - confidence_score
+
+
+def lean(content: Dict[str, Any]) -> Dict[str, Any]:
+    """Réduit une réponse détaillée aux champs LEAN_FIELDS."""
+    return {field: content.get(field) for field in LEAN_FIELDS}
+
+
+# =============================================================================
+# PROJECTION fields=
+# =============================================================================
+
+def _parse_fields(fields: Optional[str], allowed) -> Optional[List[str]]:
+    if fields is None:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field not in allowed]
+    if unknown or not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champs inconnus : {', '.join(unknown) or '(aucun)'} (disponibles : {', '.join(allowed)})"
+        )
+    return list(dict.fromkeys(requested))
+
+
+def employee_fields(
+    fields: Optional[str] = Query(None, description="Ex. id,identifier,target")
+) -> Optional[List[str]]:
+    """Dépendance FastAPI : colonnes demandées pour /employees (None = toutes)."""
+    return _parse_fields(fields, EMPLOYEE_FIELDS)
+
+
+def log_fields(
+    fields: Optional[str] = Query(None, description="Ex. id,prediction_result,created_at")
+) -> Optional[List[str]]:
+    """Dépendance FastAPI : colonnes demandées pour les logs (None = toutes)."""
+    return _parse_fields(fields, LOG_FIELDS)
+
+
+def employee_options(fields: List[str]):
+    """Options de requête : ne lire que les colonnes demandées (+ id pour le curseur)."""
+    columns = {"id", *fields}
+    return [load_only(*(getattr(Employee, name) for name in EMPLOYEE_FIELDS if name in columns))]
+
+
+def log_options(fields: List[str]):
+    """Idem pour les logs ; feature_blobs n'est chargé que si input_features est demandé."""
+    columns = {"id", "created_at", *fields}
+    attributes = [
+        PredictionLog._input_features if name == "input_features" else getattr(PredictionLog, name)
+        for name in LOG_FIELDS if name in columns
+    ]
+    if "input_features" not in columns:
+        return [load_only(*attributes)]
+    return [
+        load_only(*attributes, PredictionLog.features_hash),
+        selectinload(PredictionLog.features_blob)
+    ]
+
+
+def project(rows, fields: List[str]) -> List[Dict[str, Any]]:
+    """Dicts des seuls champs demandés (features exposées en JSON texte)."""
+    return [
+        {
+            field: payload_codec.to_json(getattr(row, field)) if field in _PAYLOAD_FIELDS else getattr(row, field)
+            for field in fields
+        }
+        for row in rows
+    ]
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+import payload_codec
 
 # ========== SCHÉMAS POUR EMPLOYEES ==========
 
@@ -12,6 +13,9 @@ class EmployeeResponse(BaseModel):
     target: Optional[str]
     created_at: datetime
     
+    # Le stockage peut être binaire (payload_codec) : l'API expose toujours du JSON
+    _features_json = field_validator("features", mode="before")(payload_codec.to_json)
+    
     class Config:
         from_attributes = True
 
@@ -36,6 +40,8 @@ class PredictionLogResponse(BaseModel):
     model_version: str
     created_at: datetime
     
+    _input_features_json = field_validator("input_features", mode="before")(payload_codec.to_json)
+    
     class Config:
         from_attributes = True
 
@@ -45,7 +51,67 @@ class PredictionDetailedResponse(BaseModel):
     employee_id: Optional[int]
     features: Dict[str, Any]
     prediction: str
+    probability: Optional[float] = None
+    confidence_score: Optional[float]
+    model_version: str
+    timestamp: datetime
+    
+# ========== SCHÉMAS POUR LES PRÉDICTIONS PAR LOT ==========
+
+class PredictionBatchRequest(BaseModel):
+    """/predict/batch : plusieurs jeux de features, validés ensemble"""
+    records: List[Dict[str, Any]] = Field(..., min_length=1, description="Liste de dictionnaires de features")
+    model_version: Optional[str] = "v1.0"
+
+class PredictionBatchItem(BaseModel):
+    """Résultat d'un élément du lot (index = position dans la requête)"""
+    index: int
+    log_id: int
+    employee_id: Optional[int] = None
+    prediction: str
+    probability: float
+    confidence_score: float
+    timestamp: datetime
+
+class PredictionBatchResponse(BaseModel):
+    """Réponse de /predict/batch"""
+    model_version: str
+    count: int
+    results: List[PredictionBatchItem]
+
+class PredictionFromIdsRequest(BaseModel):
+    """/predict/from_ids : plusieurs employés existants"""
+    employee_ids: List[int] = Field(..., min_length=1, description="Liste d'id d'employés")
+
+class PredictionFromIdsItem(BaseModel):
+    """Résultat pour un employé : prédiction, ou erreur s'il n'a pas pu être scoré"""
+    employee_id: int
+    found: bool  # l'employé existe (même si ses features n'ont pas pu être scorées)
+    log_id: Optional[int] = None
+    prediction: Optional[str] = None
+    probability: Optional[float] = None
+    confidence_score: Optional[float] = None
+    timestamp: Optional[datetime] = None
+    error: Optional[str] = None
+
+class PredictionFromIdsInvalid(BaseModel):
+    """Employé existant dont les features stockées n'ont pas pu être scorées"""
+    employee_id: int
+    reason: str
+
+class PredictionFromIdsResponse(BaseModel):
+    """Réponse de /predict/from_ids"""
+    model_version: str
+    count: int
+    missing: List[int]
+    invalid: List[PredictionFromIdsInvalid]
+    results: List[PredictionFromIdsItem]
+
+class PredictionLeanResponse(BaseModel):
+    """Réponse allégée (view=lean) : sans les features"""
+    log_id: int
+    prediction: str
+    probability: Optional[float]
     confidence_score: Optional[float]
     model_version: str
     timestamp: datetime
-    
\ No newline at end of file
@@ -0,0 +1,284 @@
+"""
+Lanceur multi-workers de l'API (préchargement du modèle avant fork)
+
+`uvicorn main:app` sert toutes les requêtes dans un seul processus : un
+predict_proba (CPU) y bloque tout le reste. Ce lanceur :
+1. fixe les threads OpenMP / BLAS (avant l'import de numpy et XGBoost) et
+   le n_jobs de XGBoost, pour que N workers n'en lancent pas N × cœurs ;
+2. charge le modèle et prépare la base UNE fois dans le processus parent ;
+3. ouvre le socket d'écoute puis crée les workers par fork : le modèle est
+   partagé en copie sur écriture (gc.freeze évite que le ramasse-miettes
+   ne recopie ces pages) ;
+4. supervise les workers : un worker mort est relancé. Un worker qui meurt
+   avant WORKER_MIN_UPTIME secondes (modèle ou base inutilisable, port...)
+   est relancé avec un délai croissant (0, 1, 2, 4... s, plafonné à
+   WORKER_RESPAWN_BACKOFF_MAX) ; après WORKER_MAX_FAST_CRASHES morts
+   rapides consécutives, le superviseur s'arrête avec le code 1.
+
+Signaux du processus parent :
+- SIGHUP : redémarrage progressif. Le modèle est rechargé, de nouveaux
+  workers sont créés, puis les anciens reçoivent SIGTERM et terminent
+  leurs requêtes en cours. Le socket reste ouvert : aucune connexion
+  refusée pendant l'opération. Si le rechargement échoue (modèle absent
+  ou illisible), l'erreur est journalisée et les workers actuels restent
+  en place.
+- SIGTERM / SIGINT : arrêt propre de tous les workers.
+
+Sans fork (Windows), repli sur un seul processus uvicorn.
+
+Usage :
+    python serve.py                          # un worker par cœur disponible
+    python serve.py --workers 4 --port 7860
+    kill -HUP <pid>                          # après remplacement du modèle
+"""
+
+import argparse
+import os
+
+
+def available_cores() -> int:
+    """Cœurs utilisables par ce processus (affinité CPU si disponible)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Lance l'API avec plusieurs workers")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "7860")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", "0")),
+                        help="Nombre de workers (défaut : un par cœur disponible)")
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WORKER_THREADS", "0")),
+                        help="Threads de calcul par worker (défaut : cœurs / workers)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("GRACEFUL_TIMEOUT", "30")),
+                        help="Secondes laissées aux requêtes en cours à l'arrêt d'un worker")
+    args = parser.parse_args()
+    cores = available_cores()
+    args.workers = args.workers or cores
+    args.threads = args.threads or max(1, cores // args.workers)
+    return args
+
+
+ARGS = parse_args() if __name__ == "__main__" else None
+
+if ARGS is not None:
+    # À fixer avant l'import de numpy / XGBoost : taille des pools de threads
+    for variable in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(variable, str(ARGS.threads))
+
+import gc  # noqa: E402
+import logging  # noqa: E402
+import signal  # noqa: E402
+import socket  # noqa: E402
+import sys  # noqa: E402
+import time  # noqa: E402
+
+import uvicorn  # noqa: E402
+
+logger = logging.getLogger("serve")
+
+# Signaux gérés par le parent ; remis par défaut dans les workers (uvicorn installe les siens)
+PARENT_SIGNALS = (signal.SIGTERM, signal.SIGINT) + ((signal.SIGHUP,) if hasattr(signal, "SIGHUP") else ())
+
+# Mort « rapide » : avant cette durée de vie, le worker n'a sans doute jamais démarré
+MIN_UPTIME = float(os.getenv("WORKER_MIN_UPTIME", "10"))
+MAX_FAST_CRASHES = int(os.getenv("WORKER_MAX_FAST_CRASHES", "5"))
+RESPAWN_BACKOFF_MAX = float(os.getenv("WORKER_RESPAWN_BACKOFF_MAX", "30"))
+
+
+def preload(threads: int) -> None:
+    """Charge le modèle et prépare la base dans le parent, avant le fork."""
+    import main
+    from database import engine, read_engine
+
+    main.prepare()
+    main.model_loader.set_threads(threads)
+    # Aucune connexion du parent ne doit être partagée avec les workers
+    engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+
+
+def open_socket(host: str, port: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def run_worker(sock: socket.socket, threads: int, graceful_timeout: int) -> None:
+    """Corps d'un worker (processus fils)."""
+    for signum in PARENT_SIGNALS:
+        signal.signal(signum, signal.SIG_DFL)
+
+    from threadpoolctl import threadpool_limits
+    from database import engine, read_engine
+    from main import app
+
+    # Pools hérités du parent : nouvelles connexions propres à ce processus
+    engine.dispose(close=False)
+    if read_engine is not None:
+        read_engine.dispose(close=False)
+    threadpool_limits(threads)
+
+    config = uvicorn.Config(app, timeout_graceful_shutdown=graceful_timeout, log_level="info")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+class Supervisor:
+    """Processus parent : crée, surveille et remplace les workers."""
+
+    def __init__(self, sock: socket.socket, args):
+        self.sock = sock
+        self.args = args
+        self.workers = set()
+        self.retiring = set()  # anciens workers en cours d'arrêt (SIGHUP)
+        self.started = {}  # pid → instant de création (time.monotonic)
+        self.respawns = []  # instants des relances différées
+        self.fast_crashes = 0  # morts rapides consécutives
+        self.last_fast_crash = 0.0
+        self.reload = False
+        self.stopping = False
+        self.failed = False
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run_worker(self.sock, self.args.threads, self.args.graceful_timeout)
+            finally:
+                os._exit(0)
+        self.workers.add(pid)
+        self.started[pid] = time.monotonic()
+
+    def terminate(self, pids) -> None:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def reap(self) -> None:
+        """Récupère les workers terminés et relance ceux morts de façon inattendue."""
+        while self.workers:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid not in self.workers:
+                continue
+            self.workers.discard(pid)
+            uptime = time.monotonic() - self.started.pop(pid)
+            if not self.stopping and pid not in self.retiring:
+                self.schedule_respawn(pid, os.waitstatus_to_exitcode(status), uptime)
+            self.retiring.discard(pid)
+
+    def schedule_respawn(self, pid: int, code: int, uptime: float) -> None:
+        """Relance immédiate, différée (morts rapides répétées) ou arrêt du superviseur."""
+        now = time.monotonic()
+        # Une boucle de plantages espace les morts d'au plus délai max + durée minimale
+        if uptime >= MIN_UPTIME or now - self.last_fast_crash > MIN_UPTIME + RESPAWN_BACKOFF_MAX:
+            self.fast_crashes = 0
+        if uptime < MIN_UPTIME:
+            self.fast_crashes += 1
+            self.last_fast_crash = now
+        if self.fast_crashes >= MAX_FAST_CRASHES:
+            logger.error(f"❌ Worker {pid} arrêté (code {code}) : {self.fast_crashes} morts "
+                         f"en moins de {MIN_UPTIME:g} s d'affilée, arrêt du serveur")
+            self.failed = True
+            self.stopping = True
+            return
+        delay = 0 if self.fast_crashes <= 1 else min(RESPAWN_BACKOFF_MAX, 2 ** (self.fast_crashes - 2))
+        logger.warning(f"⚠️ Worker {pid} arrêté (code {code}), relance dans {delay:g} s")
+        if delay == 0:
+            self.spawn()
+        else:
+            self.respawns.append(now + delay)
+
+    def respawn_due(self) -> None:
+        """Crée les workers dont la relance différée est échue."""
+        now = time.monotonic()
+        due = [moment for moment in self.respawns if moment <= now]
+        self.respawns = [moment for moment in self.respawns if moment > now]
+        for _ in due:
+            self.spawn()
+
+    def rolling_restart(self) -> None:
+        """Nouveaux workers (modèle rechargé) puis arrêt progressif des anciens."""
+        logger.info("🔄 Redémarrage progressif des workers")
+        try:
+            preload(self.args.threads)
+        except Exception:
+            # Ne jamais remplacer des workers sains par des workers sans modèle
+            logger.exception("❌ Rechargement du modèle impossible : workers actuels conservés")
+            return
+        gc.freeze()
+        old = set(self.workers)
+        for _ in range(self.args.workers):
+            self.spawn()
+        self.retiring |= old
+        self.terminate(old)
+
+    def run(self) -> None:
+        def on_signal(signum, frame):
+            if hasattr(signal, "SIGHUP") and signum == signal.SIGHUP:
+                self.reload = True
+            else:
+                self.stopping = True
+
+        for signum in PARENT_SIGNALS:
+            signal.signal(signum, on_signal)
+
+        for _ in range(self.args.workers):
+            self.spawn()
+        logger.info(f"🚀 {self.args.workers} workers sur {self.args.host}:{self.args.port} "
+                    f"({self.args.threads} thread(s) de calcul chacun)")
+
+        while not self.stopping:
+            if self.reload:
+                self.reload = False
+                self.rolling_restart()
+            self.reap()
+            if not self.stopping:
+                self.respawn_due()
+            time.sleep(0.2)
+
+        logger.info("🛑 Arrêt des workers")
+        self.terminate(self.workers)
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            self.reap()
+            time.sleep(0.1)
+        for pid in self.workers:
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(process)d] %(message)s")
+
+    if not hasattr(os, "fork"):
+        logger.warning("⚠️ fork indisponible sur cette plateforme : un seul processus")
+        uvicorn.run("main:app", host=ARGS.host, port=ARGS.port)
+        return
+
+    preload(ARGS.threads)
+    sock = open_socket(ARGS.host, ARGS.port)
+    # Objets chargés (modèle, modules) exclus du ramasse-miettes : pages partagées intactes
+    gc.freeze()
+    supervisor = Supervisor(sock, ARGS)
+    supervisor.run()
+    if supervisor.failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
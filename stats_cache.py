@@ -0,0 +1,203 @@
+"""
+Cache des compteurs servis par /stats, /employees/count et /predictions/logs/count
+
+Les compteurs sont calculés par UNE requête d'agrégation (GROUP BY) au lieu
+de six COUNT(*) séparés, puis gardés en mémoire :
+- tant que l'instantané a moins de `ttl` secondes, il est servi tel quel ;
+- au-delà, il est encore servi (stale-while-revalidate) pendant qu'un
+  rafraîchissement unique tourne en tâche de fond ;
+- au-delà de `max_stale` secondes, le rafraîchissement redevient synchrone.
+
+Un seul appelant rafraîchit à la fois : sur un cache froid (ou après
+invalidate()), les requêtes concurrentes attendent le calcul en cours au
+lieu de relancer chacune l'agrégation.
+
+Les endpoints de prédiction incrémentent les compteurs après chaque commit,
+donc les totaux restent exacts entre deux rafraîchissements pour ce processus.
+Les incréments reçus pendant un rafraîchissement sont réappliqués sur le
+nouvel instantané (un log commité juste avant le début du calcul peut alors
+être compté deux fois, jusqu'au rafraîchissement suivant).
+"""
+
+import copy
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from models import Employee, PredictionLog
+
+logger = logging.getLogger(__name__)
+
+
+def _empty_counters() -> Dict[str, Dict[str, int]]:
+    return {
+        "employees": {"total": 0, "Oui": 0, "Non": 0},
+        "predictions": {"total": 0, "Oui": 0, "Non": 0},
+    }
+
+
+class StatsCache:
+    def __init__(self, ttl: float = 5.0, max_stale: float = 60.0):
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._snapshot: Optional[Dict[str, Dict[str, int]]] = None
+        self._refreshed_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        # Un seul rafraîchissement à la fois (synchrone ou en tâche de fond)
+        self._refresh_lock = threading.Lock()
+        # Incréments de prédictions reçus pendant le rafraîchissement en cours
+        self._pending: Optional[Dict[str, int]] = None
+        # Incrémenté par invalidate() : un calcul commencé avant est écarté
+        self._generation = 0
+        # Dernière modification des compteurs (UTC), pour Last-Modified
+        self.modified_at: Optional[datetime] = None
+
+    # -------------------------------------------------------------------------
+    # Calcul
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def compute(db: Session) -> Dict[str, Dict[str, int]]:
+        """Calcule tous les compteurs en une seule requête GROUP BY."""
+        employees = select(
+            literal("employees").label("source"),
+            Employee.target.label("label"),
+            func.count().label("n")
+        ).group_by(Employee.target)
+
+        predictions = select(
+            literal("predictions").label("source"),
+            PredictionLog.prediction_result.label("label"),
+            func.count().label("n")
+        ).group_by(PredictionLog.prediction_result)
+
+        counters = _empty_counters()
+        for source, label, n in db.execute(union_all(employees, predictions)):
+            counters[source]["total"] += n
+            if label in ("Oui", "Non"):
+                counters[source][label] += n
+        return counters
+
+    def refresh(self, db: Session) -> Dict[str, Dict[str, int]]:
+        """Recalcule l'instantané de manière synchrone."""
+        with self._refresh_lock:
+            return self._refresh(db)
+
+    def _refresh(self, db: Session) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            self._pending = {"total": 0, "Oui": 0, "Non": 0}
+            generation = self._generation
+        try:
+            counters = self.compute(db)
+        except Exception:
+            with self._lock:
+                self._pending = None
+                self._refreshing = False
+            raise
+        with self._lock:
+            for label, count in self._pending.items():
+                counters["predictions"][label] += count
+            self._pending = None
+            self._refreshing = False
+            if generation != self._generation:
+                # Invalidé pendant le calcul : ne pas mettre en cache
+                return copy.deepcopy(counters)
+            if counters != self._snapshot:
+                self.modified_at = datetime.utcnow()
+            self._snapshot = counters
+            self._refreshed_at = time.monotonic()
+            return copy.deepcopy(counters)
+
+    def _refresh_once(self, db: Session, seen_at: float) -> Dict[str, Dict[str, int]]:
+        """
+        Rafraîchissement synchrone partagé : l'appelant qui a attendu un
+        calcul terminé entre-temps reprend son résultat sans recalculer.
+        """
+        with self._refresh_lock:
+            with self._lock:
+                if self._snapshot is not None and self._refreshed_at > seen_at:
+                    return copy.deepcopy(self._snapshot)
+            return self._refresh(db)
+
+    def _refresh_in_background(self, bind) -> None:
+        """Rafraîchissement lancé en tâche de fond avec sa propre session."""
+        db = Session(bind=bind)
+        try:
+            self.refresh(db)
+        except Exception as e:
+            logger.error(f"❌ Rafraîchissement des statistiques impossible : {e}")
+        finally:
+            db.close()
+
+    # -------------------------------------------------------------------------
+    # Lecture
+    # -------------------------------------------------------------------------
+
+    def get(self, db: Session, background_tasks=None) -> Dict[str, Dict[str, int]]:
+        """
+        Retourne les compteurs en appliquant TTL + stale-while-revalidate.
+
+        Args:
+            db: Session utilisée si un calcul synchrone est nécessaire
+            background_tasks: BackgroundTasks FastAPI pour le rafraîchissement
+                asynchrone (sinon rafraîchissement synchrone à expiration)
+        """
+        with self._lock:
+            snapshot = copy.deepcopy(self._snapshot)
+            refreshed_at = self._refreshed_at
+            age = time.monotonic() - refreshed_at
+            schedule = (
+                snapshot is not None
+                and self.ttl <= age < self.max_stale
+                and background_tasks is not None
+                and not self._refreshing
+            )
+            if schedule:
+                self._refreshing = True
+
+        if snapshot is None or age >= self.max_stale or (age >= self.ttl and background_tasks is None):
+            return self._refresh_once(db, refreshed_at)
+
+        if schedule:
+            background_tasks.add_task(self._refresh_in_background, db.get_bind())
+
+        return snapshot
+
+    # -------------------------------------------------------------------------
+    # Mise à jour incrémentale par les chemins d'insertion
+    # -------------------------------------------------------------------------
+
+    def record_prediction(self, prediction: str, count: int = 1) -> None:
+        """À appeler après le commit d'un ou plusieurs PredictionLog."""
+        with self._lock:
+            if self._pending is not None:
+                self._pending["total"] += count
+                if prediction in ("Oui", "Non"):
+                    self._pending[prediction] += count
+            if self._snapshot is None:
+                return
+            self._snapshot["predictions"]["total"] += count
+            self.modified_at = datetime.utcnow()
+            if prediction in ("Oui", "Non"):
+                self._snapshot["predictions"][prediction] += count
+
+    def invalidate(self) -> None:
+        """Force un recalcul synchrone au prochain appel."""
+        with self._lock:
+            self._snapshot = None
+            self._refreshed_at = 0.0
+            self._generation += 1
+
+
+# Instance globale
+stats_cache = StatsCache(
+    ttl=float(os.getenv("STATS_CACHE_TTL", "5")),
+    max_stale=float(os.getenv("STATS_CACHE_MAX_STALE", "60"))
+)
@@ -14,10 +14,12 @@ os.environ["API_KEY"] = "test-api-key-12345"
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 # ORDRE IMPORTANT : D'abord Base, puis les modèles
-from database import Base, get_db
+from database import Base, get_db, get_read_db
 from main import app
 from model_loader import model_loader
 from models import Employee, PredictionLog
+from stats_cache import stats_cache
+from prediction_analytics import analytics_cache
 
 # =============================================================================
 # CONFIGURATION DE LA BASE DE DONNÉES DE TEST
@@ -82,7 +84,12 @@ def client(db_session):
     
     # Override de la base de données ET de l'authentification
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     app.dependency_overrides[verify_api_key] = mock_verify_api_key
+    
+    # Repartir de compteurs vides : la DB de test est recréée par module
+    stats_cache.invalidate()
+    analytics_cache.invalidate()
 
     with TestClient(app) as test_client:
         yield test_client
@@ -5,9 +5,18 @@ Ces tests vérifient que l'API fonctionne correctement de bout en bout :
 requête HTTP → traitement → base de données → modèle → réponse JSON.
 """
 
+import json
+from datetime import timedelta
+
+import msgpack
 import pytest
 from sqlalchemy.orm import Session
-from models import Employee, PredictionLog
+
+import admission
+import compression
+import feature_store
+import http_cache
+from models import Employee, FeatureBlob, PredictionLog
 
 
     
@@ -307,6 +316,132 @@ def test_predict_new_employee_empty_features(client):
     assert response.status_code in [200, 400, 422]
 
 
+# =============================================================================
+# PRÉDICTIONS PAR LOT : POST /predict/batch
+# =============================================================================
+
+def test_predict_batch_success(client, valid_employee_data):
+    """
+    OBJECTIF : Scorer plusieurs jeux de features en une requête.
+    
+    JUSTIFICATION : Un appel au modèle et un INSERT pour tout le lot.
+    
+    CRITÈRES DE SUCCÈS :
+    - Un résultat par jeu de features, dans l'ordre de la requête
+    - Mêmes prédictions qu'en un par un
+    - Chaque log_id est relisible via /predict/log/{log_id}
+    """
+    from model_loader import model_loader
+    
+    older = dict(valid_employee_data, age=58)
+    records = [valid_employee_data, older, valid_employee_data]
+    
+    response = client.post("/predict/batch", json={"records": records, "model_version": "v1.0"})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 3
+    assert [item["index"] for item in data["results"]] == [0, 1, 2]
+    assert len({item["log_id"] for item in data["results"]}) == 3
+    
+    for item, features in zip(data["results"], records):
+        expected = model_loader.predict(features)
+        assert item["prediction"] == expected["prediction"]
+        assert item["probability"] == pytest.approx(expected["probability"])
+        
+        log = client.get(f"/predict/log/{item['log_id']}").json()
+        assert log["features"]["age"] == features["age"]
+        assert log["prediction"] == item["prediction"]
+
+
+def test_predict_batch_limits(client, valid_employee_data, monkeypatch):
+    """
+    OBJECTIF : Refuser les lots vides ou trop grands.
+    
+    CRITÈRES DE SUCCÈS :
+    - 422 pour un lot vide
+    - 413 au-delà de PREDICT_BATCH_MAX_SIZE
+    """
+    import batch_scoring
+    
+    monkeypatch.setattr(batch_scoring, "MAX_BATCH_SIZE", 2)
+    
+    assert client.post("/predict/batch", json={"records": []}).status_code == 422
+    response = client.post("/predict/batch", json={"records": [valid_employee_data] * 3})
+    assert response.status_code == 413
+
+
+def test_predict_from_ids_reports_missing(client, db_session, setup_test_data, monkeypatch):
+    """
+    OBJECTIF : Scorer plusieurs employés existants en une requête.
+    
+    JUSTIFICATION : Un id inconnu ne doit pas faire échouer tout le lot.
+    
+    CRITÈRES DE SUCCÈS :
+    - Un résultat par id distinct, dans l'ordre de la requête
+    - L'id inconnu est signalé (found=false) et listé dans `missing`
+    - Mêmes prédictions que /predict/from_id, logs relisibles
+    """
+    import batch_scoring
+    
+    features = json.loads(setup_test_data.features)
+    db_session.add(Employee(id=2, identifier="BATCH_2", features=json.dumps(dict(features, age=58)), target="Oui"))
+    db_session.commit()
+    # Une requête IN par id : le découpage en tranches est exercé
+    monkeypatch.setattr(batch_scoring, "LOOKUP_CHUNK", 1)
+    
+    response = client.post("/predict/from_ids", json={"employee_ids": [1, 999, 2, 1]})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["employee_id"] for item in data["results"]] == [1, 999, 2]
+    assert data["count"] == 2
+    assert data["missing"] == [999]
+    assert data["results"][1]["found"] is False
+    assert "999" in data["results"][1]["error"]
+    
+    single = client.post("/predict/from_id/2").json()
+    batch_item = data["results"][2]
+    assert batch_item["prediction"] == single["prediction"]
+    assert batch_item["confidence_score"] == pytest.approx(single["confidence_score"])
+    
+    log = client.get(f"/predict/log/{batch_item['log_id']}").json()
+    assert log["employee_id"] == 2
+    assert log["features"]["age"] == 58
+    assert data["invalid"] == []
+
+
+def test_predict_from_ids_reports_invalid_features(client, db_session, setup_test_data):
+    """
+    OBJECTIF : Distinguer un employé inconnu d'un employé aux features inutilisables.
+    
+    CRITÈRES DE SUCCÈS :
+    - Features illisibles ou non-objet : listés dans `invalid` avec la raison,
+      found=true, sans log
+    - Seul l'id inconnu est dans `missing`
+    - Le reste du lot est scoré
+    """
+    db_session.add_all([
+        Employee(id=3, identifier="BROKEN_3", features=b"\xc1 tronque", target="Non"),
+        Employee(id=4, identifier="LIST_4", features="[1, 2]", target="Non"),
+    ])
+    db_session.commit()
+    
+    response = client.post("/predict/from_ids", json={"employee_ids": [1, 3, 4, 999]})
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 1
+    assert data["missing"] == [999]
+    assert [item["employee_id"] for item in data["invalid"]] == [3, 4]
+    assert "illisibles" in data["invalid"][0]["reason"]
+    assert "invalides" in data["invalid"][1]["reason"]
+    broken = data["results"][1]
+    assert broken["found"] is True
+    assert broken["log_id"] is None
+    assert broken["error"] == data["invalid"][0]["reason"]
+
+
 # =============================================================================
 # ENDPOINT 3 : GET /predict/log/{log_id}
 # =============================================================================
@@ -555,4 +690,953 @@ def test_get_statistics_with_auth(client, setup_test_data):
     data = response.json()
     assert "employees" in data
     assert "predictions" in data
-    assert "model" in data    
\ No newline at end of file
+    assert "model" in data    
+
+# =============================================================================
+# PAGINATION PAR CURSEUR (KEYSET)
+# =============================================================================
+
+@pytest.fixture(scope="function")
+def paginated_data(db_session):
+    """
+    Fixture créant 5 employés et 5 logs pour parcourir plusieurs pages.
+    """
+    from datetime import datetime, timedelta
+    
+    base_time = datetime(2025, 1, 1, 12, 0, 0)
+    employees = [
+        Employee(identifier=f"PAGE_{i}", features='{"age": 30}', target="Non")
+        for i in range(5)
+    ]
+    db_session.add_all(employees)
+    db_session.commit()
+    
+    # Deux logs partagent le même created_at pour tester le départage par id
+    for i in range(5):
+        db_session.add(PredictionLog(
+            employee_id=None,
+            input_features='{"age": 30}',
+            prediction_result="Non",
+            confidence_score=0.5,
+            created_at=base_time + timedelta(minutes=min(i, 3))
+        ))
+    db_session.commit()
+    
+    yield
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(Employee).delete()
+    db_session.commit()
+
+
+def test_employees_cursor_pagination(client, paginated_data):
+    """
+    OBJECTIF : Parcourir /employees page par page avec le curseur.
+    
+    CRITÈRES DE SUCCÈS :
+    - Chaque page pleine renvoie un header X-Next-Cursor
+    - Les pages successives ne se recouvrent pas et couvrent tous les employés
+    """
+    seen = []
+    cursor = None
+    
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/employees", params=params)
+        assert response.status_code == 200
+        seen.extend(employee["id"] for employee in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    
+    assert len(seen) == 5
+    assert seen == sorted(set(seen))
+
+
+def test_prediction_logs_cursor_pagination(client, paginated_data):
+    """
+    OBJECTIF : Parcourir /predictions/logs avec le curseur (created_at, id).
+    
+    CRITÈRES DE SUCCÈS :
+    - Ordre du plus récent au plus ancien
+    - Aucun log perdu ni dupliqué, même à created_at égal
+    """
+    seen = []
+    cursor = None
+    
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/predictions/logs", params=params)
+        assert response.status_code == 200
+        seen.extend((log["created_at"], log["id"]) for log in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_invalid_cursor_rejected(client):
+    """Un curseur illisible doit renvoyer 400 et non 500."""
+    assert client.get("/employees", params={"cursor": "pas-un-curseur"}).status_code == 400
+    assert client.get("/predictions/logs", params={"cursor": "pas-un-curseur"}).status_code == 400
+
+
+@pytest.fixture(scope="function")
+def employee_history(db_session):
+    """
+    Fixture : deux employés, 5 logs pour le premier (dont deux au même
+    created_at) et un log pour le second.
+    """
+    from datetime import datetime, timedelta
+    
+    base_time = datetime(2025, 3, 1, 9, 0, 0)
+    followed = Employee(identifier="HISTORY_1", features='{"age": 30}', target="Non")
+    other = Employee(identifier="HISTORY_2", features='{"age": 45}', target="Oui")
+    db_session.add_all([followed, other])
+    db_session.commit()
+    
+    for i in range(5):
+        db_session.add(PredictionLog(
+            employee_id=followed.id,
+            input_features='{"age": 30}',
+            prediction_result="Non",
+            confidence_score=0.5,
+            created_at=base_time + timedelta(days=min(i, 3))
+        ))
+    db_session.add(PredictionLog(
+        employee_id=other.id,
+        input_features='{"age": 45}',
+        prediction_result="Oui",
+        confidence_score=0.7,
+        created_at=base_time
+    ))
+    db_session.commit()
+    
+    yield followed.id, other.id
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(Employee).delete()
+    db_session.commit()
+
+
+def test_employee_predictions_timeline(client, employee_history):
+    """
+    OBJECTIF : Parcourir l'historique d'un seul employé avec le curseur.
+    
+    CRITÈRES DE SUCCÈS :
+    - Seuls les logs de l'employé, du plus récent au plus ancien
+    - Aucun log perdu ni dupliqué, même à created_at égal
+    """
+    followed_id, _ = employee_history
+    seen = []
+    cursor = None
+    
+    for _ in range(5):
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/employees/{followed_id}/predictions", params=params)
+        assert response.status_code == 200
+        assert all(log["employee_id"] == followed_id for log in response.json())
+        seen.extend((log["created_at"], log["id"]) for log in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    
+    assert len(set(seen)) == 5
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_employee_predictions_since(client, employee_history):
+    """
+    OBJECTIF : Synchronisation incrémentale avec `since`.
+    
+    CRITÈRES DE SUCCÈS :
+    - Seuls les logs strictement postérieurs à `since`
+    - 404 pour un employé inconnu
+    """
+    followed_id, _ = employee_history
+    
+    response = client.get(
+        f"/employees/{followed_id}/predictions",
+        params={"since": "2025-03-03T09:00:00", "limit": 10}
+    )
+    assert response.status_code == 200
+    assert [log["created_at"] for log in response.json()] == ["2025-03-04T09:00:00"] * 2
+    
+    assert client.get("/employees/999999/predictions").status_code == 404
+
+
+# =============================================================================
+# COMPTEURS EN CACHE (/stats, /employees/count, /predictions/logs/count)
+# =============================================================================
+
+def test_stats_counters_single_aggregate(db_session, setup_test_data):
+    """
+    OBJECTIF : Vérifier que la requête GROUP BY unique donne les mêmes
+    chiffres que les COUNT(*) qu'elle remplace.
+    """
+    from stats_cache import StatsCache
+    
+    db_session.add(PredictionLog(input_features='{}', prediction_result="Oui", confidence_score=0.9))
+    db_session.commit()
+    
+    counters = StatsCache.compute(db_session)
+    
+    assert counters["employees"]["total"] == db_session.query(Employee).count()
+    assert counters["employees"]["Non"] == db_session.query(Employee).filter(Employee.target == "Non").count()
+    assert counters["predictions"]["total"] == db_session.query(PredictionLog).count()
+    assert counters["predictions"]["Oui"] == db_session.query(PredictionLog).filter(
+        PredictionLog.prediction_result == "Oui"
+    ).count()
+
+
+def test_stats_cache_stale_while_revalidate(db_session, setup_test_data):
+    """
+    OBJECTIF : Vérifier la sémantique TTL / stale-while-revalidate.
+    
+    CRITÈRES DE SUCCÈS :
+    - Dans le TTL, un nouvel employé n'est pas visible (pas de requête)
+    - Après le TTL, l'ancienne valeur est servie et UN rafraîchissement est planifié
+    - Après ce rafraîchissement, la nouvelle valeur est servie
+    """
+    from fastapi import BackgroundTasks
+    from stats_cache import StatsCache
+    
+    cache = StatsCache(ttl=60, max_stale=3600)
+    initial = cache.get(db_session)["employees"]["total"]
+    
+    db_session.add(Employee(identifier="STATS_NEW", features='{}', target="Oui"))
+    db_session.commit()
+    assert cache.get(db_session)["employees"]["total"] == initial
+    
+    # Simuler l'expiration du TTL
+    cache._refreshed_at -= 120
+    tasks = BackgroundTasks()
+    assert cache.get(db_session, tasks)["employees"]["total"] == initial
+    assert len(tasks.tasks) == 1
+    
+    # Un second appel pendant le rafraîchissement ne replanifie rien
+    other_tasks = BackgroundTasks()
+    cache.get(db_session, other_tasks)
+    assert len(other_tasks.tasks) == 0
+    
+    cache.refresh(db_session)
+    assert cache.get(db_session)["employees"]["total"] == initial + 1
+
+
+def _slow_stats_cache():
+    """StatsCache dont le calcul (sans base) bloque jusqu'à `release`."""
+    import threading
+    from stats_cache import StatsCache, _empty_counters
+
+    class SlowStatsCache(StatsCache):
+        def __init__(self):
+            super().__init__(ttl=60, max_stale=3600)
+            self.calls = 0
+            self.started = threading.Event()
+            self.release = threading.Event()
+
+        def compute(self, db):
+            self.calls += 1
+            self.started.set()
+            assert self.release.wait(5)
+            counters = _empty_counters()
+            counters["predictions"].update(total=10, Oui=4, Non=6)
+            return counters
+
+    return SlowStatsCache()
+
+
+def test_stats_cache_cold_refresh_single_flight():
+    """
+    OBJECTIF : Sur un cache froid, les requêtes concurrentes attendent UN
+    seul calcul au lieu de lancer chacune l'agrégation.
+    """
+    import threading
+    
+    cache = _slow_stats_cache()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(None))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    assert cache.started.wait(5)
+    cache.release.set()
+    for thread in threads:
+        thread.join(5)
+    
+    assert cache.calls == 1
+    assert len(results) == 8
+    assert all(result["predictions"]["total"] == 10 for result in results)
+
+
+def test_stats_cache_keeps_increments_during_refresh():
+    """
+    OBJECTIF : Une prédiction enregistrée pendant un rafraîchissement n'est
+    pas écrasée par l'instantané calculé.
+    """
+    import threading
+    
+    cache = _slow_stats_cache()
+    thread = threading.Thread(target=cache.refresh, args=(None,))
+    thread.start()
+    assert cache.started.wait(5)
+    cache.record_prediction("Oui")
+    cache.release.set()
+    thread.join(5)
+    
+    counters = cache.get(None)["predictions"]
+    assert counters == {"total": 11, "Oui": 5, "Non": 6}
+
+
+def test_prediction_updates_cached_counters(client, setup_test_data):
+    """
+    OBJECTIF : Les prédictions incrémentent les compteurs sans attendre le TTL.
+    """
+    before = client.get("/predictions/logs/count").json()["total"]
+    
+    response = client.post("/predict/from_id/1")
+    assert response.status_code == 200
+    
+    assert client.get("/predictions/logs/count").json()["total"] == before + 1
+    stats = client.get("/stats").json()
+    assert stats["predictions"]["total"] == before + 1
+
+
+# =============================================================================
+# DÉDUPLICATION DES FEATURES LOGGÉES
+# =============================================================================
+
+def test_repeated_predictions_share_feature_blob(client, setup_test_data, db_session):
+    """
+    OBJECTIF : Re-scorer le même employé ne duplique pas le JSON des features.
+    
+    CRITÈRES DE SUCCÈS :
+    - Un seul FeatureBlob pour deux logs
+    - Les deux logs référencent le même hash, sans JSON en ligne
+    - L'API renvoie toujours les features complètes
+    """
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+    
+    first = client.post("/predict/from_id/1").json()
+    second = client.post("/predict/from_id/1").json()
+    
+    logs = db_session.query(PredictionLog).filter(
+        PredictionLog.id.in_([first["log_id"], second["log_id"]])
+    ).all()
+    assert len({log.features_hash for log in logs}) == 1
+    assert all(log._input_features is None for log in logs)
+    assert db_session.query(FeatureBlob).count() == 1
+    
+    detail = client.get(f"/predict/log/{second['log_id']}").json()
+    assert detail["features"] == json.loads(setup_test_data.features)
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+
+
+def test_delete_orphan_blobs(db_session):
+    """
+    OBJECTIF : Les blobs qui ne sont plus référencés sont supprimés, les autres gardés.
+    """
+    from datetime import datetime, timedelta
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+    
+    kept = feature_store.store_features(db_session, {"age": 41})
+    orphan = feature_store.store_features(db_session, {"age": 42})
+    db_session.add(PredictionLog(features_hash=kept, prediction_result="Non"))
+    db_session.commit()
+    
+    # Orphelin récent : protégé par le délai de grâce
+    assert feature_store.delete_orphan_blobs(db_session) == 0
+    
+    later = datetime.utcnow() + feature_store.ORPHAN_GRACE + timedelta(minutes=1)
+    assert feature_store.delete_orphan_blobs(db_session, now=later) == 1
+    assert [blob.hash for blob in db_session.query(FeatureBlob).all()] == [kept]
+    assert db_session.get(FeatureBlob, orphan) is None
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+
+
+def test_reused_orphan_blob_survives_collection(db_session):
+    """
+    OBJECTIF : Une prédiction qui réutilise un blob orphelin ancien le
+    re-date : le ramasse-miettes lancé avant le commit de son log le garde.
+    
+    CRITÈRES DE SUCCÈS :
+    - store_features met à jour referenced_at d'un blob existant ancien
+    - delete_orphan_blobs ne le supprime pas, le log commité ensuite le résout
+    """
+    from datetime import datetime, timedelta
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+    
+    features = {"age": 43}
+    digest = feature_store.store_features(db_session, features)
+    long_ago = datetime.utcnow() - timedelta(days=30)
+    blob = db_session.get(FeatureBlob, digest)
+    blob.created_at = blob.referenced_at = long_ago
+    db_session.commit()
+    
+    # Prédiction concurrente : blob référencé, log pas encore commité
+    assert feature_store.store_features(db_session, features) == digest
+    assert feature_store.delete_orphan_blobs(db_session) == 0
+    
+    log = PredictionLog(features_hash=digest, prediction_result="Oui")
+    db_session.add(log)
+    db_session.commit()
+    assert json.loads(log.input_features) == features
+    assert db_session.get(FeatureBlob, digest).referenced_at > long_ago
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+
+
+# =============================================================================
+# CODEC BINAIRE DES FEATURES
+# =============================================================================
+
+def test_binary_stored_features_keep_api_contract(client, db_session, valid_employee_data, monkeypatch):
+    """
+    OBJECTIF : Avec FEATURES_CODEC=msgpack, l'API renvoie les mêmes réponses.
+    
+    CRITÈRES DE SUCCÈS :
+    - Employee.features est stocké en binaire
+    - /employees/{id} expose toujours les features en JSON texte
+    - /predict/from_id décode le payload binaire et loggue les features
+    """
+    import payload_codec
+    
+    monkeypatch.setattr(payload_codec, "codec", payload_codec.make_codec("msgpack", "zlib"))
+    employee = Employee(
+        id=2,
+        identifier="BINARY_2",
+        features=payload_codec.encode(valid_employee_data, "sqlite"),
+        target="Non"
+    )
+    db_session.add(employee)
+    db_session.commit()
+    
+    try:
+        assert isinstance(employee.features, bytes)
+        
+        response = client.get("/employees/2")
+        assert response.status_code == 200
+        assert json.loads(response.json()["features"]) == valid_employee_data
+        
+        prediction = client.post("/predict/from_id/2")
+        assert prediction.status_code == 200
+        assert prediction.json()["features"] == valid_employee_data
+        
+        detail = client.get(f"/predict/log/{prediction.json()['log_id']}")
+        assert detail.json()["features"] == valid_employee_data
+        
+        logs = client.get("/predictions/logs").json()
+        assert json.loads(logs[0]["input_features"]) == valid_employee_data
+    finally:
+        db_session.query(PredictionLog).delete()
+        db_session.query(FeatureBlob).delete()
+        db_session.query(Employee).delete()
+        db_session.commit()
+
+
+# =============================================================================
+# FILTRES PAR FEATURE (POUSSÉS EN SQL)
+# =============================================================================
+
+@pytest.fixture(scope="function")
+def filter_data(db_session, valid_employee_data):
+    """
+    Trois employés : deux au Commercial (dont un stocké en binaire si msgpack
+    est disponible), un en Consulting avec heures supplémentaires.
+    """
+    import payload_codec
+    
+    profiles = [
+        dict(valid_employee_data, departement="Commercial", heure_supplementaires="Non"),
+        dict(valid_employee_data, departement="Commercial", heure_supplementaires="Oui"),
+        dict(valid_employee_data, departement="Consulting", heure_supplementaires="Oui"),
+    ]
+    binary = payload_codec.make_codec("msgpack") if payload_codec.msgpack else None
+    for i, features in enumerate(profiles, start=10):
+        payload = binary.encode(features) if binary and i == 11 else json.dumps(features)
+        db_session.add(Employee(id=i, identifier=f"FILTER_{i}", features=payload, target="Non"))
+    db_session.commit()
+    
+    # Un log historique (JSON en ligne) et des logs dédupliqués (feature_blobs)
+    db_session.add(PredictionLog(input_features=json.dumps(profiles[2]), prediction_result="Oui"))
+    for features in profiles[:2]:
+        db_session.add(PredictionLog(
+            features_hash=feature_store.store_features(db_session, features),
+            prediction_result="Non"
+        ))
+    db_session.commit()
+    
+    yield profiles
+    
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.query(Employee).delete()
+    db_session.commit()
+
+
+def test_employees_filtered_by_features(client, filter_data):
+    """
+    OBJECTIF : /employees filtre sur les features sans que le client pagine toute la table.
+    
+    CRITÈRES DE SUCCÈS :
+    - Un filtre sélectionne les bons employés (lignes JSON et binaires)
+    - Plusieurs filtres se combinent en ET
+    - Sans filtre, la liste est inchangée
+    """
+    response = client.get("/employees", params={"departement": "Commercial"})
+    assert response.status_code == 200
+    assert [e["id"] for e in response.json()] == [10, 11]
+    
+    response = client.get("/employees", params={"departement": "Commercial", "heure_supplementaires": "Oui"})
+    assert [e["id"] for e in response.json()] == [11]
+    
+    response = client.get("/employees", params={"poste": "Inexistant"})
+    assert response.json() == []
+    
+    assert len(client.get("/employees").json()) == 3
+
+
+def test_prediction_logs_filtered_by_features(client, filter_data):
+    """
+    OBJECTIF : /predictions/logs filtre sur les features en ligne ET dédupliquées.
+    """
+    response = client.get("/predictions/logs", params={"heure_supplementaires": "Oui"})
+    assert response.status_code == 200
+    results = [json.loads(log["input_features"])["departement"] for log in response.json()]
+    assert sorted(results) == ["Commercial", "Consulting"]
+    
+    response = client.get("/predictions/logs", params={"departement": "Consulting"})
+    assert len(response.json()) == 1
+    assert response.json()[0]["prediction_result"] == "Oui"
+
+
+# =============================================================================
+# RÉPONSES ALLÉGÉES (view=lean, fields=)
+# =============================================================================
+
+LEAN_KEYS = {"log_id", "prediction", "probability", "confidence_score", "model_version", "timestamp"}
+
+
+@pytest.fixture
+def captured_sql(db_session):
+    """Capture les requêtes SQL exécutées pendant le test."""
+    from sqlalchemy import event
+    
+    statements = []
+    engine = db_session.get_bind().engine
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine, "before_cursor_execute", capture)
+
+
+def test_lean_prediction_response(client, valid_employee_data):
+    """
+    OBJECTIF : Réponse de prédiction sans les features.
+    
+    JUSTIFICATION : Le client connaît déjà les features qu'il envoie.
+    
+    CRITÈRES DE SUCCÈS :
+    - `view=lean` ou `Accept: application/json; view=lean` : seulement les
+      champs lean, avec la probabilité
+    - /predict/log/{log_id} en lean : même probabilité qu'à la prédiction
+    """
+    payload = {"features": valid_employee_data, "model_version": "v1.0"}
+    
+    by_query = client.post("/predict/new_employee", params={"view": "lean"}, json=payload).json()
+    by_accept = client.post(
+        "/predict/new_employee", json=payload, headers={"Accept": "application/json; view=lean"}
+    ).json()
+    
+    assert set(by_query) == LEAN_KEYS
+    assert set(by_accept) == LEAN_KEYS
+    
+    log = client.get(f"/predict/log/{by_query['log_id']}", params={"view": "lean"}).json()
+    assert set(log) == LEAN_KEYS
+    assert log["probability"] == pytest.approx(by_query["probability"])
+    
+    full = client.get(f"/predict/log/{by_query['log_id']}").json()
+    assert full["features"]["age"] == valid_employee_data["age"]
+
+
+def test_employees_fields_projection(client, paginated_data, captured_sql):
+    """
+    OBJECTIF : `fields=` sur /employees.
+    
+    CRITÈRES DE SUCCÈS :
+    - Seuls les champs demandés, pagination par curseur conservée
+    - La colonne features n'est pas lue
+    - Champ inconnu → 400
+    """
+    response = client.get("/employees", params={"fields": "identifier,target", "limit": 2})
+    
+    assert response.status_code == 200
+    assert [set(employee) for employee in response.json()] == [{"identifier", "target"}] * 2
+    assert "X-Next-Cursor" in response.headers
+    assert not any("employees.features" in statement for statement in captured_sql)
+    
+    assert client.get("/employees", params={"fields": "salaire"}).status_code == 400
+
+
+def test_prediction_logs_fields_projection(client, paginated_data, captured_sql):
+    """
+    OBJECTIF : `fields=` sur /predictions/logs.
+    
+    CRITÈRES DE SUCCÈS :
+    - Sans input_features : ni la colonne ni feature_blobs ne sont lus
+    - Avec input_features : features en JSON texte
+    """
+    response = client.get("/predictions/logs", params={"fields": "id,prediction_result", "limit": 3})
+    
+    assert response.status_code == 200
+    assert [set(log) for log in response.json()] == [{"id", "prediction_result"}] * 3
+    assert not any(
+        "input_features" in statement or "feature_blobs" in statement for statement in captured_sql
+    )
+    
+    logs = client.get("/predictions/logs", params={"fields": "id,input_features"}).json()
+    assert json.loads(logs[0]["input_features"]) == {"age": 30}
+
+
+# =============================================================================
+# CACHE HTTP (ETag, If-None-Match, Cache-Control)
+# =============================================================================
+
+def test_prediction_log_not_modified(client, valid_employee_data, captured_sql):
+    """
+    OBJECTIF : 304 sur un log déjà connu du client.
+    
+    JUSTIFICATION : Un log n'est jamais modifié ; inutile de renvoyer et de
+    re-décoder ses features.
+    
+    CRITÈRES DE SUCCÈS :
+    - 200 avec ETag, Last-Modified et Cache-Control immutable
+    - If-None-Match identique → 304 sans corps, seule la ligne du log est lue
+    - ETag différent entre la vue complète et la vue lean
+    """
+    payload = {"features": valid_employee_data, "model_version": "v1.0"}
+    log_id = client.post("/predict/new_employee", json=payload).json()["log_id"]
+    
+    first = client.get(f"/predict/log/{log_id}")
+    etag = first.headers["ETag"]
+    
+    assert first.status_code == 200
+    assert "immutable" in first.headers["Cache-Control"]
+    assert "Last-Modified" in first.headers
+    
+    captured_sql.clear()
+    second = client.get(f"/predict/log/{log_id}", headers={"If-None-Match": etag})
+    
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["ETag"] == etag
+    assert second.headers["Last-Modified"] == first.headers["Last-Modified"]
+    assert len([sql for sql in captured_sql if "predictions_logs" in sql]) == 1
+    
+    lean = client.get(f"/predict/log/{log_id}", params={"view": "lean"}, headers={"If-None-Match": etag})
+    assert lean.status_code == 200
+    assert lean.headers["ETag"] != etag
+
+
+def test_prediction_log_not_modified_requires_existing_log(client):
+    """
+    OBJECTIF : Pas de 304 pour un log inexistant.
+    
+    CRITÈRES DE SUCCÈS :
+    - If-None-Match: * sur un id inconnu → 404
+    """
+    response = client.get("/predict/log/999999", headers={"If-None-Match": "*"})
+    
+    assert response.status_code == 404
+
+
+def test_prediction_log_etag_follows_row(client, db_session, valid_employee_data):
+    """
+    OBJECTIF : L'ETag dépend de la ligne, pas seulement de l'id.
+    
+    CRITÈRES DE SUCCÈS :
+    - Même id, autre created_at → autre ETag, l'ancien ne donne plus de 304
+    """
+    payload = {"features": valid_employee_data, "model_version": "v1.0"}
+    log_id = client.post("/predict/new_employee", json=payload).json()["log_id"]
+    etag = client.get(f"/predict/log/{log_id}").headers["ETag"]
+    
+    log_entry = db_session.query(PredictionLog).filter(PredictionLog.id == log_id).one()
+    log_entry.created_at = log_entry.created_at - timedelta(days=1)
+    db_session.commit()
+    
+    response = client.get(f"/predict/log/{log_id}", headers={"If-None-Match": etag})
+    
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_prediction_log_ids_not_reused(client, db_session, valid_employee_data):
+    """
+    OBJECTIF : Un id supprimé (fin de table archivée) n'est jamais réattribué.
+    
+    JUSTIFICATION : Le log est servi en cache immutable et les archives sont
+    fusionnées par id.
+    
+    CRITÈRES DE SUCCÈS :
+    - Après suppression du dernier log, le suivant reçoit un id plus grand
+    """
+    payload = {"features": valid_employee_data, "model_version": "v1.0"}
+    log_id = client.post("/predict/new_employee", json=payload).json()["log_id"]
+    db_session.query(PredictionLog).filter(PredictionLog.id == log_id).delete()
+    db_session.commit()
+    
+    next_id = client.post("/predict/new_employee", json=payload).json()["log_id"]
+    
+    assert next_id > log_id
+
+
+@pytest.mark.parametrize("with_hash", [True, False], ids=["features_hash", "contenu"])
+def test_employee_etag_follows_changes(client, db_session, with_hash):
+    """
+    OBJECTIF : ETag de /employees/{id} qui change avec l'employé.
+    
+    CRITÈRES DE SUCCÈS :
+    - If-None-Match à jour → 304 (ETag par features_hash ou par contenu)
+    - Après modification de target → 200 avec un nouvel ETag
+    """
+    features = '{"age": 30}'
+    employee = Employee(
+        identifier="ETAG_1", features=features, target="Non",
+        features_hash=feature_store.content_hash(features) if with_hash else None
+    )
+    db_session.add(employee)
+    db_session.commit()
+    try:
+        first = client.get(f"/employees/{employee.id}")
+        etag = first.headers["ETag"]
+        assert first.status_code == 200
+        assert first.headers["Cache-Control"] == http_cache.CACHE_CONTROL["employee"]
+        
+        assert client.get(f"/employees/{employee.id}", headers={"If-None-Match": etag}).status_code == 304
+        
+        employee.target = "Oui"
+        db_session.commit()
+        changed = client.get(f"/employees/{employee.id}", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.headers["ETag"] != etag
+    finally:
+        db_session.delete(employee)
+        db_session.commit()
+
+
+def test_stats_not_modified(client, setup_test_data):
+    """
+    OBJECTIF : 304 sur /stats tant que les compteurs n'ont pas changé.
+    
+    CRITÈRES DE SUCCÈS :
+    - Cache-Control avec max-age
+    - If-None-Match à jour → 304 ; après une prédiction → 200
+    """
+    first = client.get("/stats")
+    etag = first.headers["ETag"]
+    
+    assert "max-age" in first.headers["Cache-Control"]
+    assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 304
+    
+    client.post("/predict/from_id/1")
+    assert client.get("/stats", headers={"If-None-Match": etag}).status_code == 200
+
+
+# =============================================================================
+# COMPRESSION DES RÉPONSES
+# =============================================================================
+
+def test_large_list_compressed(client, db_session, valid_employee_data):
+    """
+    OBJECTIF : Listes compressées selon Accept-Encoding.
+    
+    JUSTIFICATION : /employees renvoie le JSON complet des features de
+    chaque ligne, très répétitif.
+    
+    CRITÈRES DE SUCCÈS :
+    - gzip demandé → Content-Encoding gzip, Vary: Accept-Encoding
+    - Accept-Encoding: identity → réponse en clair, même contenu
+    """
+    features = json.dumps(valid_employee_data)
+    db_session.add_all([
+        Employee(identifier=f"GZIP_{i}", features=features, target="Non") for i in range(20)
+    ])
+    db_session.commit()
+    try:
+        response = client.get("/employees", params={"limit": 20}, headers={"Accept-Encoding": "gzip"})
+        
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content) / 4
+        
+        plain = client.get("/employees", params={"limit": 20}, headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+        assert plain.json() == response.json()
+    finally:
+        db_session.query(Employee).filter(Employee.identifier.like("GZIP_%")).delete(synchronize_session=False)
+        db_session.commit()
+
+
+def test_prediction_response_not_compressed(client, valid_employee_data):
+    """Une réponse de prédiction (< COMPRESSION_MIN_SIZE) reste en clair."""
+    payload = {"features": valid_employee_data, "model_version": "v1.0"}
+    response = client.post("/predict/new_employee", json=payload, headers={"Accept-Encoding": "gzip, br"})
+    
+    assert response.status_code == 200
+    assert len(response.content) < compression.MINIMUM_SIZE
+    assert "content-encoding" not in response.headers
+
+
+# =============================================================================
+# CONTRÔLE D'ADMISSION
+# =============================================================================
+
+def test_prediction_shed_when_saturated(client, valid_employee_data, captured_sql, monkeypatch):
+    """
+    OBJECTIF : Rejeter tout de suite une prédiction quand l'endpoint est saturé.
+    
+    JUSTIFICATION : En surcharge, mieux vaut refuser une partie des requêtes
+    que de toutes les ralentir.
+    
+    CRITÈRES DE SUCCÈS :
+    - 503 avec Retry-After, sans requête SQL
+    - Rejet visible dans /metrics/admission
+    """
+    limiter = admission.limiters["predict_new_employee"]
+    monkeypatch.setattr(limiter, "concurrency", 0)
+    monkeypatch.setattr(limiter, "queue", 0)
+    rejected = limiter.rejected["queue_full"]
+    
+    response = client.post("/predict/new_employee", json={"features": valid_employee_data})
+    
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert captured_sql == []
+    
+    metrics = client.get("/metrics/admission").json()["predict_new_employee"]
+    assert metrics["rejected"]["queue_full"] == rejected + 1
+    assert metrics["active"] == 0
+
+
+# =============================================================================
+# ÉCHÉANCES DES REQUÊTES (X-Request-Timeout)
+# =============================================================================
+
+def test_expired_request_never_reaches_model(client, db_session, setup_test_data, monkeypatch):
+    """
+    OBJECTIF : Une requête dont l'échéance est passée s'arrête avant le modèle.
+    
+    JUSTIFICATION : Pendant un incident, les clients qui réessaient ne
+    doivent pas laisser de prédictions en double derrière eux.
+    
+    CRITÈRES DE SUCCÈS :
+    - 504 pour /predict/from_id et /predict/batch
+    - Le modèle n'est pas appelé, aucun log n'est écrit
+    - Header invalide → 400 ; budget suffisant → 200
+    """
+    from model_loader import model_loader
+    
+    calls = []
+    monkeypatch.setattr(model_loader, "predict", lambda features: calls.append(features))
+    monkeypatch.setattr(model_loader, "predict_batch", lambda records: calls.append(records))
+    logs_before = db_session.query(PredictionLog).count()
+    expired = {"X-Request-Timeout": "0.000001"}
+    
+    single = client.post("/predict/from_id/1", headers=expired)
+    batch = client.post("/predict/batch", json={"records": [{"age": 30}]}, headers=expired)
+    
+    assert single.status_code == 504
+    assert batch.status_code == 504
+    assert calls == []
+    assert db_session.query(PredictionLog).count() == logs_before
+    
+    assert client.post("/predict/from_id/1", headers={"X-Request-Timeout": "abc"}).status_code == 400
+    
+    monkeypatch.undo()
+    assert client.post("/predict/from_id/1", headers={"X-Request-Timeout": "5"}).status_code == 200
+
+
+# =============================================================================
+# MSGPACK (application/x-msgpack)
+# =============================================================================
+
+MSGPACK_HEADERS = {"Content-Type": "application/x-msgpack", "Accept": "application/x-msgpack"}
+
+
+def test_predict_new_employee_msgpack(client, valid_employee_data):
+    """
+    OBJECTIF : Prédiction avec requête et réponse en msgpack.
+    
+    JUSTIFICATION : Les appelants internes à fort volume évitent le coût du JSON.
+    
+    CRITÈRES DE SUCCÈS :
+    - Réponse application/x-msgpack avec les mêmes champs qu'en JSON
+    - Sans Accept msgpack : réponse JSON (défaut)
+    """
+    payload = msgpack.packb({"features": valid_employee_data, "model_version": "v1.0"})
+    
+    response = client.post("/predict/new_employee", content=payload, headers=MSGPACK_HEADERS)
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-msgpack"
+    data = msgpack.unpackb(response.content)
+    assert data["features"] == valid_employee_data
+    assert data["prediction"] in ("Oui", "Non")
+    assert isinstance(data["timestamp"], str)
+    
+    as_json = client.post(
+        "/predict/new_employee", content=payload, headers={"Content-Type": "application/x-msgpack"}
+    )
+    assert as_json.headers["content-type"] == "application/json"
+    assert set(as_json.json()) == set(data)
+
+
+def test_predict_batch_msgpack_and_errors(client, valid_employee_data):
+    """
+    OBJECTIF : Lot en msgpack, erreurs de corps msgpack.
+    
+    CRITÈRES DE SUCCÈS :
+    - Un résultat par élément, dans l'ordre
+    - Corps msgpack illisible → 400 ; corps valide mais incomplet → 422
+    """
+    payload = msgpack.packb({"records": [valid_employee_data, {**valid_employee_data, "age": 58}]})
+    
+    response = client.post("/predict/batch", content=payload, headers=MSGPACK_HEADERS)
+    
+    assert response.status_code == 200
+    data = msgpack.unpackb(response.content)
+    assert [result["index"] for result in data["results"]] == [0, 1]
+    
+    assert client.post("/predict/batch", content=b"\xc1", headers=MSGPACK_HEADERS).status_code == 400
+    invalid = client.post("/predict/batch", content=msgpack.packb({"records": []}), headers=MSGPACK_HEADERS)
+    assert invalid.status_code == 422
+    assert invalid.json()["detail"][0]["loc"] == ["body", "records"]
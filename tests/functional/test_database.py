@@ -400,4 +400,115 @@ def test_count_records(db_session):
     # Assert : Vérifier
     assert count >= 5, f"Attendu au moins 5 logs, trouvé {count}"
     
-    print(f"\n✅ Nombre total de logs : {count}")
\ No newline at end of file
+    print(f"\n✅ Nombre total de logs : {count}")
+
+# =============================================================================
+# TEST 10 : PROFIL SQLITE "PRODUCTION"
+# =============================================================================
+
+def test_sqlite_production_pragmas(tmp_path):
+    """
+    OBJECTIF : Vérifier que chaque connexion reçoit les pragmas du profil.
+    
+    CRITÈRES DE SUCCÈS :
+    - journal_mode WAL, synchronous NORMAL (1), busy_timeout et temp_store appliqués
+    - Clés étrangères vérifiées (foreign_keys)
+    - Valable pour toutes les connexions du pool, pas seulement la première
+    """
+    from sqlalchemy import create_engine, text
+    from database import SQLITE_PRAGMAS, apply_sqlite_pragmas
+    
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}")
+    apply_sqlite_pragmas(engine)
+    
+    with engine.connect() as first, engine.connect() as second:
+        for conn in (first, second):
+            assert conn.execute(text("PRAGMA journal_mode")).scalar().lower() == "wal"
+            assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+            assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLITE_PRAGMAS["busy_timeout"]
+            assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+            assert conn.execute(text("PRAGMA cache_size")).scalar() == SQLITE_PRAGMAS["cache_size"]
+            assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+    
+    engine.dispose()
+
+
+# =============================================================================
+# TEST 11 : ROUTAGE DES LECTURES VERS LA RÉPLIQUE
+# =============================================================================
+
+def test_replica_lag_monitor(tmp_path):
+    """
+    OBJECTIF : Vérifier la décision de routage de la réplique.
+    
+    CRITÈRES DE SUCCÈS :
+    - Réplique joignable et dans la tolérance → utilisable
+    - Retard au-delà de la tolérance → lectures renvoyées au primaire
+    - Le retard n'est mesuré qu'une fois par intervalle
+    - Réplique injoignable ou mesure en erreur SQL → lectures renvoyées au primaire
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.exc import ProgrammingError
+    from database import ReplicaLagMonitor
+    
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    
+    monitor = ReplicaLagMonitor(replica, max_lag=5, interval=60)
+    assert monitor.is_healthy()
+    
+    calls = []
+    monitor.measure_lag = lambda: calls.append(1) or 30.0
+    assert monitor.is_healthy()  # résultat en cache, pas de nouvelle mesure
+    assert calls == []
+    
+    monitor._checked_at = None
+    assert not monitor.is_healthy()
+    assert calls == [1]
+    
+    broken = create_engine(f"sqlite:///{tmp_path / 'absent' / 'replica.db'}")
+    assert not ReplicaLagMonitor(broken, max_lag=5, interval=60).is_healthy()
+    
+    def refused():
+        raise ProgrammingError("SELECT pg_is_in_recovery()", {}, Exception("permission denied"))
+    
+    monitor = ReplicaLagMonitor(replica, max_lag=5, interval=60)
+    monitor.measure_lag = refused
+    assert not monitor.is_healthy()
+    
+    replica.dispose()
+
+
+def test_get_read_db_routing(monkeypatch):
+    """
+    OBJECTIF : get_read_db choisit la réplique seulement si elle est saine.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import database
+    
+    primary = sessionmaker(bind=create_engine("sqlite://"))
+    replica = sessionmaker(bind=create_engine("sqlite://"), info={"replica": True})
+    
+    class FakeMonitor:
+        healthy = True
+        def is_healthy(self):
+            return self.healthy
+    
+    monitor = FakeMonitor()
+    monkeypatch.setattr(database, "SessionLocal", primary)
+    monkeypatch.setattr(database, "ReadSessionLocal", replica)
+    monkeypatch.setattr(database, "replica_monitor", monitor)
+    
+    def open_read_session():
+        generator = database.get_read_db()
+        db = next(generator)
+        generator.close()
+        return db
+    
+    assert database.is_replica_session(open_read_session())
+    
+    monitor.healthy = False
+    assert not database.is_replica_session(open_read_session())
+    
+    monkeypatch.setattr(database, "ReadSessionLocal", None)
+    assert not database.is_replica_session(open_read_session())
@@ -0,0 +1,235 @@
+"""
+Tests fonctionnels pour import_data.py (chargement en masse)
+
+Ces tests vérifient que l'import vectorisé produit exactement les mêmes
+employés que l'ancien import ligne par ligne (identifiants, cible, features,
+valeurs manquantes converties en null), et qu'un nouvel import ne réécrit
+que les employés modifiés.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine, func, insert, select, text
+
+import import_data
+from database import Base, missing_columns, require_current_schema
+from models import Employee, PredictionLog
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests fonctionnels
+# =============================================================================
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def dataset(valid_employee_data):
+    """Petit dataset au format de 01_classe.joblib, avec des valeurs manquantes."""
+    df = pd.DataFrame([valid_employee_data] * 5, index=[3, 7, 8, 12, 20])
+    df["démission"] = ["Oui", "Non", "Non", None, "Oui"]
+    df.loc[7, "distance_domicile_travail"] = np.nan
+    return df
+
+
+@pytest.fixture
+def import_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+# =============================================================================
+# TEST 1 : CHARGEMENT EN MASSE
+# =============================================================================
+
+def test_bulk_load_inserts_all_rows(dataset, import_engine, valid_employee_data):
+    """
+    OBJECTIF : bulk_load() insère toutes les lignes avec les bonnes valeurs.
+    
+    CRITÈRES DE SUCCÈS :
+    - Une ligne par ligne du DataFrame, identifiant RECORD_<index>
+    - Cible conservée, None si manquante
+    - Features identiques au dataset, NaN → null
+    - Le rapport donne un débit en lignes/s
+    """
+    report = import_data.bulk_load(dataset, import_engine, batch_size=2)
+    
+    assert report["rows"] == 5
+    assert report["inserted"] == 5
+    assert report["rows_per_s"] > 0
+    
+    with import_engine.connect() as conn:
+        rows = conn.execute(select(Employee.__table__).order_by(Employee.id)).mappings().all()
+    
+    assert [row["identifier"] for row in rows] == ["RECORD_3", "RECORD_7", "RECORD_8", "RECORD_12", "RECORD_20"]
+    assert [row["target"] for row in rows] == ["Oui", "Non", "Non", None, "Oui"]
+    assert json.loads(rows[0]["features"]) == valid_employee_data
+    assert json.loads(rows[1]["features"])["distance_domicile_travail"] is None
+    assert all(row["created_at"] is not None for row in rows)
+
+
+def test_feature_records_use_python_scalars(dataset):
+    """
+    OBJECTIF : Les features sont des scalaires Python (sérialisables en JSON / msgpack).
+    """
+    records = import_data.feature_records(dataset)
+    
+    assert len(records) == 5
+    assert type(records[0]["age"]) is int
+    assert type(records[0]["augmentation_salaire_precedent"]) is float
+    assert records[1]["distance_domicile_travail"] is None
+    assert "démission" not in records[0]
+
+
+# =============================================================================
+# TEST 2 : IMPORT INCRÉMENTAL
+# =============================================================================
+
+def test_reimport_only_writes_changed_rows(dataset, import_engine):
+    """
+    OBJECTIF : Un second import n'écrit que les lignes nouvelles ou modifiées.
+    
+    JUSTIFICATION : La base n'est plus supprimée ; un rafraîchissement doit
+    coûter ce qui a changé et conserver les logs de prédiction.
+    
+    CRITÈRES DE SUCCÈS :
+    - Réimport identique : tout est inchangé
+    - Features modifiées, cible modifiée → mises à jour ; nouvel index → inséré
+    - Les id des employés et predictions_logs sont conservés
+    """
+    import_data.bulk_load(dataset, import_engine)
+    with import_engine.begin() as conn:
+        conn.execute(insert(PredictionLog.__table__).values(
+            employee_id=1, input_features="{}", prediction_result="Non"
+        ))
+        ids_before = dict(conn.execute(select(Employee.identifier, Employee.id)).all())
+    
+    report = import_data.bulk_load(dataset, import_engine)
+    assert (report["inserted"], report["updated"], report["unchanged"]) == (0, 0, 5)
+    
+    changed = dataset.copy()
+    changed.loc[3, "age"] = 42
+    changed.loc[8, "démission"] = "Oui"
+    changed.loc[99] = changed.loc[20]
+    
+    report = import_data.bulk_load(changed, import_engine, batch_size=2)
+    assert (report["inserted"], report["updated"], report["unchanged"]) == (1, 2, 3)
+    
+    with import_engine.connect() as conn:
+        employees = {
+            row.identifier: row
+            for row in conn.execute(select(Employee.__table__)).all()
+        }
+        assert conn.execute(select(func.count()).select_from(PredictionLog.__table__)).scalar() == 1
+    
+    assert json.loads(employees["RECORD_3"].features)["age"] == 42
+    assert employees["RECORD_8"].target == "Oui"
+    assert "RECORD_99" in employees
+    assert all(employees[identifier].id == id_ for identifier, id_ in ids_before.items())
+
+
+def test_rows_without_hash_are_rewritten_once(dataset, import_engine, valid_employee_data):
+    """
+    OBJECTIF : Les employés importés avant features_hash reçoivent leur hash au premier import.
+    """
+    with import_engine.begin() as conn:
+        conn.execute(insert(Employee.__table__).values(
+            identifier="RECORD_3", features=json.dumps(valid_employee_data), target="Oui"
+        ))
+    
+    first = import_data.bulk_load(dataset, import_engine)
+    second = import_data.bulk_load(dataset, import_engine)
+    
+    assert (first["inserted"], first["updated"]) == (4, 1)
+    assert second["unchanged"] == 5
+
+
+def test_legacy_schema_requires_migration(tmp_path):
+    """
+    OBJECTIF : Une base antérieure à features_hash est signalée avant l'import.
+    
+    CRITÈRES DE SUCCÈS :
+    - create_all n'ajoute pas la colonne à la table existante
+    - La colonne absente est nommée et le message indique `alembic upgrade head`
+    """
+    legacy = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with legacy.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE employees (id INTEGER PRIMARY KEY, identifier VARCHAR(50) UNIQUE, "
+            "features TEXT NOT NULL, target VARCHAR(10), created_at DATETIME, updated_at DATETIME)"
+        ))
+    Base.metadata.create_all(legacy)
+    
+    assert missing_columns(legacy) == ["employees.features_hash"]
+    with pytest.raises(SystemExit, match="alembic upgrade head"):
+        require_current_schema(legacy)
+    
+    legacy.dispose()
+
+
+def test_current_schema_passes(import_engine):
+    """
+    OBJECTIF : Une base créée par create_all ne demande aucune migration.
+    """
+    assert missing_columns(import_engine) == []
+    require_current_schema(import_engine)
+
+
+# =============================================================================
+# TEST 3 : IMPORT PARALLÈLE PAR MORCEAUX
+# =============================================================================
+
+def _employees(engine):
+    with engine.connect() as conn:
+        return {
+            row.identifier: (row.features_hash, row.target)
+            for row in conn.execute(select(Employee.__table__)).all()
+        }
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet", ".joblib"])
+def test_parallel_load_matches_single_process(tmp_path, valid_employee_data, suffix):
+    """
+    OBJECTIF : L'import parallèle produit les mêmes employés que l'import simple.
+    
+    CRITÈRES DE SUCCÈS :
+    - Sources CSV, Parquet et joblib acceptées
+    - Mêmes identifiants, hash de features et cibles que bulk_load()
+    - Un second passage ne modifie rien
+    """
+    import joblib
+    
+    df = pd.DataFrame([valid_employee_data] * 23)
+    df["age"] = range(20, 43)
+    df["démission"] = ["Oui" if i % 3 else "Non" for i in range(23)]
+    df.loc[5, "distance_domicile_travail"] = np.nan
+    
+    path = tmp_path / f"extract{suffix}"
+    if suffix == ".csv":
+        df.to_csv(path, index=False)
+    elif suffix == ".parquet":
+        df.to_parquet(path, index=False)
+    else:
+        joblib.dump(df, path)
+    
+    reference = create_engine(f"sqlite:///{tmp_path / 'reference.db'}")
+    parallel = create_engine(f"sqlite:///{tmp_path / 'parallel.db'}")
+    Base.metadata.create_all(reference)
+    Base.metadata.create_all(parallel)
+    
+    import_data.bulk_load(df, reference)
+    report = import_data.parallel_load(str(path), parallel, workers=2, chunk_size=5, commit_rows=10)
+    
+    assert report["inserted"] == 23
+    assert _employees(parallel) == _employees(reference)
+    
+    again = import_data.parallel_load(str(path), parallel, workers=2, chunk_size=5)
+    assert again["unchanged"] == 23
+    
+    reference.dispose()
+    parallel.dispose()
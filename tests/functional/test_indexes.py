@@ -0,0 +1,236 @@
+"""
+Tests fonctionnels des index de performance
+
+Chaque index de migrations/versions/0002_performance_indexes.py est justifié
+par le plan d'exécution (EXPLAIN QUERY PLAN) de la requête qu'il sert, et la
+migration est rejouée sur une base "ancienne génération" sans ces index.
+"""
+
+import pytest
+from pathlib import Path
+from sqlalchemy import create_engine, inspect, text
+
+pytestmark = pytest.mark.functional
+
+ROOT = Path(__file__).resolve().parent.parent.parent
+
+
+def explain(db_session, sql: str) -> str:
+    """Retourne le plan SQLite sous forme d'une seule chaîne."""
+    plan = db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")).fetchall()
+    return " | ".join(str(row[-1]) for row in plan)
+
+
+# =============================================================================
+# EXPLAIN : UNE REQUÊTE RÉELLE PAR INDEX
+# =============================================================================
+
+def test_logs_keyset_page_uses_created_at_index(db_session):
+    """
+    OBJECTIF : /predictions/logs (page suivante via curseur) lit l'index
+    (created_at, id) dans l'ordre, sans parcours complet ni tri en mémoire.
+    """
+    details = explain(
+        db_session,
+        "SELECT * FROM predictions_logs "
+        "WHERE (created_at, id) < ('2025-01-01 00:00:00.000000', 100) "
+        "ORDER BY created_at DESC, id DESC LIMIT 10"
+    )
+    assert "ix_predictions_logs_created_at_id" in details, details
+    assert "TEMP B-TREE" not in details, details
+
+
+def test_created_at_range_uses_created_at_index(db_session):
+    """OBJECTIF : un filtre sur created_at seul est servi par (created_at, id)."""
+    details = explain(
+        db_session,
+        "SELECT COUNT(*) FROM predictions_logs WHERE created_at >= '2025-01-01'"
+    )
+    assert "ix_predictions_logs_created_at_id" in details, details
+
+
+def test_employee_history_uses_employee_index(db_session):
+    """
+    OBJECTIF : l'historique d'un employé (le plus récent d'abord) est lu via
+    (employee_id, created_at), sans tri.
+    """
+    details = explain(
+        db_session,
+        "SELECT * FROM predictions_logs WHERE employee_id = 42 "
+        "ORDER BY created_at DESC LIMIT 10"
+    )
+    assert "ix_predictions_logs_employee_id_created_at" in details, details
+    assert "TEMP B-TREE" not in details, details
+
+
+def test_prediction_stats_use_covering_index(db_session):
+    """OBJECTIF : /stats compte les prédictions par résultat sans lire la table."""
+    details = explain(
+        db_session,
+        "SELECT prediction_result, COUNT(*) FROM predictions_logs GROUP BY prediction_result"
+    )
+    assert "COVERING INDEX ix_predictions_logs_prediction_result" in details, details
+
+
+def test_model_version_range_uses_composite_index(db_session):
+    """OBJECTIF : volumes d'une version de modèle sur une période."""
+    details = explain(
+        db_session,
+        "SELECT COUNT(*) FROM predictions_logs "
+        "WHERE model_version = 'v1.0' AND created_at >= '2025-01-01'"
+    )
+    assert "ix_predictions_logs_model_version_created_at" in details, details
+
+
+def test_employee_stats_use_covering_index(db_session):
+    """OBJECTIF : /stats compte les employés par cible sans lire la table."""
+    details = explain(
+        db_session,
+        "SELECT target, COUNT(*) FROM employees GROUP BY target"
+    )
+    assert "COVERING INDEX ix_employees_target" in details, details
+
+
+def _filter_plan(db_session, query) -> str:
+    from sqlalchemy.dialects import sqlite
+    
+    sql = query.statement.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True})
+    return explain(db_session, str(sql))
+
+
+def test_feature_filter_uses_expression_index(db_session):
+    """
+    OBJECTIF : un filtre par feature (/employees?departement=...) est servi
+    par l'index d'expression json_extract (lignes JSON) et l'index partiel
+    des lignes binaires, sans parcours complet de la table.
+    """
+    import feature_filters
+    from models import Employee
+    
+    details = _filter_plan(db_session, db_session.query(Employee.id).filter(
+        feature_filters.employees_filter(db_session, {"departement": "Commercial"})
+    ).order_by(Employee.id).limit(10))
+    
+    assert "ix_employees_features_departement" in details, details
+    assert "ix_employees_features_binary" in details, details
+    assert "SCAN employees |" not in f"{details} |", details
+
+
+def test_logs_feature_filter_uses_blob_indexes(db_session):
+    """
+    OBJECTIF : sur /predictions/logs, les blobs correspondant au filtre sont
+    trouvés par index, puis les logs par features_hash.
+    """
+    import feature_filters
+    from models import PredictionLog
+    
+    details = _filter_plan(db_session, db_session.query(PredictionLog.id).filter(
+        feature_filters.logs_filter(db_session, {"poste": "Consultant"})
+    ).limit(10))
+    
+    assert "ix_feature_blobs_payload_poste" in details, details
+    assert "ix_predictions_logs_features_hash" in details, details
+    assert "SCAN feature_blobs |" not in f"{details} |", details
+
+
+# =============================================================================
+# MIGRATIONS ALEMBIC SUR UNE BASE EXISTANTE
+# =============================================================================
+
+def _alembic_config(url: str):
+    from alembic.config import Config
+    
+    config = Config(str(ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(ROOT / "migrations"))
+    config.set_main_option("sqlalchemy.url", url)
+    return config
+
+
+def test_migrations_upgrade_existing_database(tmp_path):
+    """
+    OBJECTIF : `alembic upgrade head` sur une base créée avant Alembic.
+    
+    CRITÈRES DE SUCCÈS :
+    - Les lignes existantes sont conservées
+    - Tous les index de performance sont créés
+    - La migration est rejouable (idempotente) et réversible
+    - predictions_logs en AUTOINCREMENT, index d'expression conservés
+    """
+    from alembic import command
+    
+    url = f"sqlite:///{tmp_path / 'legacy.db'}"
+    engine = create_engine(url)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE employees (id INTEGER PRIMARY KEY, identifier VARCHAR, "
+            "features TEXT, target VARCHAR, created_at DATETIME)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE predictions_logs (id INTEGER PRIMARY KEY, employee_id INTEGER, "
+            "input_features TEXT NOT NULL, prediction_result VARCHAR NOT NULL, "
+            "confidence_score FLOAT, model_version VARCHAR, created_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO predictions_logs (input_features, prediction_result) VALUES ('{}', 'Non')"
+        ))
+    
+    config = _alembic_config(url)
+    command.upgrade(config, "head")
+    
+    indexes = {index["name"] for index in inspect(engine).get_indexes("predictions_logs")}
+    assert {
+        "ix_predictions_logs_created_at_id",
+        "ix_predictions_logs_employee_id_created_at",
+        "ix_predictions_logs_prediction_result",
+        "ix_predictions_logs_model_version_created_at",
+    } <= indexes
+    assert "ix_employees_target" in {index["name"] for index in inspect(engine).get_indexes("employees")}
+    with engine.connect() as conn:
+        sqlite_indexes = set(conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+    assert {
+        "ix_employees_features_departement",
+        "ix_feature_blobs_payload_binary",
+        "ix_predictions_logs_input_features_poste",
+    } <= sqlite_indexes
+    
+    # Id jamais réattribués (0009) : AUTOINCREMENT, séquence au-delà du dernier id
+    with engine.connect() as conn:
+        ddl = conn.execute(text("SELECT sql FROM sqlite_master WHERE name = 'predictions_logs'")).scalar()
+        sequence = conn.execute(text("SELECT seq FROM sqlite_sequence WHERE name = 'predictions_logs'")).scalar()
+    assert "AUTOINCREMENT" in ddl
+    assert sequence == 1
+    
+    columns = {column["name"] for column in inspect(engine).get_columns("predictions_logs")}
+    assert "features_hash" in columns
+    assert "feature_blobs" in inspect(engine).get_table_names()
+    
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM predictions_logs")).scalar() == 1
+    
+    command.downgrade(config, "0001")
+    assert "ix_predictions_logs_created_at_id" not in {
+        index["name"] for index in inspect(engine).get_indexes("predictions_logs")
+    }
+    command.upgrade(config, "head")
+    
+    engine.dispose()
+
+
+def test_migrations_match_models(tmp_path):
+    """
+    OBJECTIF : `alembic check` sans dérive après `upgrade head`.
+    
+    JUSTIFICATION : Les index GIN (PostgreSQL) et d'expression (SQLite) sont
+    créés par les migrations selon le dialecte ; autogenerate ne doit pas
+    proposer de les recréer.
+    
+    CRITÈRES DE SUCCÈS :
+    - Aucune opération détectée sur une base SQLite à jour
+    """
+    from alembic import command
+    
+    url = f"sqlite:///{tmp_path / 'head.db'}"
+    config = _alembic_config(url)
+    command.upgrade(config, "head")
+    
+    command.check(config)
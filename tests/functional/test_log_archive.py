@@ -0,0 +1,95 @@
+"""
+Tests fonctionnels de l'archivage des logs de prédiction
+
+Vérifient que les mois sortis de la fenêtre de rétention quittent la table
+chaude, sont relisibles depuis le Parquet, et que /predict/log/{log_id}
+retombe sur l'archive.
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+import log_archive
+from models import PredictionLog
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture(scope="function")
+def old_and_recent_logs(db_session):
+    """Deux logs anciens (janvier et février 2025) et un log récent (juin 2025)."""
+    logs = [
+        PredictionLog(
+            employee_id=None,
+            input_features=json.dumps({"age": 30 + i, "ville": "Sélestat"}),
+            prediction_result="Oui" if i == 0 else "Non",
+            confidence_score=0.6,
+            model_version="v1.0",
+            created_at=created_at
+        )
+        for i, created_at in enumerate([
+            datetime(2025, 1, 15, 10, 0),
+            datetime(2025, 2, 3, 8, 30),
+            datetime(2025, 6, 1, 9, 0),
+        ])
+    ]
+    db_session.add_all(logs)
+    db_session.commit()
+    
+    yield [log.id for log in logs]
+    
+    db_session.query(PredictionLog).delete()
+    db_session.commit()
+
+
+def test_archive_moves_old_periods(db_session, old_and_recent_logs, tmp_path):
+    """
+    OBJECTIF : Archiver les mois plus vieux que la rétention.
+    
+    CRITÈRES DE SUCCÈS :
+    - Un fichier Parquet par mois archivé, référencé dans le manifeste
+    - Les logs archivés ne sont plus dans la table chaude, le log récent y reste
+    - Un log archivé est relu à l'identique depuis le Parquet
+    """
+    january_id, february_id, recent_id = old_and_recent_logs
+    
+    summary = log_archive.archive_old_periods(
+        db_session, retention_days=30, archive_dir=str(tmp_path), now=datetime(2025, 6, 15)
+    )
+    
+    assert [item["period"] for item in summary] == ["2025-01", "2025-02"]
+    assert (tmp_path / "predictions_logs_2025_01.parquet").exists()
+    assert set(log_archive.load_manifest(str(tmp_path))) == {
+        "predictions_logs_2025_01.parquet", "predictions_logs_2025_02.parquet"
+    }
+    
+    remaining = {log.id for log in db_session.query(PredictionLog).all()}
+    assert recent_id in remaining
+    assert january_id not in remaining and february_id not in remaining
+    
+    archived = log_archive.find_archived_log(january_id, archive_dir=str(tmp_path))
+    assert archived["prediction_result"] == "Oui"
+    assert archived["created_at"] == datetime(2025, 1, 15, 10, 0)
+    assert json.loads(archived["input_features"])["ville"] == "Sélestat"
+    
+    assert log_archive.find_archived_log(recent_id, archive_dir=str(tmp_path)) is None
+
+
+def test_get_prediction_log_falls_back_to_archive(client, db_session, old_and_recent_logs, tmp_path, monkeypatch):
+    """
+    OBJECTIF : /predict/log/{log_id} doit relire un log archivé.
+    """
+    monkeypatch.setattr(log_archive, "ARCHIVE_DIR", str(tmp_path))
+    january_id = old_and_recent_logs[0]
+    
+    log_archive.archive_old_periods(db_session, retention_days=30, now=datetime(2025, 6, 15))
+    
+    response = client.get(f"/predict/log/{january_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["log_id"] == january_id
+    assert data["features"]["age"] == 30
+    
+    assert client.get("/predict/log/987654").status_code == 404
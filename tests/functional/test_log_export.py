@@ -0,0 +1,212 @@
+"""
+Tests fonctionnels de l'export en flux des logs de prédiction
+
+Vérifient les trois formats de /predictions/logs/export, les filtres de
+période et de version, la résolution des features stockées dans
+feature_blobs, et la protection par API Key.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+
+import msgpack
+import pyarrow.parquet as pq
+import pytest
+
+import feature_store
+import log_export
+from main import app, verify_api_key
+from models import FeatureBlob, PredictionLog
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture(scope="function")
+def export_logs(db_session):
+    """Trois logs : janvier v1.0 (en ligne), février v1.0 et février v2.0 (blob)."""
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+
+    features_hash = feature_store.store_features(db_session, {"age": 41, "ville": "Sélestat"})
+    logs = [
+        PredictionLog(
+            input_features=json.dumps({"age": 30, "ville": "Colmar"}),
+            prediction_result="Oui", confidence_score=0.8,
+            model_version="v1.0", created_at=datetime(2025, 1, 15, 10, 0)
+        ),
+        PredictionLog(
+            features_hash=features_hash,
+            prediction_result="Non", confidence_score=0.3,
+            model_version="v1.0", created_at=datetime(2025, 2, 3, 8, 30)
+        ),
+        PredictionLog(
+            features_hash=features_hash,
+            prediction_result="Non", confidence_score=0.4,
+            model_version="v2.0", created_at=datetime(2025, 2, 20, 17, 0)
+        ),
+    ]
+    db_session.add_all(logs)
+    db_session.commit()
+
+    yield [log.id for log in logs]
+
+    db_session.query(PredictionLog).delete()
+    db_session.query(FeatureBlob).delete()
+    db_session.commit()
+
+
+def test_export_csv(client, export_logs):
+    """
+    OBJECTIF : Exporter toute la table en CSV.
+
+    CRITÈRES DE SUCCÈS :
+    - Pièce jointe text/csv avec en-tête
+    - Lignes triées par created_at, features résolues depuis feature_blobs
+    """
+    response = client.get("/predictions/logs/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "predictions_logs.csv" in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == export_logs
+    assert json.loads(rows[0]["input_features"])["ville"] == "Colmar"
+    assert json.loads(rows[1]["input_features"])["ville"] == "Sélestat"
+    assert rows[2]["created_at"] == "2025-02-20T17:00:00"
+
+
+def test_export_ndjson_with_filters(client, export_logs):
+    """
+    OBJECTIF : Filtrer l'export par période et par version de modèle.
+
+    CRITÈRES DE SUCCÈS :
+    - start inclus, end exclu
+    - Un objet JSON par ligne, features en objet
+    """
+    response = client.get(
+        "/predictions/logs/export",
+        params={"format": "ndjson", "start": "2025-02-01T00:00:00", "end": "2025-03-01T00:00:00",
+                "model_version": "v1.0"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["id"] for line in lines] == [export_logs[1]]
+    assert lines[0]["input_features"] == {"age": 41, "ville": "Sélestat"}
+
+
+def test_export_parquet_in_several_row_groups(client, export_logs, monkeypatch):
+    """
+    OBJECTIF : Écrire le Parquet lot par lot (un row group par lot du curseur).
+
+    CRITÈRES DE SUCCÈS :
+    - Fichier relisible, avec toutes les lignes
+    - Autant de row groups que de lots
+    """
+    monkeypatch.setattr(log_export, "YIELD_PER", 2)
+
+    response = client.get("/predictions/logs/export", params={"format": "parquet"})
+
+    assert response.status_code == 200
+    parquet = pq.ParquetFile(io.BytesIO(response.content))
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.column("id").to_pylist() == export_logs
+    assert table.column("model_version").to_pylist() == ["v1.0", "v1.0", "v2.0"]
+
+
+def test_export_streamed_compression(client, export_logs):
+    """
+    OBJECTIF : Export NDJSON compressé en flux, Parquet laissé tel quel.
+
+    CRITÈRES DE SUCCÈS :
+    - NDJSON : Content-Encoding gzip, sans Content-Length (flux)
+    - Parquet (déjà compressé en zstd) : pas de Content-Encoding
+    """
+    headers = {"Accept-Encoding": "gzip"}
+
+    response = client.get("/predictions/logs/export", params={"format": "ndjson"}, headers=headers)
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == export_logs
+
+    parquet = client.get("/predictions/logs/export", params={"format": "parquet"}, headers=headers)
+    assert "content-encoding" not in parquet.headers
+
+
+def test_export_msgpack_negotiated(client, export_logs):
+    """
+    OBJECTIF : Export en msgpack choisi par le header Accept.
+
+    CRITÈRES DE SUCCÈS :
+    - Sans format : msgpack si Accept le demande, une map par log
+    - Features restituées en map
+    """
+
+    response = client.get("/predictions/logs/export", headers={"Accept": "application/x-msgpack"})
+
+    assert response.headers["content-type"] == "application/x-msgpack"
+    rows = list(msgpack.Unpacker(io.BytesIO(response.content)))
+    assert [row["id"] for row in rows] == export_logs
+    assert rows[1]["input_features"] == {"age": 41, "ville": "Sélestat"}
+
+
+def test_export_mixed_timezone_bounds(client, export_logs):
+    """
+    OBJECTIF : Accepter une borne avec fuseau et une borne naïve.
+
+    CRITÈRES DE SUCCÈS :
+    - Bornes ramenées en UTC : 2025-02-03T10:30+02:00 = 08:30 UTC (inclus)
+    - Période vide en UTC → 400, pas d'erreur 500
+    """
+    response = client.get(
+        "/predictions/logs/export",
+        params={"format": "ndjson", "start": "2025-02-03T10:30:00+02:00", "end": "2025-02-20T17:00:00"}
+    )
+
+    assert response.status_code == 200
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [export_logs[1]]
+
+    empty = client.get(
+        "/predictions/logs/export",
+        params={"start": "2025-02-03T08:30:00", "end": "2025-02-03T10:30:00+02:00"}
+    )
+    assert empty.status_code == 400
+
+
+def test_export_invalid_parameters(client, export_logs):
+    """
+    OBJECTIF : Refuser un format inconnu ou une période vide.
+
+    CRITÈRES DE SUCCÈS :
+    - 422 pour un format inconnu, 400 si start >= end
+    """
+    assert client.get("/predictions/logs/export", params={"format": "xlsx"}).status_code == 422
+    response = client.get(
+        "/predictions/logs/export",
+        params={"start": "2025-03-01T00:00:00", "end": "2025-02-01T00:00:00"}
+    )
+    assert response.status_code == 400
+
+
+def test_export_requires_api_key(client):
+    """
+    OBJECTIF : L'export est protégé comme /predictions/logs.
+
+    CRITÈRES DE SUCCÈS :
+    - 401 sans header X-API-Key
+    """
+    override = app.dependency_overrides.pop(verify_api_key)
+    try:
+        response = client.get("/predictions/logs/export")
+    finally:
+        app.dependency_overrides[verify_api_key] = override
+
+    assert response.status_code == 401
@@ -0,0 +1,210 @@
+"""
+Tests fonctionnels des agrégats temporels de prédictions
+
+Vérifient le découpage en tranches (heure / jour / semaine) calculé par la
+base, le regroupement par model_version, et le cache des tranches closes.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+import log_archive
+from models import PredictionLog
+from prediction_analytics import AnalyticsCache, floor
+
+pytestmark = pytest.mark.functional
+
+
+def _log(created_at, result="Non", confidence=0.5, version="v1.0"):
+    return PredictionLog(
+        input_features='{"age": 30}',
+        prediction_result=result,
+        confidence_score=confidence,
+        model_version=version,
+        created_at=created_at
+    )
+
+
+@pytest.fixture(scope="function")
+def analytics_logs(db_session):
+    """Logs du mercredi 5 et du jeudi 6 mars 2025, deux versions de modèle."""
+    db_session.query(PredictionLog).delete()
+    db_session.add_all([
+        _log(datetime(2025, 3, 5, 9, 15), "Oui", 0.9),
+        _log(datetime(2025, 3, 5, 9, 45), "Non", 0.7),
+        _log(datetime(2025, 3, 5, 14, 0), "Non", 0.2, version="v2.0"),
+        _log(datetime(2025, 3, 6, 8, 0), "Oui", 0.6, version="v2.0"),
+    ])
+    db_session.commit()
+
+    yield
+
+    db_session.query(PredictionLog).delete()
+    db_session.commit()
+
+
+def test_daily_analytics(client, analytics_logs):
+    """
+    OBJECTIF : Agréger les logs par jour via l'endpoint.
+
+    CRITÈRES DE SUCCÈS :
+    - Une tranche par jour non vide, triée par date
+    - Volume, répartition Oui / Non et confiance moyenne exacts
+    """
+    response = client.get(
+        "/predictions/analytics",
+        params={"interval": "day", "start": "2025-03-01T00:00:00", "end": "2025-03-10T00:00:00"}
+    )
+
+    assert response.status_code == 200
+    buckets = response.json()["buckets"]
+    assert [bucket["bucket_start"] for bucket in buckets] == ["2025-03-05T00:00:00", "2025-03-06T00:00:00"]
+    assert buckets[0]["total"] == 3
+    assert (buckets[0]["oui"], buckets[0]["non"]) == (1, 2)
+    assert buckets[0]["mean_confidence"] == pytest.approx(0.6)
+
+
+def test_hourly_analytics_by_model_version(client, analytics_logs):
+    """
+    OBJECTIF : Regrouper par heure et par model_version.
+
+    CRITÈRES DE SUCCÈS :
+    - Les deux logs de 9h (v1.0) tombent dans la même tranche
+    - Chaque ligne porte sa model_version
+    """
+    response = client.get(
+        "/predictions/analytics",
+        params={"interval": "hour", "start": "2025-03-05T00:00:00", "end": "2025-03-06T00:00:00",
+                "by_model_version": True}
+    )
+
+    assert response.status_code == 200
+    buckets = [
+        (bucket["bucket_start"], bucket["model_version"], bucket["total"])
+        for bucket in response.json()["buckets"]
+    ]
+    assert buckets == [("2025-03-05T09:00:00", "v1.0", 2), ("2025-03-05T14:00:00", "v2.0", 1)]
+
+
+def test_weekly_buckets_start_on_monday(db_session, analytics_logs):
+    """
+    OBJECTIF : Les semaines de la base commencent le lundi, comme floor().
+
+    CRITÈRES DE SUCCÈS :
+    - Une seule tranche, datée du lundi 3 mars 2025
+    """
+    rows = AnalyticsCache().get(
+        db_session, "week", datetime(2025, 3, 1), datetime(2025, 3, 15), now=datetime(2025, 4, 1)
+    )
+
+    assert [row["bucket_start"] for row in rows] == [datetime(2025, 3, 3)]
+    assert rows[0]["total"] == 4
+    assert floor(datetime(2025, 3, 9, 23, 59), "week") == datetime(2025, 3, 3)
+
+
+def test_closed_buckets_are_cached(db_session, analytics_logs):
+    """
+    OBJECTIF : Ne plus recalculer une tranche close.
+
+    CRITÈRES DE SUCCÈS :
+    - Un log ajouté après coup dans une tranche close n'est pas relu
+    - La tranche en cours est toujours recalculée
+    """
+    cache = AnalyticsCache()
+    now = datetime(2025, 3, 6, 12, 0)
+    period = dict(start=datetime(2025, 3, 5), end=datetime(2025, 3, 7), now=now)
+
+    first = cache.get(db_session, "day", **period)
+    assert [row["total"] for row in first] == [3, 1]
+
+    db_session.add_all([_log(datetime(2025, 3, 5, 18, 0)), _log(datetime(2025, 3, 6, 11, 0))])
+    db_session.commit()
+
+    second = cache.get(db_session, "day", **period)
+    assert [row["total"] for row in second] == [3, 2]
+
+    cache.invalidate()
+    assert [row["total"] for row in cache.get(db_session, "day", **period)] == [4, 2]
+
+
+def test_recently_ended_bucket_is_not_frozen(db_session, analytics_logs):
+    """
+    OBJECTIF : Ne pas figer une tranche qui vient de se terminer.
+
+    CRITÈRES DE SUCCÈS :
+    - Un log daté avant la fin de la tranche mais commité juste après est compté
+    - La tranche n'est figée qu'une fois le délai de grâce écoulé
+    """
+    cache = AnalyticsCache(grace=timedelta(seconds=35))
+    period = dict(start=datetime(2025, 3, 5, 9), end=datetime(2025, 3, 5, 11))
+
+    first = cache.get(db_session, "hour", now=datetime(2025, 3, 5, 10, 0, 10), **period)
+    assert [row["total"] for row in first] == [2]
+
+    # Commit tardif : horodaté 9:59:59, visible après le premier calcul
+    db_session.add(_log(datetime(2025, 3, 5, 9, 59, 59)))
+    db_session.commit()
+
+    second = cache.get(db_session, "hour", now=datetime(2025, 3, 5, 10, 0, 20), **period)
+    assert [row["total"] for row in second] == [3]
+
+    # Délai écoulé : la tranche de 9h est figée
+    cache.get(db_session, "hour", now=datetime(2025, 3, 5, 10, 1), **period)
+    db_session.add(_log(datetime(2025, 3, 5, 9, 30)))
+    db_session.commit()
+    third = cache.get(db_session, "hour", now=datetime(2025, 3, 5, 10, 2), **period)
+    assert [row["total"] for row in third] == [3]
+
+
+def test_timezone_aware_bounds(client, analytics_logs):
+    """
+    OBJECTIF : Accepter des bornes ISO 8601 avec fuseau (Z, +02:00).
+
+    CRITÈRES DE SUCCÈS :
+    - Bornes ramenées en UTC : mêmes tranches qu'avec des dates naïves
+    - Bornes de fuseaux différents acceptées ensemble
+    """
+    response = client.get(
+        "/predictions/analytics",
+        params={"interval": "day", "start": "2025-03-05T02:00:00+02:00", "end": "2025-03-07T00:00:00Z"}
+    )
+
+    assert response.status_code == 200
+    buckets = response.json()["buckets"]
+    assert [bucket["bucket_start"] for bucket in buckets] == ["2025-03-05T00:00:00", "2025-03-06T00:00:00"]
+    assert [bucket["total"] for bucket in buckets] == [3, 1]
+
+    mixed = client.get(
+        "/predictions/analytics",
+        params={"interval": "day", "start": "2025-03-05T00:00:00", "end": "2025-03-06T00:00:00Z"}
+    )
+    assert [bucket["total"] for bucket in mixed.json()["buckets"]] == [3]
+
+
+def test_archive_clears_closed_buckets(db_session, analytics_logs, tmp_path, monkeypatch):
+    """
+    OBJECTIF : Ne pas servir du cache les tranches d'un mois archivé.
+
+    CRITÈRES DE SUCCÈS :
+    - Après archivage de mars, ses tranches closes sont relues (vides)
+    """
+    monkeypatch.setattr(log_archive, "ARCHIVE_DIR", str(tmp_path))
+    cache = AnalyticsCache()
+    period = dict(start=datetime(2025, 3, 5), end=datetime(2025, 3, 7), now=datetime(2025, 6, 15))
+
+    assert [row["total"] for row in cache.get(db_session, "day", **period)] == [3, 1]
+
+    log_archive.archive_old_periods(db_session, retention_days=30, now=datetime(2025, 6, 15))
+
+    assert cache.get(db_session, "day", **period) == []
+
+
+def test_invalid_analytics_parameters(client):
+    """Intervalle inconnu → 422, période vide → 400."""
+    assert client.get("/predictions/analytics", params={"interval": "month"}).status_code == 422
+    response = client.get(
+        "/predictions/analytics",
+        params={"start": "2025-03-10T00:00:00", "end": "2025-03-01T00:00:00"}
+    )
+    assert response.status_code == 400
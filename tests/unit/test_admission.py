@@ -0,0 +1,101 @@
+"""
+Tests unitaires pour admission.py
+
+Ces tests vérifient le limiteur de concurrence : file d'attente bornée,
+rejet immédiat (503 + Retry-After) et transmission des places libérées.
+"""
+
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from admission import AdmissionLimiter
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+
+def test_queue_full_rejected_and_slot_handed_over():
+    """
+    OBJECTIF : File bornée et transmission de la place au suivant.
+    
+    CRITÈRES DE SUCCÈS :
+    - 1 en cours + 1 en attente : le 3e est rejeté (503, Retry-After)
+    - La place libérée passe à la requête en attente
+    """
+    limiter = AdmissionLimiter("test", concurrency=1, queue=1, max_wait=1.0)
+    
+    async def scenario():
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        
+        with pytest.raises(HTTPException) as error:
+            await limiter.acquire()
+        
+        limiter.release(0.01)
+        await waiting
+        return error.value
+    
+    error = asyncio.run(scenario())
+    
+    assert error.status_code == 503
+    assert int(error.headers["Retry-After"]) >= 1
+    metrics = limiter.metrics()
+    assert metrics["active"] == 1
+    assert metrics["waiting"] == 0
+    assert metrics["admitted"] == 2
+    assert metrics["rejected"]["queue_full"] == 1
+
+
+def test_estimated_wait_rejected_immediately():
+    """Attente estimée (temps de service moyen) au-delà de max_wait : rejet sans attendre."""
+    limiter = AdmissionLimiter("test", concurrency=1, queue=10, max_wait=1.0)
+    limiter.service_time = 3.0
+    
+    async def scenario():
+        await limiter.acquire()
+        with pytest.raises(HTTPException) as error:
+            await limiter.acquire()
+        return error.value
+    
+    error = asyncio.run(scenario())
+    
+    assert error.headers["Retry-After"] == "3"
+    assert limiter.metrics()["rejected"]["estimated_wait"] == 1
+
+
+def test_wait_timeout_and_cancellation_release_queue():
+    """
+    OBJECTIF : Ne pas laisser de place ni d'attente orpheline.
+    
+    CRITÈRES DE SUCCÈS :
+    - Délai max_wait dépassé → 503, la requête quitte la file
+    - Requête annulée pendant l'attente → retirée de la file
+    """
+    limiter = AdmissionLimiter("test", concurrency=1, queue=5, max_wait=0.05)
+    
+    async def scenario():
+        await limiter.acquire()
+        with pytest.raises(HTTPException):
+            await limiter.acquire()
+        
+        cancelled = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        
+        limiter.release(0.01)
+    
+    asyncio.run(scenario())
+    
+    metrics = limiter.metrics()
+    assert metrics["rejected"]["timeout"] == 1
+    assert metrics["active"] == 0
+    assert metrics["waiting"] == 0
@@ -0,0 +1,60 @@
+"""
+Tests unitaires pour compression.py
+
+Ces tests vérifient la négociation Accept-Encoding et la compression en
+flux (chaque morceau est décodable dès sa réception).
+"""
+
+import gzip
+import zlib
+
+import pytest
+
+import compression
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("identity", None),
+    ("gzip;q=0", None),
+    ("", None),
+])
+def test_negotiate(accept_encoding, expected):
+    """Brotli préféré à gzip, q=0 respecté, rien si aucun encodage accepté."""
+    assert compression.negotiate(accept_encoding) == expected
+
+
+def test_negotiate_without_brotli(monkeypatch):
+    """Sans le module brotli : repli sur gzip."""
+    monkeypatch.setattr(compression, "brotli", None)
+    assert compression.negotiate("br, gzip") == "gzip"
+    assert compression.negotiate("br") is None
+
+
+def test_gzip_stream_flushes_each_chunk():
+    """
+    OBJECTIF : Compression en flux pour les exports.
+    
+    CRITÈRES DE SUCCÈS :
+    - Chaque morceau compressé se décode sans attendre la suite
+    - Le flux complet est un gzip valide
+    """
+    compressor = compression._Gzip()
+    decoder = zlib.decompressobj(31)
+    chunks = [b'{"id":1}\n' * 100, b'{"id":2}\n' * 100]
+    
+    first = compressor.compress(chunks[0], final=False)
+    assert decoder.decompress(first) == chunks[0]
+    
+    last = compressor.compress(chunks[1], final=True)
+    assert gzip.decompress(first + last) == b"".join(chunks)
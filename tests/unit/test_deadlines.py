@@ -0,0 +1,124 @@
+"""
+Tests unitaires pour deadlines.py
+
+Ces tests vérifient l'échéance d'une requête (504 une fois dépassée) et
+l'interruption d'une requête SQL SQLite trop longue.
+"""
+
+import time
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+import deadlines
+from deadlines import Deadline
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+# Requête SQLite volontairement longue (plusieurs secondes)
+SLOW_QUERY = text(
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000000) "
+    "SELECT count(*) FROM n"
+)
+
+
+def test_deadline_check_and_complete():
+    """
+    OBJECTIF : 504 avant une étape une fois l'échéance passée.
+    
+    CRITÈRES DE SUCCÈS :
+    - Pas d'erreur tant qu'il reste du temps
+    - 504 avec le nom de l'étape ensuite
+    - complete() lève l'échéance
+    """
+    deadline = Deadline(0.05)
+    deadline.check("prédiction")
+    
+    time.sleep(0.06)
+    with pytest.raises(HTTPException) as error:
+        deadline.check("prédiction")
+    
+    assert error.value.status_code == 504
+    assert "prédiction" in error.value.detail
+    
+    deadline.complete()
+    assert not deadline.expired()
+
+
+@pytest.mark.parametrize("value", ["abc", "0", "-1", "3600"])
+def test_invalid_header_rejected(value):
+    """X-Request-Timeout non numérique, nul, négatif ou trop grand → 400."""
+    with pytest.raises(HTTPException) as error:
+        deadlines._parse_header(value)
+    
+    assert error.value.status_code == 400
+
+
+def test_sqlite_query_interrupted_at_deadline():
+    """
+    OBJECTIF : Interrompre une requête SQL en cours à l'échéance.
+    
+    CRITÈRES DE SUCCÈS :
+    - La requête longue échoue peu après l'échéance
+    - Le progress handler est retiré après la requête HTTP
+    """
+    engine = create_engine("sqlite://")
+    db = Session(engine)
+    session_dependency = deadlines.session("predict_new_employee")
+    
+    sessions = session_dependency(db=db, deadline=Deadline(0.1))
+    next(sessions)
+    begin = time.monotonic()
+    with pytest.raises(OperationalError, match="interrupted"):
+        db.execute(SLOW_QUERY)
+    assert time.monotonic() - begin < 2
+    
+    db.rollback()
+    sessions.close()
+    # Échéance toujours dépassée, mais plus de handler : la requête aboutit
+    assert db.execute(text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000) "
+        "SELECT count(*) FROM n"
+    )).scalar() == 100000
+    db.close()
+
+
+def test_sqlite_handler_follows_pooled_connection(tmp_path):
+    """
+    OBJECTIF : Lier le progress handler à la transaction, pas à une connexion.
+    
+    CRITÈRES DE SUCCÈS :
+    - Après un commit, la connexion rendue au pool n'interrompt plus les
+      requêtes d'une autre session
+    - La transaction suivante de la requête reste soumise à l'échéance
+    """
+    engine = create_engine(f"sqlite:///{tmp_path / 'deadline.db'}", pool_size=1, max_overflow=0)
+    medium_query = text(
+        "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < 100000) "
+        "SELECT count(*) FROM n"
+    )
+    db = Session(engine)
+    sessions = deadlines.session("predict_new_employee")(db=db, deadline=Deadline(0.05))
+    next(sessions)
+    time.sleep(0.1)
+    db.commit()
+    
+    # Même connexion (pool d'une seule), autre session sans échéance
+    with Session(engine) as other:
+        assert other.execute(medium_query).scalar() == 100000
+    
+    with pytest.raises(OperationalError, match="interrupted"):
+        db.execute(medium_query)
+    
+    db.rollback()
+    sessions.close()
+    db.close()
+    engine.dispose()
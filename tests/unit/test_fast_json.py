@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour fast_json.py
+
+Ces tests vérifient que l'encodeur rapide (orjson) et le repli sur json
+produisent le même JSON pour les réponses de prédiction.
+"""
+
+import json
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+import fast_json
+from fast_json import FastJSONResponse
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+CONTENT = {
+    "log_id": 7,
+    "features": {"ville": "Sélestat", "age": 41, "augmentation": 12.5, "manquant": None},
+    "confidence_score": np.float64(0.75),
+    "timestamp": datetime(2025, 3, 5, 9, 15, 12, 345678),
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Exécute le test avec orjson puis avec le repli json."""
+    if request.param == "json":
+        monkeypatch.setattr(fast_json, "orjson", None)
+    return request.param
+
+
+def test_dumps_response_types(backend):
+    """
+    OBJECTIF : Encoder les types d'une réponse (datetime, numpy, UTF-8).
+
+    CRITÈRES DE SUCCÈS :
+    - datetime au format ISO, comme la sérialisation Pydantic
+    - Caractères accentués écrits tels quels, sans espaces
+    """
+    body = fast_json.dumps(CONTENT)
+
+    assert json.loads(body) == {
+        "log_id": 7,
+        "features": {"ville": "Sélestat", "age": 41, "augmentation": 12.5, "manquant": None},
+        "confidence_score": 0.75,
+        "timestamp": "2025-03-05T09:15:12.345678",
+    }
+    assert "Sélestat".encode("utf-8") in body
+    assert b", " not in body
+
+
+def test_dumps_sort_keys_and_loads(backend):
+    """Clés triées sur demande, et aller-retour str / bytes."""
+    body = fast_json.dumps({"b": 1, "a": 2}, sort_keys=True)
+
+    assert body == b'{"a":2,"b":1}'
+    assert fast_json.loads(body) == {"a": 2, "b": 1}
+    assert fast_json.loads(body.decode("utf-8")) == {"a": 2, "b": 1}
+
+
+def test_fast_json_response(backend):
+    """FastJSONResponse : corps encodé par fast_json, type application/json."""
+    response = FastJSONResponse(CONTENT)
+
+    assert response.media_type == "application/json"
+    assert response.body == fast_json.dumps(CONTENT)
@@ -0,0 +1,67 @@
+"""
+Tests unitaires pour msgpack_io.py
+
+Ces tests vérifient la négociation Accept (msgpack ou JSON) et l'encodage
+msgpack des réponses de prédiction.
+"""
+
+from datetime import datetime
+
+import numpy as np
+import pytest
+from starlette.requests import Request
+
+import msgpack_io
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+
+def make_request(accept: str) -> Request:
+    return Request({"type": "http", "headers": [(b"accept", accept.encode())]})
+
+
+@pytest.mark.parametrize("accept, expected", [
+    ("application/x-msgpack", True),
+    ("application/msgpack, application/json", True),
+    ("application/json, application/x-msgpack", False),
+    ("application/json;q=0.5, application/x-msgpack", True),
+    ("application/x-msgpack;q=0, */*", False),
+    ("*/*", False),
+    ("", False),
+])
+def test_accepts_msgpack(accept, expected):
+    """msgpack seulement s'il est préféré à JSON (q-value, puis ordre)."""
+    assert msgpack_io.accepts_msgpack(make_request(accept)) is expected
+
+
+def test_accepts_msgpack_without_package(monkeypatch):
+    """Sans le paquet msgpack : toujours JSON."""
+    monkeypatch.setattr(msgpack_io, "msgpack", None)
+    assert msgpack_io.accepts_msgpack(make_request("application/x-msgpack")) is False
+
+
+def test_packb_roundtrip():
+    """
+    OBJECTIF : Encoder une réponse de prédiction en msgpack.
+    
+    CRITÈRES DE SUCCÈS :
+    - datetime en ISO 8601 (comme en JSON), numpy converti
+    - Aller-retour fidèle pour les chaînes accentuées
+    """
+    content = {
+        "log_id": 7,
+        "features": {"ville": "Sélestat", "age": 41},
+        "confidence_score": np.float64(0.75),
+        "timestamp": datetime(2025, 3, 5, 9, 15, 12),
+    }
+    
+    assert msgpack_io.unpackb(msgpack_io.packb(content)) == {
+        "log_id": 7,
+        "features": {"ville": "Sélestat", "age": 41},
+        "confidence_score": 0.75,
+        "timestamp": "2025-03-05T09:15:12",
+    }
@@ -0,0 +1,74 @@
+"""
+Tests unitaires pour partitioning.py
+
+La conversion en table partitionnée est propre à PostgreSQL ; ces tests
+vérifient sur SQLite l'étape de copie qu'elle utilise (aucune ligne
+perdue, y compris sans created_at).
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from partitioning import copy_rows, iter_months, partition_name
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+NOW = datetime(2025, 6, 15, 12, 0)
+
+
+@pytest.fixture
+def conn():
+    """Table héritée avec un log daté et un log sans created_at, table cible vide."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        for table in ("legacy", "target"):
+            connection.execute(text(
+                f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, prediction_result TEXT, created_at DATETIME)"
+            ))
+        connection.execute(text(
+            "INSERT INTO legacy VALUES (1, 'Oui', '2025-01-15 10:00:00'), (2, 'Non', NULL)"
+        ))
+        yield connection
+
+
+def test_copy_rows_keeps_logs_without_created_at(conn):
+    """
+    OBJECTIF : Un log sans created_at est copié (daté de la conversion) au
+    lieu d'être supprimé avec l'ancienne table.
+    """
+    assert copy_rows(conn, "legacy", "target", NOW) == 2
+    
+    rows = dict(conn.execute(text("SELECT id, created_at FROM target")).all())
+    assert rows[1] == "2025-01-15 10:00:00"
+    assert rows[2] is not None and rows[2].startswith("2025-06-15")
+
+
+def test_copy_rows_aborts_on_missing_rows(conn):
+    """
+    OBJECTIF : Si des lignes n'arrivent pas dans la table cible, la copie
+    lève une erreur (la transaction est annulée avant le DROP).
+    """
+    conn.execute(text(
+        "CREATE TRIGGER drop_old BEFORE INSERT ON target "
+        "WHEN NEW.created_at < '2025-02-01' BEGIN SELECT RAISE(IGNORE); END"
+    ))
+    
+    with pytest.raises(RuntimeError, match="1 ligne"):
+        copy_rows(conn, "legacy", "target", NOW)
+
+
+def test_month_helpers():
+    """
+    OBJECTIF : Mois parcourus et noms de partitions.
+    """
+    months = list(iter_months(datetime(2024, 11, 20), datetime(2025, 2, 1)))
+    
+    assert months == [datetime(2024, 11, 1), datetime(2024, 12, 1), datetime(2025, 1, 1)]
+    assert partition_name(months[1]) == "predictions_logs_2024_12"
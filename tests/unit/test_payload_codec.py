@@ -0,0 +1,178 @@
+"""
+Tests unitaires pour payload_codec.py
+
+Ces tests vérifient que chaque codec relit exactement les features écrites,
+que les lignes JSON historiques restent lisibles et que l'API expose
+toujours du JSON quel que soit le format de stockage.
+"""
+
+import json
+
+import msgpack
+import pytest
+from sqlalchemy import create_engine
+
+import feature_store
+import payload_codec
+from database import Base
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def codec_config():
+    """Restaure le codec et les schémas après chaque test."""
+    previous_codec = payload_codec.codec
+    previous_schemas = dict(payload_codec._schemas)
+    previous_current, previous_resolver = payload_codec._current, payload_codec._resolver
+    payload_codec.set_schema_resolver(None)
+    yield payload_codec
+    payload_codec.codec = previous_codec
+    payload_codec._schemas.clear()
+    payload_codec._schemas.update(previous_schemas)
+    payload_codec._current = previous_current
+    payload_codec.set_schema_resolver(previous_resolver)
+
+
+@pytest.fixture
+def schema_engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+# =============================================================================
+# TEST 1 : ALLER-RETOUR PAR CODEC
+# =============================================================================
+
+@pytest.mark.parametrize("name", ["json", "msgpack", "packed"])
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_round_trip(codec_config, valid_employee_data, name, compression):
+    """
+    OBJECTIF : decode(encode(x)) == x pour chaque codec, avec ou sans compression.
+    
+    CRITÈRES DE SUCCÈS :
+    - Les valeurs (entiers, flottants, chaînes, None) sont identiques
+    - Les codecs binaires produisent un payload plus petit que le JSON
+    """
+    codec_config.register_schema(sorted(valid_employee_data))
+    codec_config.configure(name, compression)
+    
+    payload = codec_config.encode(valid_employee_data)
+    
+    assert codec_config.decode(payload) == valid_employee_data
+    if name != "json":
+        assert isinstance(payload, bytes)
+        assert len(payload) < len(json.dumps(valid_employee_data))
+
+
+def test_packed_falls_back_to_map_for_other_keys(codec_config):
+    """
+    OBJECTIF : Un dictionnaire hors schéma est encodé en msgpack clé/valeur.
+    """
+    codec_config.register_schema(["age", "genre"])
+    codec_config.configure("packed")
+    
+    features = {"age": 41, "poste": "Manager"}
+    assert codec_config.decode(codec_config.encode(features)) == features
+
+
+def test_unknown_packed_schema_is_rejected(codec_config):
+    """
+    OBJECTIF : Un vecteur dont le schéma n'est pas enregistré lève une erreur claire.
+    """
+    codec_config.register_schema(["age", "genre"])
+    codec_config.configure("packed")
+    payload = codec_config.encode({"age": 41, "genre": "F"})
+    codec_config._schemas.clear()
+    
+    with pytest.raises(ValueError, match="Schéma de features inconnu"):
+        codec_config.decode(payload)
+
+
+def test_packed_schema_reloaded_from_database(codec_config, schema_engine):
+    """
+    OBJECTIF : Relire un payload "packed" dans un processus qui n'a pas chargé le modèle.
+    
+    CRITÈRES DE SUCCÈS :
+    - Schéma enregistré dans feature_schemas par init_schemas
+    - Après oubli des schémas en mémoire, decode le relit en base
+    """
+    codec_config.configure("packed")
+    feature_store.init_schemas(schema_engine, ["age", "genre"])
+    payload = codec_config.encode({"age": 41, "genre": "F"})
+    
+    codec_config._schemas.clear()
+    codec_config.set_schema_resolver(None)
+    feature_store.init_schemas(schema_engine)  # ex. log_archive.py
+    
+    assert codec_config.decode(payload) == {"age": 41, "genre": "F"}
+
+
+def test_previous_model_schema_stays_readable(codec_config, schema_engine):
+    """
+    OBJECTIF : Un ré-entraînement qui change les features ne rend pas les anciens payloads illisibles.
+    
+    CRITÈRES DE SUCCÈS :
+    - Le schéma du nouveau modèle devient le schéma d'écriture
+    - Un payload de l'ancien modèle se relit après redémarrage
+    """
+    codec_config.configure("packed")
+    feature_store.init_schemas(schema_engine, ["age", "genre"])
+    old_payload = codec_config.encode({"age": 41, "genre": "F"})
+    
+    # Redémarrage avec le nouveau modèle
+    codec_config._schemas.clear()
+    feature_store.init_schemas(schema_engine, ["age", "genre", "poste"])
+    
+    assert codec_config.current_schema() == ("age", "genre", "poste")
+    assert codec_config.decode(old_payload) == {"age": 41, "genre": "F"}
+    new_payload = codec_config.encode({"age": 30, "genre": "M", "poste": "Manager"})
+    assert codec_config.decode(new_payload) == {"age": 30, "genre": "M", "poste": "Manager"}
+
+
+# =============================================================================
+# TEST 2 : COMPATIBILITÉ AVEC LES LIGNES JSON
+# =============================================================================
+
+def test_legacy_json_rows_still_readable(codec_config):
+    """
+    OBJECTIF : Les lignes écrites avant le codec (JSON texte) restent lisibles.
+    
+    JUSTIFICATION : Changer FEATURES_CODEC ne réécrit pas les lignes existantes.
+    """
+    codec_config.configure("packed", "zlib")
+    legacy = '{"age": 41, "genre": "F"}'
+    
+    assert codec_config.decode(legacy) == {"age": 41, "genre": "F"}
+    assert codec_config.decode(legacy.encode("utf-8")) == {"age": 41, "genre": "F"}
+    assert codec_config.to_json(legacy) is legacy
+
+
+def test_binary_codec_only_on_sqlite(codec_config):
+    """
+    OBJECTIF : Le binaire n'est écrit que sur SQLite ; PostgreSQL reçoit le dict (JSONB).
+    """
+    codec_config.configure("msgpack")
+    
+    assert isinstance(codec_config.encode({"age": 41}, "sqlite"), bytes)
+    assert codec_config.encode({"age": 41}, "mysql") == '{"age":41}'
+    assert codec_config.encode({"age": 41}, "postgresql") == {"age": 41}
+    assert codec_config.decode({"age": 41}) == {"age": 41}
+    assert codec_config.to_json({"age": 41}) == '{"age":41}'
+
+
+def test_to_json_exposes_binary_payload_as_json(codec_config):
+    """
+    OBJECTIF : Le contrat de l'API (features en JSON texte) ne dépend pas du stockage.
+    """
+    codec_config.configure("msgpack", "zlib")
+    payload = codec_config.encode({"age": 41, "genre": "F"})
+    
+    assert json.loads(codec_config.to_json(payload)) == {"age": 41, "genre": "F"}
@@ -0,0 +1,282 @@
+"""
+Tests unitaires pour serve.py (supervision des workers)
+
+Ces tests vérifient la création, la relance et le remplacement des workers
+par le processus parent, sans vrai fork : os.fork, os.kill, os.waitpid et
+l'horloge (time.monotonic) sont simulés.
+"""
+
+import logging
+import signal
+from types import SimpleNamespace
+
+import pytest
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from xgboost import XGBClassifier
+
+import serve
+from model_loader import ModelLoader
+
+
+# =============================================================================
+# MARQUE : Tous ces tests sont des tests unitaires
+# =============================================================================
+
+pytestmark = pytest.mark.unit
+
+
+class FakeProcesses:
+    """os.fork / os.kill / os.waitpid simulés : pids croissants, signaux notés."""
+
+    def __init__(self, monkeypatch):
+        self.next_pid = 100
+        self.killed = []
+        self.exits = []  # (pid, statut) renvoyés par waitpid, puis (0, 0)
+        self.now = 1000.0  # horloge simulée, avancée par les tests
+        monkeypatch.setattr(serve.os, "fork", self.fork)
+        monkeypatch.setattr(serve.os, "kill", self.kill)
+        monkeypatch.setattr(serve.os, "waitpid", self.waitpid)
+        monkeypatch.setattr(serve.gc, "freeze", lambda: None)
+        monkeypatch.setattr(serve.time, "monotonic", lambda: self.now)
+
+    def fork(self):
+        self.next_pid += 1
+        return self.next_pid
+
+    def kill(self, pid, signum):
+        self.killed.append((pid, signum))
+
+    def waitpid(self, pid, options):
+        return self.exits.pop(0) if self.exits else (0, 0)
+
+
+@pytest.fixture
+def processes(monkeypatch):
+    return FakeProcesses(monkeypatch)
+
+
+@pytest.fixture
+def supervisor(processes):
+    args = SimpleNamespace(workers=2, threads=1, graceful_timeout=1, host="127.0.0.1", port=0)
+    supervisor = serve.Supervisor(sock=None, args=args)
+    for _ in range(args.workers):
+        supervisor.spawn()
+    return supervisor
+
+
+# =============================================================================
+# TEST 1 : CRÉATION ET RELANCE DES WORKERS
+# =============================================================================
+
+def test_spawn_registers_workers(supervisor):
+    """
+    OBJECTIF : Chaque fork du parent ajoute un worker suivi.
+    """
+    assert supervisor.workers == {101, 102}
+
+
+def test_spawn_child_runs_worker_then_exits(monkeypatch, processes):
+    """
+    OBJECTIF : Côté fils, lancer le worker puis quitter sans revenir au parent.
+
+    CRITÈRES DE SUCCÈS :
+    - run_worker reçoit le socket, les threads et le délai d'arrêt
+    - os._exit(0) est appelé, même si run_worker échoue
+    """
+    calls = []
+
+    def failing_worker(*args):
+        calls.append(args)
+        raise RuntimeError("Worker arrêté")
+
+    def fake_exit(code):
+        calls.append(("exit", code))
+        raise SystemExit(code)
+
+    monkeypatch.setattr(serve.os, "fork", lambda: 0)
+    monkeypatch.setattr(serve, "run_worker", failing_worker)
+    monkeypatch.setattr(serve.os, "_exit", fake_exit)
+    supervisor = serve.Supervisor("sock", SimpleNamespace(workers=1, threads=3, graceful_timeout=7))
+
+    with pytest.raises(SystemExit):
+        supervisor.spawn()
+
+    assert calls == [("sock", 3, 7), ("exit", 0)]
+    assert supervisor.workers == set()
+
+
+def test_reap_respawns_dead_worker(supervisor, processes):
+    """
+    OBJECTIF : Relancer un worker mort de façon inattendue.
+
+    CRITÈRES DE SUCCÈS :
+    - Le worker mort quitte l'ensemble suivi
+    - Un nouveau worker le remplace, aucun signal envoyé
+    """
+    processes.exits = [(101, 256)]  # code de sortie 1
+
+    supervisor.reap()
+
+    assert supervisor.workers == {102, 103}
+    assert processes.killed == []
+
+
+def test_reap_does_not_respawn_retiring_worker(supervisor, processes):
+    """
+    OBJECTIF : Un ancien worker arrêté par SIGHUP n'est pas relancé.
+    """
+    supervisor.retiring = {101}
+    processes.exits = [(101, 0)]
+
+    supervisor.reap()
+
+    assert supervisor.workers == {102}
+    assert supervisor.retiring == set()
+
+
+def test_reap_does_not_respawn_while_stopping(supervisor, processes):
+    """
+    OBJECTIF : Pendant l'arrêt, un worker terminé n'est pas relancé.
+    """
+    supervisor.stopping = True
+    processes.exits = [(101, 0), (102, 0)]
+
+    supervisor.reap()
+
+    assert supervisor.workers == set()
+
+
+def test_reap_backs_off_fast_crashes(supervisor, processes):
+    """
+    OBJECTIF : Un worker qui meurt au démarrage n'est pas relancé en boucle.
+
+    CRITÈRES DE SUCCÈS :
+    - Première mort rapide : relance immédiate
+    - Deuxième : relance différée d'1 s, puis effectuée une fois le délai écoulé
+    """
+    processes.exits = [(101, 256)]
+    supervisor.reap()
+    assert supervisor.workers == {102, 103}
+
+    processes.exits = [(103, 256)]
+    supervisor.reap()
+    assert supervisor.workers == {102}
+
+    processes.now += 0.5
+    supervisor.respawn_due()
+    assert supervisor.workers == {102}
+
+    processes.now += 0.5
+    supervisor.respawn_due()
+    assert supervisor.workers == {102, 104}
+
+
+def test_reap_stops_after_repeated_fast_crashes(monkeypatch, supervisor, processes):
+    """
+    OBJECTIF : Arrêter le serveur quand les workers ne démarrent jamais.
+
+    CRITÈRES DE SUCCÈS :
+    - Après WORKER_MAX_FAST_CRASHES morts rapides d'affilée : arrêt en échec
+    - Plus aucune relance
+    """
+    monkeypatch.setattr(serve, "MAX_FAST_CRASHES", 2)
+
+    processes.exits = [(101, 256), (102, 256)]
+    supervisor.reap()
+
+    assert supervisor.failed
+    assert supervisor.stopping
+    assert supervisor.workers == {103}
+    assert supervisor.respawns == []
+
+
+def test_reap_resets_backoff_after_healthy_worker(supervisor, processes):
+    """
+    OBJECTIF : Une mort après WORKER_MIN_UPTIME n'est pas un plantage au démarrage.
+
+    CRITÈRES DE SUCCÈS :
+    - Le compteur de morts rapides repart de zéro, relance immédiate
+    """
+    supervisor.fast_crashes = 3
+    processes.now += serve.MIN_UPTIME
+    processes.exits = [(101, 256)]
+
+    supervisor.reap()
+
+    assert supervisor.fast_crashes == 0
+    assert supervisor.workers == {102, 103}
+
+
+# =============================================================================
+# TEST 2 : REDÉMARRAGE PROGRESSIF (SIGHUP)
+# =============================================================================
+
+def test_rolling_restart_replaces_workers(monkeypatch, supervisor, processes):
+    """
+    OBJECTIF : Nouveaux workers créés avant l'arrêt des anciens.
+
+    CRITÈRES DE SUCCÈS :
+    - Le modèle est rechargé avec le nombre de threads configuré
+    - Les anciens workers reçoivent SIGTERM et sont marqués en retrait
+    """
+    preloads = []
+    monkeypatch.setattr(serve, "preload", preloads.append)
+
+    supervisor.rolling_restart()
+
+    assert preloads == [1]
+    assert supervisor.workers == {101, 102, 103, 104}
+    assert supervisor.retiring == {101, 102}
+    assert sorted(processes.killed) == [(101, signal.SIGTERM), (102, signal.SIGTERM)]
+
+
+def test_rolling_restart_keeps_workers_when_reload_fails(monkeypatch, supervisor, processes, caplog):
+    """
+    OBJECTIF : Un modèle illisible ne fait pas tomber les workers en service.
+
+    CRITÈRES DE SUCCÈS :
+    - L'erreur est journalisée, aucune exception ne remonte
+    - Aucun worker créé ni arrêté
+    """
+    def broken_preload(threads):
+        raise RuntimeError("Impossible de charger le modèle")
+
+    monkeypatch.setattr(serve, "preload", broken_preload)
+    # fileConfig d'Alembic (tests de migration) désactive les loggers existants
+    monkeypatch.setattr(serve.logger, "disabled", False)
+
+    with caplog.at_level(logging.ERROR, logger="serve"):
+        supervisor.rolling_restart()
+
+    assert "Impossible de charger le modèle" in caplog.text
+    assert supervisor.workers == {101, 102}
+    assert supervisor.retiring == set()
+    assert processes.killed == []
+
+
+# =============================================================================
+# TEST 3 : THREADS DE CALCUL PAR WORKER
+# =============================================================================
+
+def test_set_threads_updates_n_jobs():
+    """
+    OBJECTIF : Fixer le n_jobs des étapes du pipeline qui l'acceptent.
+
+    CRITÈRES DE SUCCÈS :
+    - Le classifieur XGBoost reçoit n_jobs
+    - Les étapes sans n_jobs sont laissées telles quelles
+    """
+    loader = ModelLoader()
+    loader.pipeline = Pipeline([("scaler", StandardScaler()), ("model", XGBClassifier(n_jobs=8))])
+
+    loader.set_threads(2)
+
+    assert loader.pipeline.named_steps["model"].get_params()["n_jobs"] == 2
+    assert "n_jobs" not in loader.pipeline.named_steps["scaler"].get_params()
+
+
+def test_set_threads_requires_loaded_model():
+    """Sans modèle chargé → RuntimeError."""
+    with pytest.raises(RuntimeError):
+        ModelLoader().set_threads(2)